@@ -15,7 +15,7 @@ from google.adk.models.lite_llm import LiteLlm
 from .prompt import ROOT_AGENT_PROMPT
 from .config.settings import settings
 from .config.shared_clients import build_mcp_toolsets
-from .utils import load_all_skill_frontmatters
+from .utils import load_all_skill_frontmatters, setup_logging
 from .tools import (
     bash,
     edit_file,
@@ -81,4 +81,5 @@ def create_root_agent() -> Agent:
 
 
 # ADK CLI entry point
+setup_logging()
 root_agent = create_root_agent()
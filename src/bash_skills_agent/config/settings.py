@@ -45,6 +45,10 @@ class Settings(BaseSettings):
     web_fetch_timeout: int = 15
     web_fetch_max_length: int = 50_000
     web_search_region: str = "kr-kr"
+    web_search_cache_ttl: int = 300  # seconds; 0 disables the cache
+    web_search_cache_db: str = ""  # SQLite file that keeps results across restarts
+    web_search_max_concurrency: int = 4
+    web_search_proxies: list[str] = []  # JSON list, e.g. ["socks5://host:port"]
 
     # MCP
     mcp_servers: str = ""
@@ -7,6 +7,7 @@ import logging
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+import httpx
 from google.adk.sessions import (
     DatabaseSessionService,
     InMemorySessionService,
@@ -27,6 +28,7 @@ logger = logging.getLogger(__name__)
 
 # Global singleton instances
 _session_service = None
+_http_client: httpx.AsyncClient | None = None
 _container_managers: dict[str, object] = {}  # session_id → ContainerManager
 
 
@@ -67,6 +69,22 @@ def get_session_service():
     return _session_service
 
 
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client used by the web tools.
+
+    Keeping one client alive lets repeated fetches reuse pooled
+    connections instead of redoing the TCP and TLS handshakes.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=settings.web_fetch_timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            headers={"User-Agent": "Mozilla/5.0 (compatible; BashSkillsAgentBot/1.0)"},
+        )
+    return _http_client
+
 
 def resolve_skills_dir() -> str:
     """Resolve the skills directory path from settings or default."""
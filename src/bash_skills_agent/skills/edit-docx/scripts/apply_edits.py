@@ -2,20 +2,75 @@
 """Apply edits to an extracted DOCX document.xml."""
 
 import copy
+import functools
+import io
 import json
 import os
 import re
 import sys
-from xml.etree import ElementTree as ET
+from dataclasses import dataclass, field
+
+try:
+    from lxml import etree as ET
+except ImportError:
+    from xml.etree import ElementTree as ET
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 NAMESPACES = {
     "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
     "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
 }
 
+_W = NAMESPACES["w"]
+_TAG_P = f"{{{_W}}}p"
+_TAG_P_PR = f"{{{_W}}}pPr"
+_TAG_R = f"{{{_W}}}r"
+_TAG_T = f"{{{_W}}}t"
+_TAG_BOOKMARK_START = f"{{{_W}}}bookmarkStart"
+_TAG_BOOKMARK_END = f"{{{_W}}}bookmarkEnd"
+_TAG_TR = f"{{{_W}}}tr"
+_TAG_TR_PR = f"{{{_W}}}trPr"
+_TAG_TBL_HEADER = f"{{{_W}}}tblHeader"
+_TAG_TC = f"{{{_W}}}tc"
+_TAG_TC_PR = f"{{{_W}}}tcPr"
+_TAG_TC_W = f"{{{_W}}}tcW"
+_TAG_GRID_COL = f"{{{_W}}}gridCol"
+_ATTR_W = f"{{{_W}}}w"
+_ATTR_TYPE = f"{{{_W}}}type"
+_XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
 for _pfx, _uri in NAMESPACES.items():
     ET.register_namespace(_pfx, _uri)
 
+
+def _compile_path(path):
+    """Return a callable that finds all matches of *path* under an element.
+
+    Uses a precompiled XPath under lxml and ElementTree's findall otherwise.
+    """
+    if hasattr(ET, "XPath"):
+        return ET.XPath(path, namespaces=NAMESPACES)
+    return lambda elem: elem.findall(path, NAMESPACES)
+
+
+_XP_TR = _compile_path("w:tr")
+_XP_TR_DESC = _compile_path(".//w:tr")
+_XP_TC = _compile_path("w:tc")
+_XP_TC_DESC = _compile_path(".//w:tc")
+_XP_P = _compile_path("w:p")
+_XP_GRID_COL = _compile_path("w:gridCol")
+
 _NON_TEXT_INDICATORS = (
     "AlternateContent",
     "<w:drawing",
@@ -25,12 +80,23 @@ _NON_TEXT_INDICATORS = (
     "<v:shape",
     "<v:group",
 )
+_NON_TEXT_RE = re.compile("|".join(re.escape(s) for s in _NON_TEXT_INDICATORS))
+
+
+# Characters XML 1.0 does not allow; lxml refuses them in .text and
+# ElementTree would write them out as-is, so both drop them instead.
+_XML_ILLEGAL_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+
+def _xml_text(text):
+    """Remove characters that cannot appear in XML text (e.g. \\x0b from Word)."""
+    return _XML_ILLEGAL_CHARS.sub("", text)
 
 
 def escape_xml(text):
-    """Escape XML reserved characters."""
+    """Escape XML reserved characters and drop ones XML cannot hold."""
     return (
-        text.replace("&", "&amp;")
+        _xml_text(text).replace("&", "&amp;")
         .replace("<", "&lt;")
         .replace(">", "&gt;")
         .replace('"', "&quot;")
@@ -38,41 +104,149 @@ def escape_xml(text):
     )
 
 
+@functools.lru_cache(maxsize=4096)
+def _escape_cell_text(text):
+    """escape_xml for table cell text, which repeats heavily across rows."""
+    return escape_xml(text)
+
+
+# Block-id coordinates: "b12:r3c1p0" and friends, and the part after ":".
+_CELL_PARA_ID_RE = re.compile(r"b\d+:r(\d+)c(\d+)p(\d+)")
+_ROW_ID_RE = re.compile(r"b\d+:r(\d+)$")
+_ROW_NUM_RE = re.compile(r"r(\d+)")
+_SUB_PARA_RE = re.compile(r"p(\d+)$")
+_SUB_ROW_RE = re.compile(r"r(\d+)$")
+_SUB_COL_RE = re.compile(r"c(\d+)$")
+_SUB_CELL_PARA_RE = re.compile(r"r(\d+)c(\d+)p(\d+)$")
+
+_T_OPEN_RE = re.compile(r"<w:t(?:\s[^>]*)?>")
+_T_OPEN_WITH_ATTRS_RE = re.compile(r"<w:t\s")
+
+
+def _add_space_preserve(m):
+    tag = m.group(0)
+    if "xml:space" in tag:
+        return tag
+    return tag[:-1] + ' xml:space="preserve">'
+
+
 def _ensure_t_space_preserve(run_xml):
     """Ensure <w:t> elements have xml:space='preserve'."""
-    import re
-    def _add_attr(m):
-        tag = m.group(0)
-        if "xml:space" in tag:
-            return tag
-        return tag[:-1] + ' xml:space="preserve">'
-    return re.sub(r"<w:t(?:\s[^>]*)?>", _add_attr, run_xml)
+    if "<w:t" not in run_xml:
+        return run_xml
+    # Only bare <w:t> tags: nothing to inspect, a literal replace suffices.
+    if not _T_OPEN_WITH_ATTRS_RE.search(run_xml):
+        return run_xml.replace("<w:t>", '<w:t xml:space="preserve">')
+    return _T_OPEN_RE.sub(_add_space_preserve, run_xml)
+
+
+@functools.lru_cache(maxsize=None)
+def _split_run_template(rpr_xml):
+    """Split a run template around {{content}} with xml:space fixed up once."""
+    return tuple(_ensure_t_space_preserve(rpr_xml).split("{{content}}"))
+
+
+def _render_run(rpr_xml, escaped):
+    """Fill an already-escaped text into a run template."""
+    return escaped.join(_split_run_template(rpr_xml))
+
+
+_TEXT_MARKER = "\ue000"
+_TAG_CONTENT_SLOT = f"{{{_W}}}contentSlot"
+
+
+@functools.lru_cache(maxsize=None)
+def _paragraph_prototype(ppr_xml, rpr_xml):
+    """Parse a paragraph once with a marker where its text goes.
+
+    rpr_xml=None means a plain run. Returns None if the templates are not
+    well-formed.
+    """
+    if rpr_xml is None:
+        run_xml = f'<w:r><w:t xml:space="preserve">{_TEXT_MARKER}</w:t></w:r>'
+    else:
+        run_xml = _render_run(rpr_xml, _TEXT_MARKER)
+    try:
+        return ET.fromstring(f'<w:p xmlns:w="{_W}">{ppr_xml}{run_xml}</w:p>')
+    except ET.ParseError:
+        return None
+
+
+def _fill_paragraph(prototype, text):
+    """Return a copy of *prototype* with *text* in place of the marker."""
+    if "\r" in text:
+        # Match what parsing the text as XML would have produced.
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _xml_text(text)
+    para = copy.deepcopy(prototype)
+    for t in para.iter(_TAG_T):
+        if t.text and _TEXT_MARKER in t.text:
+            t.text = t.text.replace(_TEXT_MARKER, text)
+    return para
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_cell_shell(tc_xml):
+    """Parse a cell alias shell once, with its tcPr/tcW already in place.
+
+    Returns (shell, index, tail, tc_pr_pos, tc_w_pos) where index is the
+    child position that {{content}} occupied and the last two locate the
+    tcW element, or None if the shell cannot be used this way.
+    """
+    if tc_xml.count("{{content}}") != 1:
+        return None
+    slot = f'<w:contentSlot xmlns:w="{_W}"/>'
+    try:
+        shell = ET.fromstring(tc_xml.replace("{{content}}", slot))
+    except ET.ParseError:
+        return None
+    for i, child in enumerate(shell):
+        if child.tag == _TAG_CONTENT_SLOT:
+            shell.remove(child)
+            break
+    else:
+        return None
+    index, tail = i, child.tail
 
+    # Same tcPr/tcW fix-up _build_cell_from_tc_xml applies to every cell,
+    # done once here so copies only need their width set.
+    tc_pr = shell.find(_TAG_TC_PR)
+    if tc_pr is None:
+        tc_pr = ET.Element(_TAG_TC_PR)
+        shell.insert(0, tc_pr)
+        index += 1
+    tc_w = tc_pr.find(_TAG_TC_W)
+    if tc_w is None:
+        tc_w = ET.SubElement(tc_pr, _TAG_TC_W)
+    tc_w.set(_ATTR_W, tc_w.get(_ATTR_W, "0"))
+    tc_w.set(_ATTR_TYPE, "dxa")
+    return (
+        shell, index, tail,
+        _child_index(shell, tc_pr), _child_index(tc_pr, tc_w),
+    )
 
-def _resolve_style_key(style_alias, style_alias_map, fallback=""):
-    """Resolve a style alias (S1, S2...) to a style_key via the alias map."""
-    if not style_alias:
-        return fallback
-    return style_alias_map.get(style_alias, fallback)
+
+def _first_rst(run_style_templates):
+    """Return the first run style template, or None if there are none."""
+    return next(iter(run_style_templates.values()), None)
 
 
 def _build_run_xml_from_template(new_text, run_style_templates):
     """Build a single <w:r> XML using the first run style template."""
     if not run_style_templates:
         return []
-    first_rst = next(iter(run_style_templates.values()))
-    rpr_xml = first_rst.get("rpr_xml", "")
+    rpr_xml = _first_rst(run_style_templates).get("rpr_xml", "")
     if not rpr_xml:
         return []
     escaped = escape_xml(new_text)
-    return [_ensure_t_space_preserve(rpr_xml.replace("{{content}}", escaped))]
+    return [_render_run(rpr_xml, escaped)]
 
 
 def _build_run_xmls_from_spec(runs_spec, run_style_templates):
     """Build <w:r> XML strings from an explicit runs specification."""
     if not run_style_templates:
         return []
-    first_rst = next(iter(run_style_templates.values()))
+    first_rst = _first_rst(run_style_templates)
     result = []
     for spec in runs_spec:
         text = spec.get("text", "")
@@ -82,209 +256,256 @@ def _build_run_xmls_from_spec(runs_spec, run_style_templates):
         if not rpr_xml:
             continue
         escaped = escape_xml(text)
-        result.append(_ensure_t_space_preserve(rpr_xml.replace("{{content}}", escaped)))
+        result.append(_render_run(rpr_xml, escaped))
     return result
 
 
-def generate_new_blocks(edits, analysis):
-    """Generate new_block dicts from edits + analysis (Phase A)."""
-    style_alias_map = analysis.get("style_alias_map", {})
-    paragraph_style_templates = analysis.get("paragraph_style_templates", {})
-    blocks = analysis.get("blocks", [])
+@dataclass(slots=True)
+class NewBlock:
+    """One edit resolved against the analysis (Phase A output)."""
 
-    id_to_block = {b["id"]: b for b in blocks}
+    action: str
+    target_id: str
+    base_id: str
+    sub_coord: str
+    style_key: str = ""
+    content: str = ""
+    run_xmls: list = field(default_factory=list)
+    edit_unit: str | None = None
+    row_style_aliases: list | None = None
+    cell_style_aliases: list | None = None
 
-    new_blocks = []
 
-    for edit in edits:
-        action = edit.get("action", "")
-        target_id = edit.get("target_id", "")
-        semantic_tag = edit.get("semantic_tag", "")
-        new_text = edit.get("new_text", "")
-        style_alias = edit.get("style_alias")
-        edit_unit = edit.get("edit_unit")
-
-        base_id = target_id.split(":")[0]
-
-        if action == "delete":
-            nb = {
-                "action": "delete",
-                "target_id": target_id,
-                "style_key": "",
-                "content": "",
-                "run_xmls": [],
-                "edit_unit": edit_unit,
-                "row_style_aliases": None,
-                "cell_style_aliases": None,
-            }
-            new_blocks.append(nb)
-            continue
+def _build_id_to_idx(blocks):
+    """Map block id -> position in the blocks list."""
+    return {b["id"]: i for i, b in enumerate(blocks)}
 
-        if action in ("insert_after", "insert_before"):
-            if semantic_tag == "TBL" or edit_unit:
-                style_key = ""
-                tbl_alias = edit.get("table_style_alias") or style_alias
-                if edit_unit == "table" and tbl_alias:
-                    style_key = _resolve_style_key(
-                        tbl_alias, style_alias_map,
-                    )
-                nb = {
-                    "action": action,
-                    "target_id": target_id,
-                    "style_key": style_key,
-                    "content": new_text or "",
-                    "run_xmls": [],
-                    "edit_unit": edit_unit,
-                    "row_style_aliases": edit.get("row_style_aliases"),
-                    "cell_style_aliases": edit.get("cell_style_aliases"),
-                }
-                new_blocks.append(nb)
-                continue
 
-            style_key = _resolve_style_key(
-                style_alias, style_alias_map,
-            )
-            if not style_key:
-                if paragraph_style_templates:
-                    style_key = next(iter(paragraph_style_templates))
-
-            run_xmls = []
-            runs_spec = edit.get("runs")
-            edit_rst = edit.get("run_style_templates")
-            if not edit_rst:
-                pst = paragraph_style_templates.get(style_key, {})
-                edit_rst = pst.get("run_style_templates", {})
-            if edit_rst and new_text:
-                if runs_spec and isinstance(runs_spec, list):
-                    run_xmls = _build_run_xmls_from_spec(runs_spec, edit_rst)
-                else:
-                    run_xmls = _build_run_xml_from_template(new_text, edit_rst)
-
-            nb = {
-                "action": action,
-                "target_id": target_id,
-                "style_key": style_key,
-                "content": new_text or "",
-                "run_xmls": run_xmls,
-                "edit_unit": None,
-                "row_style_aliases": None,
-                "cell_style_aliases": None,
-            }
-            new_blocks.append(nb)
-            continue
+def _get_id_to_idx(analysis):
+    """Return the block id index, built once and kept on the analysis."""
+    id_to_idx = analysis.get("_id_to_idx")
+    if id_to_idx is None:
+        id_to_idx = _build_id_to_idx(analysis.get("blocks", []))
+        analysis["_id_to_idx"] = id_to_idx
+    return id_to_idx
 
-        if action == "replace":
-            if semantic_tag == "TBL" or edit_unit:
-                style_key = ""
-                if style_alias:
-                    style_key = _resolve_style_key(
-                        style_alias, style_alias_map,
-                    )
-                nb = {
-                    "action": "replace",
-                    "target_id": target_id,
-                    "style_key": style_key,
-                    "content": new_text or "",
-                    "run_xmls": [],
-                    "edit_unit": edit_unit,
-                    "row_style_aliases": edit.get("row_style_aliases"),
-                    "cell_style_aliases": edit.get("cell_style_aliases"),
-                }
-                new_blocks.append(nb)
-                continue
 
-            block = id_to_block.get(base_id)
-            style_key = ""
-            if style_alias:
-                style_key = _resolve_style_key(
-                    style_alias, style_alias_map,
-                )
-            if not style_key and block:
-                style_key = block.get("style_key", "")
-
-            run_xmls = []
-            if block and new_text:
-                xml_str = block.get("xml", "")
-                if not _has_non_text_content(xml_str):
-                    edit_rst = edit.get("run_style_templates")
-                    if not edit_rst:
-                        pst = paragraph_style_templates.get(style_key, {})
-                        edit_rst = pst.get("run_style_templates", {})
-                    if edit_rst:
-                        runs_spec = edit.get("runs")
-                        if runs_spec and isinstance(runs_spec, list):
-                            run_xmls = _build_run_xmls_from_spec(
-                                runs_spec, edit_rst,
-                            )
-                        else:
-                            run_xmls = _build_run_xml_from_template(
-                                new_text, edit_rst,
-                            )
+@dataclass(slots=True)
+class _PhaseAContext:
+    """Analysis lookups shared by the per-action Phase A handlers."""
+
+    style_alias_map: dict
+    paragraph_style_templates: dict
+    blocks: list
+    id_to_idx: dict
+    # Style used when an inserted paragraph's alias does not resolve.
+    default_style_key: str
+
+
+def _build_edit_run_xmls(edit, new_text, style_key, paragraph_style_templates):
+    """Build run XMLs for a paragraph edit from its runs or style template."""
+    edit_rst = edit.get("run_style_templates")
+    if not edit_rst:
+        pst = paragraph_style_templates.get(style_key, {})
+        edit_rst = pst.get("run_style_templates", {})
+    if not edit_rst:
+        return []
+    runs_spec = edit.get("runs")
+    if runs_spec and isinstance(runs_spec, list):
+        return _build_run_xmls_from_spec(runs_spec, edit_rst)
+    return _build_run_xml_from_template(new_text, edit_rst)
+
+
+def _new_block_for_delete(edit, base_id, sub_coord, ctx):
+    return NewBlock(
+        action="delete",
+        target_id=edit.get("target_id", ""),
+        base_id=base_id,
+        sub_coord=sub_coord,
+        edit_unit=edit.get("edit_unit"),
+    )
+
+
+def _new_block_for_insert(edit, base_id, sub_coord, ctx):
+    new_text = edit.get("new_text", "")
+    style_alias = edit.get("style_alias")
+    edit_unit = edit.get("edit_unit")
+
+    if edit.get("semantic_tag", "") == "TBL" or edit_unit:
+        style_key = ""
+        tbl_alias = edit.get("table_style_alias") or style_alias
+        if edit_unit == "table" and tbl_alias:
+            style_key = ctx.style_alias_map.get(tbl_alias, "")
+        return NewBlock(
+            action=edit["action"],
+            target_id=edit.get("target_id", ""),
+            base_id=base_id,
+            sub_coord=sub_coord,
+            style_key=style_key,
+            content=new_text or "",
+            edit_unit=edit_unit,
+            row_style_aliases=edit.get("row_style_aliases"),
+            cell_style_aliases=edit.get("cell_style_aliases"),
+        )
+
+    style_key = (
+        ctx.style_alias_map.get(style_alias, "") if style_alias else ""
+    )
+    if not style_key:
+        style_key = ctx.default_style_key
+
+    run_xmls = []
+    if new_text:
+        run_xmls = _build_edit_run_xmls(
+            edit, new_text, style_key, ctx.paragraph_style_templates,
+        )
+
+    return NewBlock(
+        action=edit["action"],
+        target_id=edit.get("target_id", ""),
+        base_id=base_id,
+        sub_coord=sub_coord,
+        style_key=style_key,
+        content=new_text or "",
+        run_xmls=run_xmls,
+    )
+
+
+def _new_block_for_replace(edit, base_id, sub_coord, ctx):
+    new_text = edit.get("new_text", "")
+    style_alias = edit.get("style_alias")
+    edit_unit = edit.get("edit_unit")
+
+    if edit.get("semantic_tag", "") == "TBL" or edit_unit:
+        style_key = ""
+        if style_alias:
+            style_key = ctx.style_alias_map.get(style_alias, "")
+        return NewBlock(
+            action="replace",
+            target_id=edit.get("target_id", ""),
+            base_id=base_id,
+            sub_coord=sub_coord,
+            style_key=style_key,
+            content=new_text or "",
+            edit_unit=edit_unit,
+            row_style_aliases=edit.get("row_style_aliases"),
+            cell_style_aliases=edit.get("cell_style_aliases"),
+        )
+
+    block_idx = ctx.id_to_idx.get(base_id)
+    block = ctx.blocks[block_idx] if block_idx is not None else None
+    style_key = ""
+    if style_alias:
+        style_key = ctx.style_alias_map.get(style_alias, "")
+    if not style_key and block:
+        style_key = block.get("style_key", "")
+
+    run_xmls = []
+    if (block and new_text
+            and not _has_non_text_content(block.get("xml", ""))):
+        run_xmls = _build_edit_run_xmls(
+            edit, new_text, style_key, ctx.paragraph_style_templates,
+        )
+
+    return NewBlock(
+        action="replace",
+        target_id=edit.get("target_id", ""),
+        base_id=base_id,
+        sub_coord=sub_coord,
+        style_key=style_key,
+        content=new_text or "",
+        run_xmls=run_xmls,
+        edit_unit=edit_unit,
+        row_style_aliases=edit.get("row_style_aliases"),
+        cell_style_aliases=edit.get("cell_style_aliases"),
+    )
+
+
+_NEW_BLOCK_HANDLERS = {
+    "delete": _new_block_for_delete,
+    "insert_after": _new_block_for_insert,
+    "insert_before": _new_block_for_insert,
+    "replace": _new_block_for_replace,
+}
+
 
-            nb = {
-                "action": "replace",
-                "target_id": target_id,
-                "style_key": style_key,
-                "content": new_text or "",
-                "run_xmls": run_xmls,
-                "edit_unit": edit_unit,
-                "row_style_aliases": edit.get("row_style_aliases"),
-                "cell_style_aliases": edit.get("cell_style_aliases"),
-            }
-            new_blocks.append(nb)
+def generate_new_blocks(edits, analysis):
+    """Generate NewBlock records from edits + analysis (Phase A)."""
+    paragraph_style_templates = analysis.get("paragraph_style_templates", {})
+    ctx = _PhaseAContext(
+        style_alias_map=analysis.get("style_alias_map", {}),
+        paragraph_style_templates=paragraph_style_templates,
+        blocks=analysis.get("blocks", []),
+        id_to_idx=_get_id_to_idx(analysis),
+        default_style_key=next(iter(paragraph_style_templates), ""),
+    )
+
+    new_blocks = []
+    for edit in edits:
+        handler = _NEW_BLOCK_HANDLERS.get(edit.get("action", ""))
+        if handler is None:
+            continue
+        base_id, _, sub_coord = edit.get("target_id", "").partition(":")
+        new_blocks.append(handler(edit, base_id, sub_coord, ctx))
 
     return new_blocks
 
 
 def _has_non_text_content(xml_str):
     """Detect images/drawings in paragraph XML."""
-    for indicator in _NON_TEXT_INDICATORS:
-        if indicator in xml_str:
-            return True
-    return False
+    return _NON_TEXT_RE.search(xml_str) is not None
 
 
 def _extract_bookmarks_xml(xml_str):
     """Extract bookmarkStart/End XML strings from a paragraph."""
+    # Most paragraphs carry no bookmarks; skip the parse for those.
+    if "bookmark" not in xml_str:
+        return [], []
     try:
         root = ET.fromstring(xml_str)
     except ET.ParseError:
         return [], []
-    ns_w = NAMESPACES["w"]
     starts = [ET.tostring(e, encoding="unicode")
-              for e in root.findall(f"{{{ns_w}}}bookmarkStart")]
+              for e in root.findall(_TAG_BOOKMARK_START)]
     ends = [ET.tostring(e, encoding="unicode")
-            for e in root.findall(f"{{{ns_w}}}bookmarkEnd")]
+            for e in root.findall(_TAG_BOOKMARK_END)]
     return starts, ends
 
 
+def _parse_fragments(xml_strs):
+    """Parse XML fragment strings, skipping any that are malformed."""
+    elems = []
+    for xml_str in xml_strs:
+        try:
+            elems.append(ET.fromstring(xml_str))
+        except ET.ParseError:
+            pass
+    return elems
+
+
 def _inject_bookmarks_into_para(para_xml, bk_starts, bk_ends):
-    """Inject bookmark elements into a paragraph XML string."""
+    """Inject bookmark elements into a paragraph XML string.
+
+    Returns the paragraph element, left for the final body join to
+    serialize, or para_xml unchanged if there is nothing to do.
+    """
     if not bk_starts and not bk_ends:
         return para_xml
     try:
         root = ET.fromstring(para_xml)
-        ns_w = NAMESPACES["w"]
-
-        ppr = root.find(f"{{{ns_w}}}pPr")
-        children = list(root)
-        insert_idx = (children.index(ppr) + 1) if ppr is not None else 0
+    except ET.ParseError:
+        return para_xml
 
-        for bk_xml_str in reversed(bk_starts):
-            try:
-                root.insert(insert_idx, ET.fromstring(bk_xml_str))
-            except ET.ParseError:
-                pass
+    ppr = root.find(_TAG_P_PR)
+    insert_idx = 0
+    if ppr is not None:
+        insert_idx = next(i for i, c in enumerate(root) if c is ppr) + 1
 
-        for bk_xml_str in bk_ends:
-            try:
-                root.append(ET.fromstring(bk_xml_str))
-            except ET.ParseError:
-                pass
+    for offset, start in enumerate(_parse_fragments(bk_starts)):
+        root.insert(insert_idx + offset, start)
+    root.extend(_parse_fragments(bk_ends))
 
-        return ET.tostring(root, encoding="unicode")
-    except ET.ParseError:
-        return para_xml
+    return root
 
 
 def _normalize_newlines(text):
@@ -295,126 +516,136 @@ def _normalize_newlines(text):
 
 
 def _replace_text_preserving_structure(original_xml, new_text):
-    """In-place text replacement preserving paragraph structure."""
+    """In-place text replacement preserving paragraph structure.
+
+    Returns the edited paragraph element, or original_xml if it does not
+    parse.
+    """
     try:
         root = ET.fromstring(original_xml)
     except ET.ParseError:
         return original_xml
 
-    first_set = False
-    for run in root.findall(".//w:r", NAMESPACES):
-        for t in run.findall("w:t", NAMESPACES):
-            if not first_set:
-                t.text = new_text
-                t.set(
-                    "{http://www.w3.org/XML/1998/namespace}space",
-                    "preserve",
-                )
-                first_set = True
-            else:
-                t.text = ""
+    t_elems = root.findall(".//w:r/w:t", NAMESPACES)
+    if t_elems:
+        t_elems[0].text = _xml_text(new_text)
+        t_elems[0].set(_XML_SPACE, "preserve")
+        for t in t_elems[1:]:
+            t.text = ""
+
+    return root
+
+
+# Edit marks collected per block by apply_mapping_to_blocks.
+_MARK_LIST_KEYS = (
+    "_replacements",
+    "_row_deletions",
+    "_col_deletions",
+    "_para_deletions",
+    "_inserts_after",
+    "_inserts_before",
+    "_col_inserts_after",
+    "_col_inserts_before",
+    "_sdt_entry_inserts",
+    "_sdt_entry_deletions",
+)
 
-    return ET.tostring(root, encoding="unicode")
 
+def apply_mapping_to_blocks(blocks, new_blocks, id_to_idx=None):
+    """Mark blocks with internal edit flags from new_blocks.
 
-def apply_mapping_to_blocks(blocks, new_blocks):
-    """Mark blocks with internal edit flags from new_blocks."""
-    blocks = [dict(b) for b in blocks]
-    id_to_idx = {b["id"]: i for i, b in enumerate(blocks)}
+    Only blocks that receive a mark are copied; the rest are returned
+    as-is, so the input list is never mutated.
+    """
+    if id_to_idx is None:
+        id_to_idx = _build_id_to_idx(blocks)
+    marked = {}
 
     for nb in new_blocks:
-        target_id = nb["target_id"].split(":")[0]
+        target_id = nb.base_id
         if target_id not in id_to_idx:
-            print(f"  [WARN] Target ID not found: {nb['target_id']}")
+            print(f"  [WARN] Target ID not found: {nb.target_id}")
             continue
 
         idx = id_to_idx[target_id]
-        block_type = blocks[idx].get("type", "")
+        block = marked.get(idx)
+        if block is None:
+            block = marked[idx] = dict(blocks[idx])
+            for key in _MARK_LIST_KEYS:
+                block[key] = []
+        block_type = block.get("type", "")
         is_table = block_type == "tbl"
         is_sdt = block_type == "sdt"
 
-        sub_coord = (
-            nb["target_id"][len(target_id) + 1:]
-            if ":" in nb["target_id"]
-            else ""
-        )
+        sub_coord = nb.sub_coord
 
-        action = nb["action"]
+        action = nb.action
 
         if action == "replace":
-            blocks[idx]["_replaced"] = True
-            if "_replacements" not in blocks[idx]:
-                blocks[idx]["_replacements"] = []
-            blocks[idx]["_replacements"].append({
-                "style_key": nb.get("style_key", ""),
-                "content": nb.get("content", ""),
-                "original_target_id": nb["target_id"],
-                "edit_unit": nb.get("edit_unit"),
-                "run_xmls": list(nb.get("run_xmls") or []),
-                "row_style_aliases": nb.get("row_style_aliases"),
-                "cell_style_aliases": nb.get("cell_style_aliases"),
+            block["_replaced"] = True
+            block["_replacements"].append({
+                "style_key": nb.style_key,
+                "content": nb.content,
+                "original_target_id": nb.target_id,
+                "edit_unit": nb.edit_unit,
+                "run_xmls": list(nb.run_xmls),
+                "row_style_aliases": nb.row_style_aliases,
+                "cell_style_aliases": nb.cell_style_aliases,
             })
 
         elif action == "delete":
-            sdt_para_match = re.match(r"p(\d+)$", sub_coord)
+            sdt_para_match = _SUB_PARA_RE.match(sub_coord)
             if is_sdt and sdt_para_match:
                 p_idx = int(sdt_para_match.group(1))
-                blocks[idx].setdefault("_sdt_entry_deletions", []).append(
+                block["_sdt_entry_deletions"].append(
                     p_idx,
                 )
-                blocks[idx]["_replaced"] = True
-                blocks[idx].setdefault("_replacements", [])
+                block["_replaced"] = True
                 continue
 
-            row_match = re.match(r"r(\d+)$", sub_coord)
-            col_match = re.match(r"c(\d+)$", sub_coord)
+            row_match = _SUB_ROW_RE.match(sub_coord)
+            col_match = _SUB_COL_RE.match(sub_coord)
 
-            eu = nb.get("edit_unit")
+            eu = nb.edit_unit
             is_row_del = (eu == "row") if eu else (is_table and row_match is not None)
             is_col_del = (eu == "column") if eu else (is_table and col_match is not None)
 
             if is_row_del and row_match:
                 r_idx = int(row_match.group(1))
-                blocks[idx].setdefault("_row_deletions", []).append(r_idx)
-                blocks[idx]["_replaced"] = True
-                blocks[idx].setdefault("_replacements", [])
+                block["_row_deletions"].append(r_idx)
+                block["_replaced"] = True
             elif is_col_del and col_match:
                 c_idx = int(col_match.group(1))
-                blocks[idx].setdefault("_col_deletions", []).append(c_idx)
-                blocks[idx]["_replaced"] = True
-                blocks[idx].setdefault("_replacements", [])
+                block["_col_deletions"].append(c_idx)
+                block["_replaced"] = True
             else:
-                cell_para_del = re.match(r"r(\d+)c(\d+)p(\d+)$", sub_coord)
+                cell_para_del = _SUB_CELL_PARA_RE.match(sub_coord)
                 if is_table and cell_para_del:
-                    blocks[idx].setdefault("_para_deletions", []).append({
+                    block["_para_deletions"].append({
                         "row_idx": int(cell_para_del.group(1)),
                         "col_idx": int(cell_para_del.group(2)),
                         "para_idx": int(cell_para_del.group(3)),
                     })
-                    blocks[idx]["_replaced"] = True
-                    blocks[idx].setdefault("_replacements", [])
+                    block["_replaced"] = True
                 else:
-                    blocks[idx]["_deleted"] = True
+                    block["_deleted"] = True
 
         elif action == "insert_after":
-            sdt_para_match = re.match(r"p(\d+)$", sub_coord)
+            sdt_para_match = _SUB_PARA_RE.match(sub_coord)
             if is_sdt and sdt_para_match:
                 p_idx = int(sdt_para_match.group(1))
-                insert_list = blocks[idx].setdefault(
-                    "_sdt_entry_inserts", [],
-                )
+                insert_list = block["_sdt_entry_inserts"]
                 insert_list.append({
                     "para_idx": p_idx,
-                    "content": nb.get("content", ""),
+                    "content": nb.content,
                     "insert_after": True,
                     "_insert_order": len(insert_list),
                 })
-                blocks[idx]["_replaced"] = True
-                blocks[idx].setdefault("_replacements", [])
+                block["_replaced"] = True
                 continue
 
-            col_match_ia = re.match(r"c(\d+)$", sub_coord)
-            eu_ia = nb.get("edit_unit")
+            col_match_ia = _SUB_COL_RE.match(sub_coord)
+            eu_ia = nb.edit_unit
             is_col_insert_ia = (
                 (eu_ia == "column")
                 if eu_ia
@@ -423,53 +654,49 @@ def apply_mapping_to_blocks(blocks, new_blocks):
 
             if is_col_insert_ia and col_match_ia:
                 c_idx = int(col_match_ia.group(1))
-                cs_aliases = nb.get("cell_style_aliases") or []
+                cs_aliases = nb.cell_style_aliases or []
                 if cs_aliases and isinstance(cs_aliases[0], list):
                     cs_aliases = [row[0] for row in cs_aliases if row]
-                blocks[idx].setdefault("_col_inserts_after", []).append({
+                block["_col_inserts_after"].append({
                     "col_idx": c_idx,
-                    "content": nb.get("content", ""),
-                    "original_target_id": nb["target_id"],
+                    "content": nb.content,
+                    "original_target_id": nb.target_id,
                     "cell_style_aliases": cs_aliases,
-                    "style_key": nb.get("style_key", ""),
+                    "style_key": nb.style_key,
                 })
-                blocks[idx]["_replaced"] = True
-                blocks[idx].setdefault("_replacements", [])
+                block["_replaced"] = True
             elif is_col_insert_ia and not col_match_ia:
                 raise ValueError(
                     f"Column insert_after requires bN:cN target_id format, "
-                    f"got '{nb['target_id']}'. sub_coord '{sub_coord}' does "
+                    f"got '{nb.target_id}'. sub_coord '{sub_coord}' does "
                     f"not match 'c(\\d+)$'."
                 )
             else:
-                blocks[idx].setdefault("_inserts_after", []).append({
-                    "style_key": nb.get("style_key", ""),
-                    "content": nb.get("content", ""),
-                    "original_target_id": nb["target_id"],
-                    "edit_unit": nb.get("edit_unit"),
-                    "row_style_aliases": nb.get("row_style_aliases"),
-                    "cell_style_aliases": nb.get("cell_style_aliases"),
+                block["_inserts_after"].append({
+                    "style_key": nb.style_key,
+                    "content": nb.content,
+                    "original_target_id": nb.target_id,
+                    "edit_unit": nb.edit_unit,
+                    "row_style_aliases": nb.row_style_aliases,
+                    "cell_style_aliases": nb.cell_style_aliases,
                 })
 
         elif action == "insert_before":
-            sdt_para_match = re.match(r"p(\d+)$", sub_coord)
+            sdt_para_match = _SUB_PARA_RE.match(sub_coord)
             if is_sdt and sdt_para_match:
                 p_idx = int(sdt_para_match.group(1))
-                insert_list = blocks[idx].setdefault(
-                    "_sdt_entry_inserts", [],
-                )
+                insert_list = block["_sdt_entry_inserts"]
                 insert_list.append({
                     "para_idx": p_idx,
-                    "content": nb.get("content", ""),
+                    "content": nb.content,
                     "insert_after": False,
                     "_insert_order": len(insert_list),
                 })
-                blocks[idx]["_replaced"] = True
-                blocks[idx].setdefault("_replacements", [])
+                block["_replaced"] = True
                 continue
 
-            col_match_ib = re.match(r"c(\d+)$", sub_coord)
-            eu_ib = nb.get("edit_unit")
+            col_match_ib = _SUB_COL_RE.match(sub_coord)
+            eu_ib = nb.edit_unit
             is_col_insert_ib = (
                 (eu_ib == "column")
                 if eu_ib
@@ -478,43 +705,48 @@ def apply_mapping_to_blocks(blocks, new_blocks):
 
             if is_col_insert_ib and col_match_ib:
                 c_idx = int(col_match_ib.group(1))
-                cs_aliases = nb.get("cell_style_aliases") or []
+                cs_aliases = nb.cell_style_aliases or []
                 if cs_aliases and isinstance(cs_aliases[0], list):
                     cs_aliases = [row[0] for row in cs_aliases if row]
-                blocks[idx].setdefault("_col_inserts_before", []).append({
+                block["_col_inserts_before"].append({
                     "col_idx": c_idx,
-                    "content": nb.get("content", ""),
-                    "original_target_id": nb["target_id"],
+                    "content": nb.content,
+                    "original_target_id": nb.target_id,
                     "cell_style_aliases": cs_aliases,
-                    "style_key": nb.get("style_key", ""),
+                    "style_key": nb.style_key,
                 })
-                blocks[idx]["_replaced"] = True
-                blocks[idx].setdefault("_replacements", [])
+                block["_replaced"] = True
             elif is_col_insert_ib and not col_match_ib:
                 raise ValueError(
                     f"Column insert_before requires bN:cN target_id format, "
-                    f"got '{nb['target_id']}'. sub_coord '{sub_coord}' does "
+                    f"got '{nb.target_id}'. sub_coord '{sub_coord}' does "
                     f"not match 'c(\\d+)$'."
                 )
             else:
-                blocks[idx].setdefault("_inserts_before", []).append({
-                    "style_key": nb.get("style_key", ""),
-                    "content": nb.get("content", ""),
-                    "original_target_id": nb["target_id"],
-                    "edit_unit": nb.get("edit_unit"),
-                    "row_style_aliases": nb.get("row_style_aliases"),
-                    "cell_style_aliases": nb.get("cell_style_aliases"),
+                block["_inserts_before"].append({
+                    "style_key": nb.style_key,
+                    "content": nb.content,
+                    "original_target_id": nb.target_id,
+                    "edit_unit": nb.edit_unit,
+                    "row_style_aliases": nb.row_style_aliases,
+                    "cell_style_aliases": nb.cell_style_aliases,
                 })
 
-    return blocks
+    return [marked.get(i, b) for i, b in enumerate(blocks)]
 
 
 def _build_block_xml(block_spec, paragraph_style_templates, table_style_templates,
-                     style_alias_map):
-    """Generate XML for a new/replacement block."""
+                     style_alias_map, content_override=None):
+    """Generate XML for a new/replacement block.
+
+    content_override, if given, is used instead of block_spec["content"].
+    """
     ns = NAMESPACES["w"]
     style_key = block_spec.get("style_key", "")
-    content = block_spec.get("content", "")
+    if content_override is None:
+        content = block_spec.get("content", "")
+    else:
+        content = content_override
     run_xmls = block_spec.get("run_xmls", [])
 
     if style_key in table_style_templates:
@@ -545,11 +777,9 @@ def _build_block_xml(block_spec, paragraph_style_templates, table_style_template
 
     rst_dict = template.get("run_style_templates", {})
     if rst_dict:
-        first_rst = next(iter(rst_dict.values()))
+        rpr_xml = _first_rst(rst_dict).get("rpr_xml", "")
         escaped = escape_xml(content)
-        run_xml = _ensure_t_space_preserve(
-            first_rst.get("rpr_xml", "").replace("{{content}}", escaped)
-        )
+        run_xml = _render_run(rpr_xml, escaped)
         ppr = template.get("ppr_xml_template") or f'<w:pPr xmlns:w="{ns}"/>'
         return f'<w:p xmlns:w="{ns}">{ppr}{run_xml}</w:p>'
 
@@ -565,16 +795,12 @@ def _append_paragraphs_from_content(body_parts, template, content, ns):
     """Append one or more paragraphs from template + plain content."""
     rst_dict = template.get("run_style_templates", {})
     ppr = template.get("ppr_xml_template") or f'<w:pPr xmlns:w="{ns}"/>'
+    rpr_xml = _first_rst(rst_dict).get("rpr_xml", "") if rst_dict else ""
 
     def _build_para(text):
         escaped = escape_xml(text)
         if rst_dict:
-            first_rst = next(iter(rst_dict.values()))
-            run_xml = _ensure_t_space_preserve(
-                first_rst.get("rpr_xml", "").replace(
-                    "{{content}}", escaped,
-                )
-            )
+            run_xml = _render_run(rpr_xml, escaped)
         else:
             run_xml = (
                 f'<w:r xmlns:w="{ns}">'
@@ -590,463 +816,468 @@ def _append_paragraphs_from_content(body_parts, template, content, ns):
         body_parts.append(_build_para(content))
 
 
-def _table_replace_paragraph(table_xml, r_idx, c_idx, p_idx, new_text,
+def _table_replace_paragraph(root, r_idx, c_idx, p_idx, new_text,
                              run_xmls=None, style_key="",
-                             paragraph_style_templates=None):
-    """Replace text in a specific paragraph within a table cell."""
-    try:
-        root = ET.fromstring(table_xml)
-        xml_rows = root.findall(".//w:tr", NAMESPACES)
-        if r_idx >= len(xml_rows):
-            return table_xml
-
-        xml_cells = xml_rows[r_idx].findall(".//w:tc", NAMESPACES)
-        if c_idx >= len(xml_cells):
-            return table_xml
-
-        target_cell = xml_cells[c_idx]
-        paragraphs = target_cell.findall("w:p", NAMESPACES)
-        if p_idx >= len(paragraphs):
-            return table_xml
-
-        target_para = paragraphs[p_idx]
-
-        if run_xmls:
-            existing_runs = target_para.findall("w:r", NAMESPACES)
-            for run in existing_runs:
-                target_para.remove(run)
-            for run_xml_str in run_xmls:
-                try:
-                    new_run = ET.fromstring(run_xml_str)
-                    target_para.append(new_run)
-                except ET.ParseError:
-                    pass
+                             paragraph_style_templates=None, xml_rows=None):
+    """Replace text in a specific paragraph within a table cell.
+
+    xml_rows may carry the table's rows from an earlier lookup when the
+    caller knows they have not changed since.
+    """
+    if xml_rows is None:
+        xml_rows = _XP_TR_DESC(root)
+    if r_idx >= len(xml_rows):
+        return
+
+    xml_cells = _XP_TC_DESC(xml_rows[r_idx])
+    if c_idx >= len(xml_cells):
+        return
+
+    target_cell = xml_cells[c_idx]
+    paragraphs = _XP_P(target_cell)
+    if p_idx >= len(paragraphs):
+        return
+
+    target_para = paragraphs[p_idx]
+
+    if run_xmls:
+        existing_runs = target_para.findall("w:r", NAMESPACES)
+        for run in existing_runs:
+            target_para.remove(run)
+        for run_xml_str in run_xmls:
+            try:
+                new_run = ET.fromstring(run_xml_str)
+                target_para.append(new_run)
+            except ET.ParseError:
+                pass
+    else:
+        para_runs = target_para.findall("w:r", NAMESPACES)
+
+        if "\n" in new_text:
+            lines = [ln for ln in new_text.split("\n") if ln.strip()]
+            if not lines:
+                lines = [""]
+
+            first_escaped = escape_xml(lines[0])
+            first_text_set = False
+            for run in para_runs:
+                for t in run.findall("w:t", NAMESPACES):
+                    if not first_text_set:
+                        t.text = first_escaped
+                        t.set(_XML_SPACE, "preserve")
+                        first_text_set = True
+                    else:
+                        t.text = ""
+
+            insert_ref = target_para
+            for extra_line in lines[1:]:
+                new_para = _clone_paragraph_with_text(
+                    target_para, escape_xml(extra_line),
+                )
+                children = list(target_cell)
+                pos = next(
+                    (i for i, c in enumerate(children) if c is insert_ref),
+                    len(children) - 1,
+                )
+                target_cell.insert(pos + 1, new_para)
+                insert_ref = new_para
         else:
-            para_runs = target_para.findall("w:r", NAMESPACES)
-
-            if "\n" in new_text:
-                lines = [ln for ln in new_text.split("\n") if ln.strip()]
-                if not lines:
-                    lines = [""]
-
-                first_escaped = escape_xml(lines[0])
-                first_text_set = False
-                for run in para_runs:
-                    for t in run.findall("w:t", NAMESPACES):
-                        if not first_text_set:
-                            t.text = first_escaped
-                            t.set(
-                                "{http://www.w3.org/XML/1998/namespace}space",
-                                "preserve",
-                            )
-                            first_text_set = True
-                        else:
-                            t.text = ""
-
-                insert_ref = target_para
-                for extra_line in lines[1:]:
-                    new_para = _clone_paragraph_with_text(
-                        target_para, escape_xml(extra_line),
-                    )
-                    children = list(target_cell)
-                    pos = next(
-                        (i for i, c in enumerate(children) if c is insert_ref),
-                        len(children) - 1,
-                    )
-                    target_cell.insert(pos + 1, new_para)
-                    insert_ref = new_para
-            else:
-                escaped_text = escape_xml(new_text)
-                first_text_set = False
-                for run in para_runs:
-                    for t in run.findall("w:t", NAMESPACES):
-                        if not first_text_set:
-                            t.text = escaped_text
-                            if (
-                                t.get("{http://www.w3.org/XML/1998/namespace}space")
-                                is None
-                            ):
-                                t.set(
-                                    "{http://www.w3.org/XML/1998/namespace}space",
-                                    "preserve",
-                                )
-                            first_text_set = True
-                        else:
-                            t.text = ""
+            escaped_text = escape_xml(new_text)
+            first_text_set = False
+            for run in para_runs:
+                for t in run.findall("w:t", NAMESPACES):
+                    if not first_text_set:
+                        t.text = escaped_text
+                        if t.get(_XML_SPACE) is None:
+                            t.set(_XML_SPACE, "preserve")
+                        first_text_set = True
+                    else:
+                        t.text = ""
 
-        return ET.tostring(root, encoding="unicode")
 
-    except ET.ParseError:
-        return table_xml
+def _shallow_clone(elem):
+    """Copy an element's tag, attributes, text and tail, without children."""
+    clone = elem.makeelement(elem.tag, dict(elem.attrib))
+    clone.text = elem.text
+    clone.tail = elem.tail
+    return clone
 
 
 def _clone_paragraph_with_text(source_para, escaped_text):
-    """Clone a paragraph, keep first run style, replace text."""
-    new_para = copy.deepcopy(source_para)
-    ns_w = NAMESPACES["w"]
-    runs = new_para.findall(f"{{{ns_w}}}r")
-    if runs:
-        first_run = runs[0]
-        for run in runs[1:]:
-            new_para.remove(run)
-        t_elements = first_run.findall(f"{{{ns_w}}}t")
-        if t_elements:
-            t_elements[0].text = escaped_text
-            t_elements[0].set(
-                "{http://www.w3.org/XML/1998/namespace}space", "preserve",
-            )
-            for t in t_elements[1:]:
-                first_run.remove(t)
-        else:
-            t_elem = ET.SubElement(first_run, f"{{{ns_w}}}t")
-            t_elem.text = escaped_text
-            t_elem.set(
-                "{http://www.w3.org/XML/1998/namespace}space", "preserve",
-            )
-    else:
-        new_run = ET.SubElement(new_para, f"{{{ns_w}}}r")
-        t_elem = ET.SubElement(new_run, f"{{{ns_w}}}t")
+    """Clone a paragraph, keep first run style, replace text.
+
+    Only the children that survive are copied: runs after the first and
+    extra <w:t> nodes in the first run are skipped instead of being
+    deep-copied and then removed.
+    """
+    new_para = _shallow_clone(source_para)
+    first_run = None
+    for child in source_para:
+        if child.tag != _TAG_R:
+            new_para.append(copy.deepcopy(child))
+            continue
+        if first_run is not None:
+            continue
+        first_run = _shallow_clone(child)
+        first_t = None
+        for run_child in child:
+            if run_child.tag != _TAG_T:
+                first_run.append(copy.deepcopy(run_child))
+            elif first_t is None:
+                first_t = _shallow_clone(run_child)
+                first_run.append(first_t)
+        if first_t is None:
+            first_t = ET.SubElement(first_run, _TAG_T)
+        first_t.text = escaped_text
+        first_t.set(_XML_SPACE, "preserve")
+        new_para.append(first_run)
+
+    if first_run is None:
+        new_run = ET.SubElement(new_para, _TAG_R)
+        t_elem = ET.SubElement(new_run, _TAG_T)
         t_elem.text = escaped_text
-        t_elem.set(
-            "{http://www.w3.org/XML/1998/namespace}space", "preserve",
-        )
+        t_elem.set(_XML_SPACE, "preserve")
     return new_para
 
 
-def _table_add_row(table_xml, after_r_idx, row_contents,
+def _row_key_order(idx_key):
+    """Sort key for table template row keys ("0", "1", ...)."""
+    return int(idx_key) if idx_key.isdigit() else 999
+
+
+def _row_style_index(table_template):
+    """Map trPr template XML -> row key, built once per table template.
+
+    Keys are visited in row order so the first matching row wins.
+    """
+    index = table_template.get("_row_style_index")
+    if index is None:
+        index = {}
+        row_styles = table_template.get("row_styles", {})
+        for idx_key in sorted(row_styles, key=_row_key_order):
+            trpr = row_styles[idx_key].get("tr_pr_xml_template", "")
+            index.setdefault(trpr, idx_key)
+        table_template["_row_style_index"] = index
+    return index
+
+
+def _cell_para_styles_index(table_template):
+    """Map tc_xml template -> paragraph_styles, built once per table template.
+
+    Within a row only the first cell with a given template counts, and the
+    first row that gives non-empty styles wins.
+    """
+    index = table_template.get("_cell_para_styles_index")
+    if index is None:
+        index = {}
+        for cells in table_template.get("cell_style_templates", {}).values():
+            seen = set()
+            for cell_entry in cells:
+                tc_xml = cell_entry.get("tc_xml_template")
+                if tc_xml in seen:
+                    continue
+                seen.add(tc_xml)
+                if not index.get(tc_xml):
+                    index[tc_xml] = cell_entry.get("paragraph_styles")
+        table_template["_cell_para_styles_index"] = index
+    return index
+
+
+def _find_parent(root, child):
+    """Return the parent of *child* inside *root*, or None."""
+    getparent = getattr(child, "getparent", None)
+    if getparent is not None:
+        return getparent()
+    # stdlib ElementTree keeps no parent pointers. iter() yields root
+    # first, and rows usually sit directly under the table.
+    for candidate in root.iter():
+        for c in candidate:
+            if c is child:
+                return candidate
+    return None
+
+
+def _child_index(parent, child):
+    """Position of *child* among *parent*'s children."""
+    index = getattr(parent, "index", None)
+    if index is not None:
+        return index(child)
+    for i, c in enumerate(parent):
+        if c is child:
+            return i
+    raise ValueError("element is not a child of parent")
+
+
+def _table_add_row(root, after_r_idx, row_contents,
                    row_style_alias="", cell_style_aliases=None,
                    paragraph_style_templates=None,
                    table_style_templates=None,
                    table_style_key="", style_alias_map=None):
-    """Add a new row to a table after the specified row."""
+    """Add a new row to a table after the specified row.
+
+    Returns True if a row was inserted.
+    """
     cell_style_aliases = cell_style_aliases or []
     paragraph_style_templates = paragraph_style_templates or {}
     table_style_templates = table_style_templates or {}
     style_alias_map = style_alias_map or {}
 
-    try:
-        root = ET.fromstring(table_xml)
-        xml_rows = root.findall(".//w:tr", NAMESPACES)
-
-        if after_r_idx >= len(xml_rows):
-            return table_xml
+    xml_rows = _XP_TR_DESC(root)
 
-        ns_w = NAMESPACES["w"]
-        target_row = xml_rows[after_r_idx]
+    if after_r_idx >= len(xml_rows):
+        return False
 
-        num_cols = max(
-            len(cell_style_aliases), len(row_contents),
-        ) if (cell_style_aliases or row_contents) else len(
-            target_row.findall("w:tc", NAMESPACES),
-        )
+    target_row = xml_rows[after_r_idx]
 
-        tbl_grid = root.find("w:tblGrid", NAMESPACES)
-        total_width = _get_table_total_width(root)
-        col_widths = _extract_column_widths(tbl_grid, num_cols, total_width)
+    num_cols = max(
+        len(cell_style_aliases), len(row_contents),
+    ) if (cell_style_aliases or row_contents) else len(
+        _XP_TC(target_row),
+    )
 
-        new_row = ET.Element(f"{{{ns_w}}}tr")
-        _apply_row_style(new_row, row_style_alias, style_alias_map)
-
-        tst = table_style_templates.get(table_style_key, {})
-        tst_cells = []
-        if tst:
-            rs_trpr = style_alias_map.get(row_style_alias, "")
-            tst_row_styles = tst.get("row_styles", {})
-            cst = tst.get("cell_style_templates", {})
-            for idx_key in sorted(
-                tst_row_styles.keys(),
-                key=lambda x: int(x) if x.isdigit() else 999,
-            ):
-                if tst_row_styles[idx_key].get(
-                    "tr_pr_xml_template", ""
-                ) == rs_trpr:
-                    tst_cells = cst.get(idx_key, [])
-                    break
-
-        for col_idx in range(num_cols):
-            cs_alias = (
-                cell_style_aliases[col_idx]
-                if col_idx < len(cell_style_aliases)
-                else (cell_style_aliases[-1] if cell_style_aliases else "")
-            )
-            cell_text = (
-                row_contents[col_idx]
-                if col_idx < len(row_contents) else ""
-            )
-            cell_ps = None
-            if tst_cells:
-                tst_ci = min(col_idx, len(tst_cells) - 1)
-                cell_ps = tst_cells[tst_ci].get("paragraph_styles")
-            new_cell = _build_cell_from_alias(
-                cs_alias, cell_text, col_widths[col_idx],
-                paragraph_style_templates, style_alias_map,
-                cell_para_styles=cell_ps,
+    tbl_grid = root.find("w:tblGrid", NAMESPACES)
+    total_width = _get_table_total_width(root)
+    col_widths = _extract_column_widths(tbl_grid, num_cols, total_width)
+
+    new_row = ET.Element(_TAG_TR)
+    _apply_row_style(new_row, row_style_alias, style_alias_map)
+
+    tst = table_style_templates.get(table_style_key, {})
+    tst_cells = []
+    if tst:
+        rs_trpr = style_alias_map.get(row_style_alias, "")
+        idx_key = _row_style_index(tst).get(rs_trpr)
+        if idx_key is not None:
+            tst_cells = tst.get("cell_style_templates", {}).get(
+                idx_key, [],
             )
-            new_row.append(new_cell)
 
-        parent = root
-        for child_idx, child in enumerate(list(parent)):
-            if child is target_row:
-                parent.insert(child_idx + 1, new_row)
-                break
-        else:
-            for tbl in root.iter():
-                children = list(tbl)
-                for child_idx, child in enumerate(children):
-                    if child is target_row:
-                        tbl.insert(child_idx + 1, new_row)
-                        break
+    for col_idx in range(num_cols):
+        cs_alias = (
+            cell_style_aliases[col_idx]
+            if col_idx < len(cell_style_aliases)
+            else (cell_style_aliases[-1] if cell_style_aliases else "")
+        )
+        cell_text = (
+            row_contents[col_idx]
+            if col_idx < len(row_contents) else ""
+        )
+        cell_ps = None
+        if tst_cells:
+            tst_ci = min(col_idx, len(tst_cells) - 1)
+            cell_ps = tst_cells[tst_ci].get("paragraph_styles")
+        new_cell = _build_cell_from_alias(
+            cs_alias, cell_text, col_widths[col_idx],
+            paragraph_style_templates, style_alias_map,
+            cell_para_styles=cell_ps,
+        )
+        new_row.append(new_cell)
 
-        return ET.tostring(root, encoding="unicode")
+    parent = _find_parent(root, target_row)
+    if parent is not None:
+        parent.insert(_child_index(parent, target_row) + 1, new_row)
 
-    except ET.ParseError:
-        return table_xml
+    return True
 
 
-def _table_delete_row(table_xml, r_idx):
+def _table_delete_row(root, r_idx):
     """Delete a specific row from a table."""
-    try:
-        root = ET.fromstring(table_xml)
-        xml_rows = root.findall(".//w:tr", NAMESPACES)
-        if r_idx >= len(xml_rows):
-            return table_xml
+    xml_rows = _XP_TR_DESC(root)
+    if r_idx >= len(xml_rows):
+        return
 
-        target_row = xml_rows[r_idx]
-        for tbl in root.iter():
-            if target_row in list(tbl):
-                tbl.remove(target_row)
-                break
+    parent = _find_parent(root, xml_rows[r_idx])
+    if parent is not None:
+        parent.remove(xml_rows[r_idx])
 
-        return ET.tostring(root, encoding="unicode")
-
-    except ET.ParseError:
-        return table_xml
 
-
-def _table_delete_column(table_xml, c_idx):
+def _table_delete_column(root, c_idx):
     """Delete a specific column from a table."""
-    try:
-        root = ET.fromstring(table_xml)
-        tbl_grid = root.find("w:tblGrid", NAMESPACES)
-        xml_rows = root.findall("w:tr", NAMESPACES)
-
-        if not xml_rows:
-            return table_xml
+    tbl_grid = root.find("w:tblGrid", NAMESPACES)
+    xml_rows = _XP_TR(root)
 
-        first_row_cells = xml_rows[0].findall("w:tc", NAMESPACES)
-        if c_idx >= len(first_row_cells):
-            return table_xml
+    if not xml_rows:
+        return
 
-        if len(first_row_cells) <= 1:
-            return table_xml
+    first_row_cells = _XP_TC(xml_rows[0])
+    if c_idx >= len(first_row_cells):
+        return
 
-        for tr in xml_rows:
-            cells = tr.findall("w:tc", NAMESPACES)
-            if c_idx < len(cells):
-                tr.remove(cells[c_idx])
+    if len(first_row_cells) <= 1:
+        return
 
-        if tbl_grid is not None:
-            grid_cols = tbl_grid.findall("w:gridCol", NAMESPACES)
-            if c_idx < len(grid_cols):
-                tbl_grid.remove(grid_cols[c_idx])
-
-        return ET.tostring(root, encoding="unicode")
+    for tr in xml_rows:
+        cells = _XP_TC(tr)
+        if c_idx < len(cells):
+            tr.remove(cells[c_idx])
 
-    except ET.ParseError:
-        return table_xml
+    if tbl_grid is not None:
+        grid_cols = _XP_GRID_COL(tbl_grid)
+        if c_idx < len(grid_cols):
+            tbl_grid.remove(grid_cols[c_idx])
 
 
-def _table_delete_paragraph(table_xml, row_idx, col_idx, para_idx):
+def _table_delete_paragraph(root, row_idx, col_idx, para_idx):
     """Delete a specific paragraph from a table cell."""
-    try:
-        root = ET.fromstring(table_xml)
-        xml_rows = root.findall(".//w:tr", NAMESPACES)
-        if row_idx >= len(xml_rows):
-            return table_xml
+    xml_rows = _XP_TR_DESC(root)
+    if row_idx >= len(xml_rows):
+        return
 
-        xml_cells = xml_rows[row_idx].findall(".//w:tc", NAMESPACES)
-        if col_idx >= len(xml_cells):
-            return table_xml
+    xml_cells = _XP_TC_DESC(xml_rows[row_idx])
+    if col_idx >= len(xml_cells):
+        return
 
-        target_cell = xml_cells[col_idx]
-        paragraphs = target_cell.findall("w:p", NAMESPACES)
-        if para_idx >= len(paragraphs):
-            return table_xml
+    target_cell = xml_cells[col_idx]
+    paragraphs = _XP_P(target_cell)
+    if para_idx >= len(paragraphs):
+        return
 
-        if len(paragraphs) <= 1:
-            return table_xml
+    if len(paragraphs) <= 1:
+        return
 
-        target_cell.remove(paragraphs[para_idx])
-        return ET.tostring(root, encoding="unicode")
-
-    except ET.ParseError:
-        return table_xml
+    target_cell.remove(paragraphs[para_idx])
 
 
-def _table_add_column(table_xml, after_col_idx, col_contents,
+def _table_add_column(root, after_col_idx, col_contents,
                       cell_style_aliases, paragraph_style_templates,
-                      style_alias_map, tst=None):
-    """Add a new column to a table after the specified column."""
-    try:
-        root = ET.fromstring(table_xml)
-        tbl_grid = root.find("w:tblGrid", NAMESPACES)
-        xml_rows = root.findall("w:tr", NAMESPACES)
+                      style_alias_map, tst=None, total_width=None):
+    """Add a new column to a table after the specified column.
+
+    total_width may be passed in when the caller already read tblW.
+    """
+    tbl_grid = root.find("w:tblGrid", NAMESPACES)
+    xml_rows = _XP_TR(root)
 
-        if not xml_rows:
-            return table_xml
+    if not xml_rows:
+        return
 
-        first_row_cells = xml_rows[0].findall("w:tc", NAMESPACES)
-        current_col_count = len(first_row_cells)
+    first_row_cells = _XP_TC(xml_rows[0])
+    current_col_count = len(first_row_cells)
 
-        if after_col_idx >= current_col_count:
-            return table_xml
+    if after_col_idx >= current_col_count:
+        return
 
+    if total_width is None:
         total_width = _get_table_total_width(root)
-        insert_pos = after_col_idx + 1 if after_col_idx >= 0 else 0
+    insert_pos = after_col_idx + 1 if after_col_idx >= 0 else 0
 
-        original_gc_widths = _extract_column_widths(
-            tbl_grid, current_col_count, total_width,
-        )
+    original_gc_widths = _extract_column_widths(
+        tbl_grid, current_col_count, total_width,
+    )
 
-        min_col_w = 400
-        new_col_max_chars = max(
-            (_estimate_text_width(c) for c in col_contents),
-            default=2,
+    min_col_w = 400
+    new_col_max_chars = max(
+        (_estimate_text_width(c) for c in col_contents),
+        default=2,
+    )
+    new_col_width = new_col_max_chars * 200 + 200
+    new_col_width = max(new_col_width, min_col_w)
+    new_col_width = min(new_col_width, total_width * 3 // 10)
+
+    original_total = sum(original_gc_widths) or total_width
+    remaining = total_width - new_col_width
+    if remaining < min_col_w * current_col_count:
+        remaining = total_width * 7 // 10
+        new_col_width = total_width - remaining
+
+    scale = remaining / original_total
+    adjusted_widths = [
+        max(min_col_w, int(w * scale)) for w in original_gc_widths
+    ]
+    rounding_diff = remaining - sum(adjusted_widths)
+    if adjusted_widths:
+        max_i = adjusted_widths.index(max(adjusted_widths))
+        adjusted_widths[max_i] += rounding_diff
+
+    all_widths = list(adjusted_widths)
+    all_widths.insert(insert_pos, new_col_width)
+
+    if tbl_grid is not None:
+        new_grid_col = ET.Element(_TAG_GRID_COL)
+        new_grid_col.set(_ATTR_W, str(new_col_width))
+        tbl_grid.insert(insert_pos, new_grid_col)
+
+        for i, gc in enumerate(
+            _XP_GRID_COL(tbl_grid),
+        ):
+            if i < len(all_widths):
+                gc.set(_ATTR_W, str(all_widths[i]))
+
+    ps_index = _cell_para_styles_index(tst) if tst else {}
+    for r_idx, tr in enumerate(xml_rows):
+        cs_alias = (
+            cell_style_aliases[r_idx]
+            if r_idx < len(cell_style_aliases)
+            else cell_style_aliases[-1] if cell_style_aliases else ""
+        )
+        cell_content = (
+            col_contents[r_idx] if r_idx < len(col_contents) else ""
+        )
+        tc_xml = style_alias_map.get(cs_alias, "")
+        new_cell = _build_cell_from_tc_xml(
+            tc_xml, cell_content, new_col_width,
+            cell_para_styles=ps_index.get(tc_xml),
         )
-        new_col_width = new_col_max_chars * 200 + 200
-        new_col_width = max(new_col_width, min_col_w)
-        new_col_width = min(new_col_width, total_width * 3 // 10)
-
-        original_total = sum(original_gc_widths) or total_width
-        remaining = total_width - new_col_width
-        if remaining < min_col_w * current_col_count:
-            remaining = total_width * 7 // 10
-            new_col_width = total_width - remaining
-
-        scale = remaining / original_total
-        adjusted_widths = [
-            max(min_col_w, int(w * scale)) for w in original_gc_widths
-        ]
-        rounding_diff = remaining - sum(adjusted_widths)
-        if adjusted_widths:
-            max_i = adjusted_widths.index(max(adjusted_widths))
-            adjusted_widths[max_i] += rounding_diff
-
-        all_widths = list(adjusted_widths)
-        all_widths.insert(insert_pos, new_col_width)
-
-        ns_w = NAMESPACES["w"]
-        if tbl_grid is not None:
-            new_grid_col = ET.Element(f"{{{ns_w}}}gridCol")
-            new_grid_col.set(f"{{{ns_w}}}w", str(new_col_width))
-            tbl_grid.insert(insert_pos, new_grid_col)
-
-            for i, gc in enumerate(
-                tbl_grid.findall("w:gridCol", NAMESPACES),
-            ):
-                if i < len(all_widths):
-                    gc.set(f"{{{ns_w}}}w", str(all_widths[i]))
-
-        cst = tst.get("cell_style_templates", {}) if tst else {}
-        for r_idx, tr in enumerate(xml_rows):
-            cs_alias = (
-                cell_style_aliases[r_idx]
-                if r_idx < len(cell_style_aliases)
-                else cell_style_aliases[-1] if cell_style_aliases else ""
-            )
-            cell_content = (
-                col_contents[r_idx] if r_idx < len(col_contents) else ""
-            )
-            cell_ps = None
-            if cst:
-                tc_xml_ref = style_alias_map.get(cs_alias, "")
-                for _row_key, cells in cst.items():
-                    for cell_entry in cells:
-                        if cell_entry.get("tc_xml_template") == tc_xml_ref:
-                            cell_ps = cell_entry.get("paragraph_styles")
-                            break
-                    if cell_ps:
-                        break
-            new_cell = _build_cell_from_alias(
-                cs_alias, cell_content, new_col_width,
-                paragraph_style_templates, style_alias_map,
-                cell_para_styles=cell_ps,
-            )
-
-            row_children = list(tr)
-            cell_positions = [
-                i for i, child in enumerate(row_children)
-                if child.tag == f"{{{ns_w}}}tc"
-            ]
-
-            if insert_pos < len(cell_positions):
-                tr.insert(cell_positions[insert_pos], new_cell)
-            else:
-                tr.append(new_cell)
 
-        _update_all_cell_widths(root, all_widths)
+        # The row's cell list both places the new cell and lets the widths
+        # be refreshed without a second pass over the table.
+        cells = _XP_TC(tr)
 
-        return ET.tostring(root, encoding="unicode")
+        if insert_pos < len(cells):
+            tr.insert(_child_index(tr, cells[insert_pos]), new_cell)
+            cells.insert(insert_pos, new_cell)
+        else:
+            tr.append(new_cell)
+            cells.append(new_cell)
 
-    except ET.ParseError:
-        return table_xml
+        _set_cell_widths(cells, all_widths)
 
 
-def _table_insert_column_paragraph(table_xml, col_idx, col_contents,
+def _table_insert_column_paragraph(root, col_idx, col_contents,
                                    style_key, paragraph_style_templates):
     """Insert a new paragraph into each cell of a specific column."""
-    try:
-        root = ET.fromstring(table_xml)
-        xml_rows = root.findall(".//w:tr", NAMESPACES)
-
-        if not xml_rows:
-            return table_xml
-
-        ns_w = NAMESPACES["w"]
-        for r_idx, tr in enumerate(xml_rows):
-            cells = tr.findall("w:tc", NAMESPACES)
-            if col_idx >= len(cells):
-                continue
-            cell_text = (
-                col_contents[r_idx]
-                if r_idx < len(col_contents)
-                else ""
-            )
-            if not cell_text:
-                continue
-            template = paragraph_style_templates.get(style_key)
-            if template:
-                ppr = template.get("ppr_xml_template", "")
-                rst = template.get("run_style_templates", {})
-                first_rst = next(iter(rst.values()), None) if rst else None
-                if first_rst:
-                    rpr_xml = first_rst.get("rpr_xml", "")
-                    esc = escape_xml(cell_text)
-                    run_xml = _ensure_t_space_preserve(
-                        rpr_xml.replace("{{content}}", esc)
-                    )
-                    para_xml = f'<w:p xmlns:w="{ns_w}">{ppr}{run_xml}</w:p>'
-                else:
-                    esc = escape_xml(cell_text)
-                    para_xml = (
-                        f'<w:p xmlns:w="{ns_w}">{ppr}'
-                        f'<w:r><w:t xml:space="preserve">{esc}</w:t></w:r>'
-                        f'</w:p>'
-                    )
-            else:
-                esc = escape_xml(cell_text)
-                para_xml = (
-                    f'<w:p xmlns:w="{ns_w}">'
-                    f'<w:r><w:t xml:space="preserve">{esc}</w:t></w:r>'
-                    f'</w:p>'
-                )
-            new_para = ET.fromstring(para_xml)
-            cells[col_idx].append(new_para)
-
-        return ET.tostring(root, encoding="unicode")
+    xml_rows = _XP_TR_DESC(root)
+
+    if not xml_rows:
+        return
+
+    # Every new paragraph shares the same markup, so parse it once and
+    # copy it per cell.
+    template = paragraph_style_templates.get(style_key)
+    ppr = ""
+    rpr_xml = None
+    if template:
+        ppr = template.get("ppr_xml_template", "")
+        rst = template.get("run_style_templates", {})
+        first_rst = _first_rst(rst) if rst else None
+        if first_rst:
+            rpr_xml = first_rst.get("rpr_xml", "")
+    prototype = _paragraph_prototype(ppr, rpr_xml)
+    if prototype is None:
+        return
+
+    # Build everything before touching the tree so bad text leaves the
+    # table unchanged.
+    pending = []
+    for r_idx, tr in enumerate(xml_rows):
+        cells = _XP_TC(tr)
+        if col_idx >= len(cells):
+            continue
+        cell_text = (
+            col_contents[r_idx]
+            if r_idx < len(col_contents)
+            else ""
+        )
+        if not cell_text:
+            continue
+        try:
+            new_para = _fill_paragraph(prototype, cell_text)
+        except ValueError:
+            return
+        pending.append((cells[col_idx], new_para))
 
-    except ET.ParseError:
-        return table_xml
+    for cell, new_para in pending:
+        cell.append(new_para)
 
 
 def _get_table_total_width(root):
@@ -1055,7 +1286,7 @@ def _get_table_total_width(root):
     if tbl_pr is not None:
         tbl_w = tbl_pr.find("w:tblW", NAMESPACES)
         if tbl_w is not None:
-            w_val = tbl_w.get(f"{{{NAMESPACES['w']}}}w")
+            w_val = tbl_w.get(_ATTR_W)
             if w_val and w_val.isdigit():
                 return int(w_val)
     return 9000
@@ -1063,9 +1294,8 @@ def _get_table_total_width(root):
 
 def _extract_column_widths(tbl_grid, num_cols, total_width):
     """Extract per-column widths from tblGrid."""
-    ns_w = NAMESPACES["w"]
     grid_cols = (
-        tbl_grid.findall("w:gridCol", NAMESPACES)
+        _XP_GRID_COL(tbl_grid)
         if tbl_grid is not None
         else []
     )
@@ -1074,7 +1304,7 @@ def _extract_column_widths(tbl_grid, num_cols, total_width):
     col_widths = []
     for i in range(num_cols):
         if i < len(grid_cols):
-            w_val = grid_cols[i].get(f"{{{ns_w}}}w")
+            w_val = grid_cols[i].get(_ATTR_W)
             col_widths.append(
                 int(w_val) if w_val and w_val.isdigit() else default_width,
             )
@@ -1083,53 +1313,45 @@ def _extract_column_widths(tbl_grid, num_cols, total_width):
     return col_widths
 
 
+_WIDE_CHAR_RE = re.compile(
+    "[\u1100-\u11FF\u3000-\u9FFF\uAC00-\uD7AF\uF900-\uFAFF\uFF01-\uFF60]"
+)
+
+
 def _estimate_text_width(text):
     """Estimate visual text width in half-width character units."""
-    width = 0
-    for ch in text:
-        cp = ord(ch)
-        if (
-            0x1100 <= cp <= 0x11FF
-            or 0x3000 <= cp <= 0x9FFF
-            or 0xAC00 <= cp <= 0xD7AF
-            or 0xF900 <= cp <= 0xFAFF
-            or 0xFF01 <= cp <= 0xFF60
-        ):
-            width += 2
-        else:
-            width += 1
-    return max(width, 1)
-
-
-def _update_all_cell_widths(root, col_widths):
-    """Update tcW in all table cells to match col_widths."""
-    ns_w = NAMESPACES["w"]
-    for tr in root.findall("w:tr", NAMESPACES):
-        for c_i, tc in enumerate(tr.findall("w:tc", NAMESPACES)):
-            w = (
-                col_widths[c_i]
-                if c_i < len(col_widths)
-                else col_widths[-1] if col_widths else 9000
-            )
-            tc_pr = tc.find(f"{{{ns_w}}}tcPr")
-            if tc_pr is not None:
-                tc_w = tc_pr.find(f"{{{ns_w}}}tcW")
-                if tc_w is not None:
-                    tc_w.set(f"{{{ns_w}}}w", str(w))
+    # Wide (CJK/Hangul/fullwidth) characters count double.
+    narrow = len(_WIDE_CHAR_RE.sub("", text))
+    return max(2 * len(text) - narrow, 1)
+
+
+def _set_cell_widths(cells, col_widths):
+    """Update tcW in a row's cells to match col_widths."""
+    widths = [str(w) for w in col_widths]
+    fallback = widths[-1] if widths else "9000"
+    for c_i, tc in enumerate(cells):
+        w = widths[c_i] if c_i < len(widths) else fallback
+        # The schema puts tcPr first in w:tc; search only when it is not.
+        tc_pr = tc[0] if len(tc) and tc[0].tag == _TAG_TC_PR else None
+        if tc_pr is None:
+            tc_pr = tc.find(_TAG_TC_PR)
+        if tc_pr is not None:
+            tc_w = tc_pr.find(_TAG_TC_W)
+            if tc_w is not None:
+                tc_w.set(_ATTR_W, w)
 
 
 def _apply_row_style(row, row_style_alias, style_alias_map):
     """Apply RS alias trPr to a row element."""
-    ns_w = NAMESPACES["w"]
     tr_pr_xml = style_alias_map.get(row_style_alias, "")
 
     if tr_pr_xml and tr_pr_xml.strip():
-        old_trpr = row.find(f"{{{ns_w}}}trPr")
+        old_trpr = row.find(_TAG_TR_PR)
         if old_trpr is not None:
             row.remove(old_trpr)
         try:
             new_trpr = ET.fromstring(tr_pr_xml)
-            hdr = new_trpr.find(f"{{{ns_w}}}tblHeader")
+            hdr = new_trpr.find(_TAG_TBL_HEADER)
             if hdr is not None:
                 new_trpr.remove(hdr)
             row.insert(0, new_trpr)
@@ -1141,10 +1363,21 @@ def _build_cell_from_alias(cs_alias, text, col_width,
                            paragraph_style_templates, style_alias_map,
                            cell_para_styles=None):
     """Build a complete <w:tc> element from CS alias."""
-    ns_w = NAMESPACES["w"]
-    tc_xml = style_alias_map.get(cs_alias, "")
-    text = _normalize_newlines(text)
-    lines = text.split("\n") if "\n" in text else [text]
+    return _build_cell_from_tc_xml(
+        style_alias_map.get(cs_alias, ""), text, col_width,
+        cell_para_styles=cell_para_styles,
+    )
+
+
+def _build_cell_from_tc_xml(tc_xml, text, col_width, cell_para_styles=None):
+    """Build a complete <w:tc> element from an already-resolved cell shell."""
+    # Most cells are a single short line; only text with a newline or a
+    # literal backslash-n needs normalizing and splitting.
+    if "\n" in text or "\\" in text:
+        text = _normalize_newlines(text)
+        lines = text.split("\n")
+    else:
+        lines = (text,)
 
     cell_ppr = ""
     cell_rst_xml = ""
@@ -1153,53 +1386,84 @@ def _build_cell_from_alias(cs_alias, text, col_width,
         cell_ppr = ps0.get("ppr_xml_template", "")
         rst_dict = ps0.get("run_style_templates", {})
         if rst_dict:
-            cell_rst_xml = next(iter(rst_dict.values())).get("rpr_xml", "")
+            cell_rst_xml = _first_rst(rst_dict).get("rpr_xml", "")
 
+    cell = None
     if tc_xml and "{{content}}" in tc_xml:
-        paras_xml = ""
+        cell = _cell_from_shell(
+            tc_xml, lines, cell_ppr, cell_rst_xml, col_width,
+        )
+        if cell is not None:
+            return cell
+
+        # Shell could not be pre-parsed: splice the markup as text.
+        paras = []
         for line in lines:
-            esc = escape_xml(line)
+            esc = _escape_cell_text(line)
             if cell_rst_xml:
-                run_xml = _ensure_t_space_preserve(
-                    cell_rst_xml.replace("{{content}}", esc)
-                )
-                paras_xml += f'<w:p xmlns:w="{ns_w}">{cell_ppr}{run_xml}</w:p>'
+                run_xml = _render_run(cell_rst_xml, esc)
+                paras.append(f'<w:p xmlns:w="{_W}">{cell_ppr}{run_xml}</w:p>')
             else:
-                paras_xml += (
-                    f'<w:p xmlns:w="{ns_w}"><w:r>'
+                paras.append(
+                    f'<w:p xmlns:w="{_W}"><w:r>'
                     f'<w:t xml:space="preserve">{esc}</w:t>'
                     f"</w:r></w:p>"
                 )
-        assembled = tc_xml.replace("{{content}}", paras_xml)
+        assembled = tc_xml.replace("{{content}}", "".join(paras))
         try:
             cell = ET.fromstring(assembled)
         except ET.ParseError:
-            cell = _minimal_cell(ns_w, escape_xml(text))
-    else:
-        cell = _minimal_cell(ns_w, escape_xml(text))
+            pass
+    if cell is None:
+        cell = _minimal_cell(escape_xml(text))
 
-    tc_pr = cell.find(f"{{{ns_w}}}tcPr")
+    tc_pr = cell.find(_TAG_TC_PR)
     if tc_pr is None:
-        tc_pr = ET.Element(f"{{{ns_w}}}tcPr")
+        tc_pr = ET.Element(_TAG_TC_PR)
         cell.insert(0, tc_pr)
 
-    tc_w = tc_pr.find(f"{{{ns_w}}}tcW")
+    tc_w = tc_pr.find(_TAG_TC_W)
     if tc_w is None:
-        tc_w = ET.SubElement(tc_pr, f"{{{ns_w}}}tcW")
-    tc_w.set(f"{{{ns_w}}}w", str(col_width))
-    tc_w.set(f"{{{ns_w}}}type", "dxa")
+        tc_w = ET.SubElement(tc_pr, _TAG_TC_W)
+    tc_w.set(_ATTR_W, str(col_width))
+    tc_w.set(_ATTR_TYPE, "dxa")
+
+    return cell
+
 
+def _cell_from_shell(tc_xml, lines, cell_ppr, cell_rst_xml, col_width):
+    """Build a cell from the pre-parsed alias shell, or None to fall back."""
+    parsed = _parse_cell_shell(tc_xml)
+    if parsed is None:
+        return None
+    if cell_rst_xml:
+        prototype = _paragraph_prototype(cell_ppr, cell_rst_xml)
+    else:
+        prototype = _paragraph_prototype("", None)
+    if prototype is None:
+        return None
+    shell, index, tail, tc_pr_pos, tc_w_pos = parsed
+    try:
+        paras = [_fill_paragraph(prototype, line) for line in lines]
+    except ValueError:
+        return None
+    cell = copy.deepcopy(shell)
+    cell[tc_pr_pos][tc_w_pos].set(_ATTR_W, str(col_width))
+    for offset, para in enumerate(paras):
+        cell.insert(index + offset, para)
+    if tail:
+        paras[-1].tail = tail
     return cell
 
 
-def _minimal_cell(ns_w, escaped_text):
+def _minimal_cell(escaped_text):
     """Create a minimal <w:tc> element with one paragraph."""
-    cell = ET.Element(f"{{{ns_w}}}tc")
-    tc_pr = ET.SubElement(cell, f"{{{ns_w}}}tcPr")
-    ET.SubElement(tc_pr, f"{{{ns_w}}}tcW")
-    para = ET.SubElement(cell, f"{{{ns_w}}}p")
-    run = ET.SubElement(para, f"{{{ns_w}}}r")
-    t_elem = ET.SubElement(run, f"{{{ns_w}}}t")
+    cell = ET.Element(_TAG_TC)
+    tc_pr = ET.SubElement(cell, _TAG_TC_PR)
+    ET.SubElement(tc_pr, _TAG_TC_W)
+    para = ET.SubElement(cell, _TAG_P)
+    run = ET.SubElement(para, _TAG_R)
+    t_elem = ET.SubElement(run, _TAG_T)
     t_elem.text = escaped_text
     return cell
 
@@ -1220,51 +1484,49 @@ def _build_table_from_template(template, content,
         rows_content = []
         normalized = _normalize_newlines(content.strip())
         for line in normalized.split("\n"):
-            cells = [c.strip() for c in line.split("|")]
+            cells = list(map(str.strip, line.split("|")))
             rows_content.append(cells)
 
         if not rows_content:
             return template.get("tbl_xml_template", "")
 
         num_cols = max(len(row) for row in rows_content)
-        ns_w = NAMESPACES["w"]
 
         root = ET.fromstring(template["tbl_xml_template"])
 
-        for old_tr in root.findall("w:tr", NAMESPACES):
+        for old_tr in _XP_TR(root):
             root.remove(old_tr)
 
         total_width = _get_table_total_width(root)
         tbl_grid = root.find("w:tblGrid", NAMESPACES)
         if tbl_grid is not None:
-            existing_gc = tbl_grid.findall("w:gridCol", NAMESPACES)
+            existing_gc = _XP_GRID_COL(tbl_grid)
             if len(existing_gc) != num_cols:
                 for gc in existing_gc:
                     tbl_grid.remove(gc)
                 col_w = total_width // num_cols
                 remainder = total_width - col_w * num_cols
                 for i in range(num_cols):
-                    gc = ET.Element(f"{{{ns_w}}}gridCol")
+                    gc = ET.Element(_TAG_GRID_COL)
                     w = col_w + (1 if i < remainder else 0)
-                    gc.set(f"{{{ns_w}}}w", str(w))
+                    gc.set(_ATTR_W, str(w))
                     tbl_grid.append(gc)
         col_widths = _extract_column_widths(tbl_grid, num_cols, total_width)
 
         cst = template.get("cell_style_templates", {})
-        tst_row_styles = template.get("row_styles", {})
+        row_style_index = _row_style_index(template)
         rs_to_tst_row = {}
-        for idx_key in sorted(
-            tst_row_styles.keys(),
-            key=lambda x: int(x) if x.isdigit() else 999,
-        ):
-            trpr = tst_row_styles[idx_key].get("tr_pr_xml_template", "")
-            for rs_a in set(row_style_aliases):
-                if rs_a and rs_a not in rs_to_tst_row:
-                    if style_alias_map.get(rs_a, "") == trpr:
-                        rs_to_tst_row[rs_a] = idx_key
+        for rs_a in set(row_style_aliases):
+            if rs_a:
+                idx_key = row_style_index.get(style_alias_map.get(rs_a, ""))
+                if idx_key is not None:
+                    rs_to_tst_row[rs_a] = idx_key
+
+        # Rows usually repeat the same CS aliases; resolve each list once.
+        tc_xml_by_row_cs = {}
 
         for row_idx, row_cells in enumerate(rows_content):
-            new_row = ET.Element(f"{{{ns_w}}}tr")
+            new_row = ET.Element(_TAG_TR)
 
             rs_alias = (
                 row_style_aliases[row_idx]
@@ -1286,12 +1548,21 @@ def _build_table_from_template(template, content,
                 )
             )
 
+            row_key = tuple(row_cs)
+            row_tc_xml = tc_xml_by_row_cs.get(row_key)
+            if row_tc_xml is None:
+                row_tc_xml = [
+                    style_alias_map.get(
+                        row_cs[col_idx]
+                        if col_idx < len(row_cs)
+                        else (row_cs[-1] if row_cs else ""),
+                        "",
+                    )
+                    for col_idx in range(num_cols)
+                ]
+                tc_xml_by_row_cs[row_key] = row_tc_xml
+
             for col_idx in range(num_cols):
-                cs_alias = (
-                    row_cs[col_idx]
-                    if col_idx < len(row_cs)
-                    else (row_cs[-1] if row_cs else "")
-                )
                 cell_text = (
                     row_cells[col_idx]
                     if col_idx < len(row_cells)
@@ -1306,9 +1577,8 @@ def _build_table_from_template(template, content,
                 if tst_cells:
                     tst_ci = min(col_idx, len(tst_cells) - 1)
                     cell_ps = tst_cells[tst_ci].get("paragraph_styles")
-                new_cell = _build_cell_from_alias(
-                    cs_alias, cell_text, cell_w,
-                    paragraph_style_templates, style_alias_map,
+                new_cell = _build_cell_from_tc_xml(
+                    row_tc_xml[col_idx], cell_text, cell_w,
                     cell_para_styles=cell_ps,
                 )
                 new_row.append(new_cell)
@@ -1321,37 +1591,78 @@ def _build_table_from_template(template, content,
         return template.get("tbl_xml_template", "")
 
 
+def _part_xml(part):
+    """Serialize a body part, which is either markup or a parsed element."""
+    return part if isinstance(part, str) else ET.tostring(part, encoding="unicode")
+
+
 def assemble_document_xml(blocks, paragraph_style_templates,
                           table_style_templates,
-                          style_alias_map):
-    """Assemble document.xml body content from modified blocks."""
+                          style_alias_map, writer=None):
+    """Assemble document.xml body content from modified blocks.
+
+    With a writer (any object with write()), parts are written as soon as
+    no later block can touch them and None is returned; otherwise the body
+    is returned as one string.
+    """
+    out = writer if writer is not None else io.StringIO()
     body_parts = []
-    block_id_to_parts_idx = {}
+    # Paragraph XML depends only on (style_key, content) within one call,
+    # so repeated inserts (blank separators, boilerplate) are built once.
+    paragraph_xml_cache = {}
+
+    def insert_xmls(insert):
+        content = insert.get("content", "")
+        if "\n" in content and "|" not in content:
+            lines = [ln.strip() for ln in content.split("\n")]
+            lines = [line for line in lines if line]
+        else:
+            lines = [content]
+
+        style_key = insert.get("style_key", "")
+        cacheable = not (
+            insert.get("run_xmls") or style_key in table_style_templates
+        )
+        xmls = []
+        for line in lines:
+            key = (style_key, line)
+            xml = paragraph_xml_cache.get(key) if cacheable else None
+            if xml is None:
+                xml = _build_block_xml(
+                    insert, paragraph_style_templates,
+                    table_style_templates, style_alias_map,
+                    content_override=line,
+                )
+                if cacheable:
+                    paragraph_xml_cache[key] = xml
+            if xml:
+                xmls.append(xml)
+        return xmls
+
+    # apply_mapping_to_blocks gives every marked block the mark lists, so a
+    # block without them is an untouched original and its XML is copied.
+    if not any("_inserts_after" in block for block in blocks):
+        for block in blocks:
+            out.write(block["xml"])
+        return None if writer is not None else out.getvalue()
 
     for block in blocks:
+        # Only the newest part can still change (row inserts append to the
+        # preceding table), so everything before it is final.
+        if len(body_parts) > 1:
+            for part in body_parts[:-1]:
+                out.write(_part_xml(part))
+            del body_parts[:-1]
+
+        if "_inserts_after" not in block:
+            body_parts.append(block["xml"])
+            continue
+
         if block.get("_deleted"):
             continue
 
         for insert in block.get("_inserts_before", []):
-            content = insert.get("content", "")
-            if "\n" in content and "|" not in content:
-                lines = [ln.strip() for ln in content.split("\n") if ln.strip()]
-                for line in lines:
-                    line_insert = dict(insert)
-                    line_insert["content"] = line
-                    xml = _build_block_xml(
-                        line_insert, paragraph_style_templates,
-                        table_style_templates, style_alias_map,
-                    )
-                    if xml:
-                        body_parts.append(xml)
-            else:
-                xml = _build_block_xml(
-                    insert, paragraph_style_templates,
-                    table_style_templates, style_alias_map,
-                )
-                if xml:
-                    body_parts.append(xml)
+            body_parts.extend(insert_xmls(insert))
 
         if block.get("_replaced") and "_replacements" in block:
             replacements = block["_replacements"]
@@ -1360,17 +1671,22 @@ def assemble_document_xml(blocks, paragraph_style_templates,
             is_table = block_type == "tbl"
 
             if is_table:
-                current_xml = block["xml"]
+                try:
+                    root = ET.fromstring(block["xml"])
+                except ET.ParseError:
+                    body_parts.append(block["xml"])
+                    root = None
 
+            if is_table and root is not None:
                 for r_idx in sorted(
                     block.get("_row_deletions", []), reverse=True,
                 ):
-                    current_xml = _table_delete_row(current_xml, r_idx)
+                    _table_delete_row(root, r_idx)
 
                 for c_idx in sorted(
                     block.get("_col_deletions", []), reverse=True,
                 ):
-                    current_xml = _table_delete_column(current_xml, c_idx)
+                    _table_delete_column(root, c_idx)
 
                 para_deletions = block.get("_para_deletions", [])
                 for pd in sorted(
@@ -1378,13 +1694,14 @@ def assemble_document_xml(blocks, paragraph_style_templates,
                     key=lambda x: (x["row_idx"], x["col_idx"], x["para_idx"]),
                     reverse=True,
                 ):
-                    current_xml = _table_delete_paragraph(
-                        current_xml,
-                        pd["row_idx"], pd["col_idx"], pd["para_idx"],
+                    _table_delete_paragraph(
+                        root, pd["row_idx"], pd["col_idx"], pd["para_idx"],
                     )
 
                 tbl_style_key = block.get("style_key", "")
                 tbl_tst = table_style_templates.get(tbl_style_key, {})
+                # tblW is not touched by column inserts, so read it once.
+                tbl_total_width = _get_table_total_width(root)
 
                 col_inserts_after = block.get("_col_inserts_after", [])
                 for col_insert in sorted(
@@ -1399,14 +1716,14 @@ def assemble_document_xml(blocks, paragraph_style_templates,
                     )
                     cs_aliases = col_insert.get("cell_style_aliases", [])
                     if cs_aliases:
-                        current_xml = _table_add_column(
-                            current_xml, c_idx, col_contents, cs_aliases,
+                        _table_add_column(
+                            root, c_idx, col_contents, cs_aliases,
                             paragraph_style_templates, style_alias_map,
-                            tst=tbl_tst,
+                            tst=tbl_tst, total_width=tbl_total_width,
                         )
                     else:
-                        current_xml = _table_insert_column_paragraph(
-                            current_xml, c_idx, col_contents,
+                        _table_insert_column_paragraph(
+                            root, c_idx, col_contents,
                             style_key=col_insert.get("style_key", ""),
                             paragraph_style_templates=paragraph_style_templates,
                         )
@@ -1424,29 +1741,30 @@ def assemble_document_xml(blocks, paragraph_style_templates,
                     )
                     cs_aliases = col_insert.get("cell_style_aliases", [])
                     if cs_aliases:
-                        current_xml = _table_add_column(
-                            current_xml, c_idx - 1, col_contents, cs_aliases,
+                        _table_add_column(
+                            root, c_idx - 1, col_contents, cs_aliases,
                             paragraph_style_templates, style_alias_map,
-                            tst=tbl_tst,
+                            tst=tbl_tst, total_width=tbl_total_width,
                         )
                     else:
-                        current_xml = _table_insert_column_paragraph(
-                            current_xml, max(0, c_idx - 1), col_contents,
+                        _table_insert_column_paragraph(
+                            root, max(0, c_idx - 1), col_contents,
                             style_key=col_insert.get("style_key", ""),
                             paragraph_style_templates=paragraph_style_templates,
                         )
 
+                # Replacements only touch text, so one row lookup serves
+                # them all.
+                xml_rows = _XP_TR_DESC(root)
                 for replacement in replacements:
                     original_target_id = replacement.get(
                         "original_target_id", "",
                     )
 
-                    cell_para_match = re.match(
-                        r"b\d+:r(\d+)c(\d+)p(\d+)", original_target_id,
-                    )
-                    row_match = re.match(
-                        r"b\d+:r(\d+)$", original_target_id,
+                    cell_para_match = _CELL_PARA_ID_RE.match(
+                        original_target_id,
                     )
+                    row_match = _ROW_ID_RE.match(original_target_id)
 
                     if cell_para_match:
                         r_idx = int(cell_para_match.group(1))
@@ -1457,44 +1775,40 @@ def assemble_document_xml(blocks, paragraph_style_templates,
                             if replacement.get("run_xmls")
                             else None
                         )
-                        current_xml = _table_replace_paragraph(
-                            current_xml, r_idx, c_idx, p_idx,
+                        _table_replace_paragraph(
+                            root, r_idx, c_idx, p_idx,
                             replacement["content"],
                             run_xmls=run_xmls,
+                            xml_rows=xml_rows,
                         )
                     elif row_match:
                         r_idx = int(row_match.group(1))
                         content = replacement["content"]
                         row_contents = (
-                            [c.strip() for c in content.split("|")]
+                            list(map(str.strip, content.split("|")))
                             if content else []
                         )
-                        try:
-                            root = ET.fromstring(current_xml)
-                            xml_rows = root.findall(".//w:tr", NAMESPACES)
-                            if r_idx < len(xml_rows):
-                                target_row = xml_rows[r_idx]
-                                cells = target_row.findall("w:tc", NAMESPACES)
-                                for ci, cell in enumerate(cells):
-                                    cell_text = (
-                                        row_contents[ci]
-                                        if ci < len(row_contents) else ""
-                                    )
-                                    first_text_set = False
-                                    for t in cell.findall(".//w:t", NAMESPACES):
-                                        if not first_text_set:
-                                            t.text = cell_text
-                                            first_text_set = True
-                                        else:
-                                            t.text = ""
-                            current_xml = ET.tostring(root, encoding="unicode")
-                        except ET.ParseError:
-                            pass
-
-                body_parts.append(current_xml)
-
-            else:
-                block_id_to_parts_idx[block["id"]] = len(body_parts)
+                        if r_idx < len(xml_rows):
+                            target_row = xml_rows[r_idx]
+                            cells = _XP_TC(target_row)
+                            for ci, cell in enumerate(cells):
+                                cell_text = (
+                                    row_contents[ci]
+                                    if ci < len(row_contents) else ""
+                                )
+                                first_text_set = False
+                                for t in cell.findall(".//w:t", NAMESPACES):
+                                    if not first_text_set:
+                                        t.text = _xml_text(cell_text)
+                                        first_text_set = True
+                                    else:
+                                        t.text = ""
+
+                # Kept as a tree so later row inserts reuse the same parse;
+                # serialized once when it is written out.
+                body_parts.append(root)
+
+            elif not is_table:
                 replacement = replacements[0]
 
                 style_key = replacement.get("style_key", "")
@@ -1550,17 +1864,14 @@ def assemble_document_xml(blocks, paragraph_style_templates,
                                 )
                             )
         else:
-            block_id_to_parts_idx[block["id"]] = len(body_parts)
             body_parts.append(block["xml"])
 
         for insert in block.get("_inserts_after", []):
             original_target_id = insert.get("original_target_id", "")
             insert_edit_unit = insert.get("edit_unit")
 
-            row_add_match = re.match(r"b\d+:r(\d+)$", original_target_id)
-            cell_para_match = re.match(
-                r"b\d+:r(\d+)c(\d+)p(\d+)", original_target_id,
-            )
+            row_add_match = _ROW_ID_RE.match(original_target_id)
+            cell_para_match = _CELL_PARA_ID_RE.match(original_target_id)
 
             is_row_add = (
                 insert_edit_unit == "row"
@@ -1572,14 +1883,14 @@ def assemble_document_xml(blocks, paragraph_style_templates,
                 if row_add_match:
                     r_idx = int(row_add_match.group(1))
                 else:
-                    r_match = re.search(r"r(\d+)", original_target_id)
+                    r_match = _ROW_NUM_RE.search(original_target_id)
                     if not r_match:
                         continue
                     r_idx = int(r_match.group(1))
 
                 content = insert.get("content", "")
                 row_contents = (
-                    [c.strip() for c in content.split("|")]
+                    list(map(str.strip, content.split("|")))
                     if content else []
                 )
 
@@ -1600,8 +1911,14 @@ def assemble_document_xml(blocks, paragraph_style_templates,
                         row_style_aliases[0]
                         if row_style_aliases else ""
                     )
-                    modified_xml = _table_add_row(
-                        body_parts[-1], r_idx, row_contents,
+                    last_part = body_parts[-1]
+                    if isinstance(last_part, str):
+                        try:
+                            last_part = ET.fromstring(last_part)
+                        except ET.ParseError:
+                            continue
+                    added = _table_add_row(
+                        last_part, r_idx, row_contents,
                         row_style_alias=row_style_alias,
                         cell_style_aliases=cell_style_aliases,
                         paragraph_style_templates=paragraph_style_templates,
@@ -1609,52 +1926,45 @@ def assemble_document_xml(blocks, paragraph_style_templates,
                         table_style_key=block.get("style_key", ""),
                         style_alias_map=style_alias_map,
                     )
-                    body_parts[-1] = modified_xml
+                    if added:
+                        body_parts[-1] = last_part
 
             elif cell_para_match:
                 pass
             else:
-                content = insert.get("content", "")
-                if "\n" in content and "|" not in content:
-                    lines = [
-                        ln.strip() for ln in content.split("\n") if ln.strip()
-                    ]
-                    for line in lines:
-                        line_insert = dict(insert)
-                        line_insert["content"] = line
-                        xml = _build_block_xml(
-                            line_insert, paragraph_style_templates,
-                            table_style_templates, style_alias_map,
-                        )
-                        if xml:
-                            body_parts.append(xml)
-                else:
-                    xml = _build_block_xml(
-                        insert, paragraph_style_templates,
-                        table_style_templates, style_alias_map,
-                    )
-                    if xml:
-                        body_parts.append(xml)
+                body_parts.extend(insert_xmls(insert))
 
-    return "".join(body_parts)
+    for part in body_parts:
+        out.write(_part_xml(part))
+    if writer is not None:
+        return None
+    return out.getvalue()
 
 
-def wrap_document_body(body_content, original_document_xml):
-    """Replace body content in document.xml preserving namespace declarations."""
-    body_pattern = re.compile(
-        r"(<w:body[^>]*>)[\s\S]*?(</w:body>)",
-        re.IGNORECASE,
-    )
+def _split_document_body(original_document_xml):
+    """Split document.xml into the markup before and after the body content.
 
-    match = body_pattern.search(original_document_xml)
-    if match:
-        prefix = original_document_xml[:match.start(1)]
-        body_open = match.group(1)
-        body_close = match.group(2)
-        suffix = original_document_xml[match.end(2):]
-        return f"{prefix}{body_open}{body_content}{body_close}{suffix}"
+    Returns None if there is no <w:body>.
+    """
+    start = original_document_xml.find("<w:body")
+    if start < 0:
+        return None
+    open_end = original_document_xml.find(">", start) + 1
+    if not open_end:
+        return None
+    close = original_document_xml.find("</w:body>", open_end)
+    if close < 0:
+        return None
+    return original_document_xml[:open_end], original_document_xml[close:]
 
-    return original_document_xml
+
+def wrap_document_body(body_content, original_document_xml):
+    """Replace body content in document.xml preserving namespace declarations."""
+    parts = _split_document_body(original_document_xml)
+    if parts is None:
+        return original_document_xml
+    head, tail = parts
+    return f"{head}{body_content}{tail}"
 
 
 def save_document_xml(document_xml, extracted_path):
@@ -1666,6 +1976,35 @@ def save_document_xml(document_xml, extracted_path):
     return output_path
 
 
+def _open_or_exit(path, binary=False):
+    """Open path for reading as UTF-8 text (or bytes), exiting if missing."""
+    try:
+        if binary:
+            return open(path, "rb")
+        return open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        print(f"Error: {path} not found")
+        sys.exit(1)
+
+
+def _read_text_or_exit(path):
+    """Return the UTF-8 contents of path, exiting if it does not exist."""
+    with _open_or_exit(path) as f:
+        return f.read()
+
+
+def _load_edits(path):
+    """Return the "edits" list from edits.json, exiting if it does not exist.
+
+    With ijson installed only the edits array is built into Python objects;
+    any other top-level keys are parsed and dropped.
+    """
+    if ijson is None:
+        return _json_loads(_read_text_or_exit(path)).get("edits", [])
+    with _open_or_exit(path, binary=True) as f:
+        return list(ijson.items(f, "edits.item", use_float=True))
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python3 apply_edits.py <work_dir>")
@@ -1676,20 +2015,10 @@ def main():
     analysis_path = os.path.join(work_dir, "analysis.json")
     edits_path = os.path.join(work_dir, "edits.json")
 
-    if not os.path.isfile(analysis_path):
-        print(f"Error: {analysis_path} not found")
-        sys.exit(1)
-    if not os.path.isfile(edits_path):
-        print(f"Error: {edits_path} not found")
-        sys.exit(1)
-
-    with open(analysis_path, "r", encoding="utf-8") as f:
-        analysis = json.load(f)
+    analysis_text = _read_text_or_exit(analysis_path)
+    edits = _load_edits(edits_path)
+    analysis = _json_loads(analysis_text)
 
-    with open(edits_path, "r", encoding="utf-8") as f:
-        edits_data = json.load(f)
-
-    edits = edits_data.get("edits", [])
     if not edits:
         print("No edits to apply")
         sys.exit(0)
@@ -1699,12 +2028,7 @@ def main():
         extracted_path = os.path.join(work_dir, "extracted")
 
     document_xml_path = os.path.join(extracted_path, "word", "document.xml")
-    if not os.path.isfile(document_xml_path):
-        print(f"Error: {document_xml_path} not found")
-        sys.exit(1)
-
-    with open(document_xml_path, "r", encoding="utf-8") as f:
-        original_document_xml = f.read()
+    original_document_xml = _read_text_or_exit(document_xml_path)
 
     paragraph_style_templates = analysis.get("paragraph_style_templates", {})
     table_style_templates = analysis.get("table_style_templates", {})
@@ -1717,18 +2041,41 @@ def main():
 
     print("Phase B: Assembling document XML...")
 
-    marked_blocks = apply_mapping_to_blocks(blocks, new_blocks)
-
-    body_content = assemble_document_xml(
-        marked_blocks,
-        paragraph_style_templates,
-        table_style_templates,
-        style_alias_map,
+    marked_blocks = apply_mapping_to_blocks(
+        blocks, new_blocks, _get_id_to_idx(analysis),
     )
 
-    document_xml = wrap_document_body(body_content, original_document_xml)
-
-    output_path = save_document_xml(document_xml, extracted_path)
+    parts = _split_document_body(original_document_xml)
+    if parts is None:
+        body_content = assemble_document_xml(
+            marked_blocks,
+            paragraph_style_templates,
+            table_style_templates,
+            style_alias_map,
+        )
+        document_xml = wrap_document_body(body_content, original_document_xml)
+        output_path = save_document_xml(document_xml, extracted_path)
+    else:
+        # Stream the body straight to disk instead of building it in
+        # memory; the temp file keeps the original intact on failure.
+        head, tail = parts
+        output_path = document_xml_path
+        tmp_path = output_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(head)
+                assemble_document_xml(
+                    marked_blocks,
+                    paragraph_style_templates,
+                    table_style_templates,
+                    style_alias_map,
+                    writer=f,
+                )
+                f.write(tail)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     print(f"Applied {len(edits)} edits successfully")
     print(f"Output: {output_path}")
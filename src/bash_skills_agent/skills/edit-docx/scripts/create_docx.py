@@ -2,8 +2,8 @@
 """
 Create a new DOCX file from a content JSON specification.
 
-Uses ONLY Python stdlib (xml.etree.ElementTree, zipfile, json, os, sys).
-No external libraries required.
+Uses ONLY Python stdlib (xml.etree.ElementTree, zipfile, json, os, re, sys).
+No external libraries required; orjson is used for parsing when installed.
 
 Usage:
     python3 create_docx.py <content_json> <output_docx>
@@ -27,9 +27,19 @@ Content JSON format:
 
 import json
 import os
+import re
 import sys
 import zipfile
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+# keep catching the stdlib exception.
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 # ---------------------------------------------------------------------------
 # OOXML namespaces
 # ---------------------------------------------------------------------------
@@ -89,24 +99,8 @@ SETTINGS_XML = """\
 </w:settings>"""
 
 
-def build_styles_xml(font="Calibri", font_size=22):
-    """
-    Build word/styles.xml with Normal, Heading1-6, ListBullet, ListNumber styles.
-
-    Args:
-        font: Font family name (default: Calibri).
-        font_size: Font size in half-points for the Normal style (default: 22 = 11pt).
-
-    Returns:
-        Complete styles.xml content as a string.
-    """
-    # Heading sizes in half-points: Heading1=28, Heading2=26, ... Heading6=18
-    heading_sizes = {1: 28, 2: 26, 3: 24, 4: 22, 5: 20, 6: 18}
-
-    heading_styles = ""
-    for level in range(1, 7):
-        sz = heading_sizes[level]
-        heading_styles += """
+# One paragraph style per heading level, filled in by build_styles_xml
+HEADING_STYLE_TEMPLATE = """
     <w:style w:type="paragraph" w:styleId="Heading{level}">
       <w:name w:val="heading {level}"/>
       <w:basedOn w:val="Normal"/>
@@ -125,9 +119,11 @@ def build_styles_xml(font="Calibri", font_size=22):
         <w:sz w:val="{sz}"/>
         <w:szCs w:val="{sz}"/>
       </w:rPr>
-    </w:style>""".format(level=level, outline=level - 1, font=xml_escape(font), sz=sz)
+    </w:style>"""
+
 
-    styles_xml = """\
+# word/styles.xml, filled in by build_styles_xml
+STYLES_XML_TEMPLATE = """\
 <?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
           xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
@@ -211,12 +207,37 @@ def build_styles_xml(font="Calibri", font_size=22):
     </w:tblPr>
   </w:style>
 
-</w:styles>""".format(
-        font=xml_escape(font),
+</w:styles>"""
+
+
+def build_styles_xml(font="Calibri", font_size=22):
+    """
+    Build word/styles.xml with Normal, Heading1-6, ListBullet, ListNumber styles.
+
+    Args:
+        font: Font family name (default: Calibri).
+        font_size: Font size in half-points for the Normal style (default: 22 = 11pt).
+
+    Returns:
+        Complete styles.xml content as a string.
+    """
+    # Heading sizes in half-points: Heading1=28, Heading2=26, ... Heading6=18
+    heading_sizes = {1: 28, 2: 26, 3: 24, 4: 22, 5: 20, 6: 18}
+    font_esc = xml_escape(font)
+
+    heading_styles = "".join(
+        HEADING_STYLE_TEMPLATE.format(
+            level=level, outline=level - 1, font=font_esc,
+            sz=heading_sizes[level],
+        )
+        for level in range(1, 7)
+    )
+
+    return STYLES_XML_TEMPLATE.format(
+        font=font_esc,
         font_size=font_size,
         heading_styles=heading_styles,
     )
-    return styles_xml
 
 
 NUMBERING_XML = """\
@@ -269,6 +290,16 @@ NUMBERING_XML = """\
 # XML escape helper
 # ---------------------------------------------------------------------------
 
+_XML_ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&apos;",
+})
+_NEEDS_ESCAPE = re.compile(r"[&<>\"']").search
+
+
 def xml_escape(text):
     """
     Escape special XML characters in text content.
@@ -277,12 +308,9 @@ def xml_escape(text):
     """
     if not isinstance(text, str):
         text = str(text)
-    text = text.replace("&", "&amp;")
-    text = text.replace("<", "&lt;")
-    text = text.replace(">", "&gt;")
-    text = text.replace('"', "&quot;")
-    text = text.replace("'", "&apos;")
-    return text
+    if _NEEDS_ESCAPE(text) is None:
+        return text
+    return text.translate(_XML_ESCAPE_TABLE)
 
 
 # ---------------------------------------------------------------------------
@@ -297,10 +325,10 @@ def build_heading(item):
     text = xml_escape(item.get("text", ""))
     return (
         '<w:p>'
-        '<w:pPr><w:pStyle w:val="Heading{level}"/></w:pPr>'
-        '<w:r><w:t xml:space="preserve">{text}</w:t></w:r>'
+        f'<w:pPr><w:pStyle w:val="Heading{level}"/></w:pPr>'
+        f'<w:r><w:t xml:space="preserve">{text}</w:t></w:r>'
         '</w:p>'
-    ).format(level=level, text=text)
+    )
 
 
 def build_paragraph(item):
@@ -308,45 +336,39 @@ def build_paragraph(item):
     text = xml_escape(item.get("text", ""))
     return (
         '<w:p>'
-        '<w:r><w:t xml:space="preserve">{text}</w:t></w:r>'
+        f'<w:r><w:t xml:space="preserve">{text}</w:t></w:r>'
         '</w:p>'
-    ).format(text=text)
+    )
 
 
 def build_bullet_list(item):
     """Build XML for a bullet list (one paragraph per item)."""
     items = item.get("items", [])
-    paragraphs = []
-    for list_item in items:
-        text = xml_escape(str(list_item))
-        paragraphs.append(
-            '<w:p>'
-            '<w:pPr>'
-            '<w:pStyle w:val="ListBullet"/>'
-            '<w:numPr><w:ilvl w:val="0"/><w:numId w:val="1"/></w:numPr>'
-            '</w:pPr>'
-            '<w:r><w:t xml:space="preserve">{text}</w:t></w:r>'
-            '</w:p>'.format(text=text)
-        )
-    return "\n".join(paragraphs)
+    return "\n".join(
+        '<w:p>'
+        '<w:pPr>'
+        '<w:pStyle w:val="ListBullet"/>'
+        '<w:numPr><w:ilvl w:val="0"/><w:numId w:val="1"/></w:numPr>'
+        '</w:pPr>'
+        f'<w:r><w:t xml:space="preserve">{xml_escape(str(list_item))}</w:t></w:r>'
+        '</w:p>'
+        for list_item in items
+    )
 
 
 def build_numbered_list(item):
     """Build XML for a numbered list (one paragraph per item)."""
     items = item.get("items", [])
-    paragraphs = []
-    for list_item in items:
-        text = xml_escape(str(list_item))
-        paragraphs.append(
-            '<w:p>'
-            '<w:pPr>'
-            '<w:pStyle w:val="ListNumber"/>'
-            '<w:numPr><w:ilvl w:val="0"/><w:numId w:val="2"/></w:numPr>'
-            '</w:pPr>'
-            '<w:r><w:t xml:space="preserve">{text}</w:t></w:r>'
-            '</w:p>'.format(text=text)
-        )
-    return "\n".join(paragraphs)
+    return "\n".join(
+        '<w:p>'
+        '<w:pPr>'
+        '<w:pStyle w:val="ListNumber"/>'
+        '<w:numPr><w:ilvl w:val="0"/><w:numId w:val="2"/></w:numPr>'
+        '</w:pPr>'
+        f'<w:r><w:t xml:space="preserve">{xml_escape(str(list_item))}</w:t></w:r>'
+        '</w:p>'
+        for list_item in items
+    )
 
 
 def build_table_cell(text, bold=False):
@@ -358,12 +380,12 @@ def build_table_cell(text, bold=False):
         '<w:tcPr><w:tcW w:w="0" w:type="auto"/></w:tcPr>'
         '<w:p>'
         '<w:r>'
-        '<w:rPr>{bold_xml}</w:rPr>'
-        '<w:t xml:space="preserve">{text}</w:t>'
+        f'<w:rPr>{bold_xml}</w:rPr>'
+        f'<w:t xml:space="preserve">{escaped}</w:t>'
         '</w:r>'
         '</w:p>'
         '</w:tc>'
-    ).format(bold_xml=bold_xml, text=escaped)
+    )
 
 
 def build_table(item):
@@ -377,19 +399,19 @@ def build_table(item):
         return ""
 
     # Table grid columns
-    grid_cols = "".join('<w:gridCol w:w="0"/>' for _ in range(num_cols))
+    grid_cols = '<w:gridCol w:w="0"/>' * num_cols
 
     # Build header row if present
     header_row_xml = ""
     if headers:
         header_cells = "".join(build_table_cell(h, bold=True) for h in headers)
-        header_row_xml = "<w:tr>{cells}</w:tr>".format(cells=header_cells)
+        header_row_xml = f"<w:tr>{header_cells}</w:tr>"
 
     # Build data rows
     data_rows_xml = ""
     for row in rows:
         cells = "".join(build_table_cell(cell) for cell in row)
-        data_rows_xml += "<w:tr>{cells}</w:tr>".format(cells=cells)
+        data_rows_xml += f"<w:tr>{cells}</w:tr>"
 
     return (
         '<w:tbl>'
@@ -399,17 +421,31 @@ def build_table(item):
         '<w:tblLook w:val="04A0" w:firstRow="1" w:lastRow="0"'
         ' w:firstColumn="1" w:lastColumn="0" w:noHBand="0" w:noVBand="1"/>'
         '</w:tblPr>'
-        '<w:tblGrid>{grid_cols}</w:tblGrid>'
-        '{header_row}{data_rows}'
+        f'<w:tblGrid>{grid_cols}</w:tblGrid>'
+        f'{header_row_xml}{data_rows_xml}'
         '</w:tbl>'
         '<w:p/>'
-    ).format(
-        grid_cols=grid_cols,
-        header_row=header_row_xml,
-        data_rows=data_rows_xml,
     )
 
 
+# Fixed markup around the generated body content
+DOCUMENT_XML_PREFIX = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<w:body>'
+)
+DOCUMENT_XML_SUFFIX = (
+    '<w:sectPr>'
+    '<w:pgSz w:w="12240" w:h="15840"/>'
+    '<w:pgMar w:top="1440" w:right="1440" w:bottom="1440" w:left="1440"'
+    ' w:header="720" w:footer="720" w:gutter="0"/>'
+    '<w:cols w:space="720"/>'
+    '</w:sectPr>'
+    '</w:body>'
+    '</w:document>'
+)
+
 # Map of content type to builder function
 CONTENT_BUILDERS = {
     "heading": build_heading,
@@ -420,51 +456,66 @@ CONTENT_BUILDERS = {
 }
 
 
-def build_document_xml(content_items):
+def iter_document_xml(content_items):
     """
-    Build the complete word/document.xml from a list of content items.
+    Yield word/document.xml in fragments, one per content item.
 
     Args:
         content_items: List of dicts, each with a "type" key and type-specific fields.
 
-    Returns:
-        Complete document.xml content as a string.
+    Yields:
+        Consecutive pieces of the document.xml content.
     """
-    body_parts = []
+    yield DOCUMENT_XML_PREFIX
 
+    first = True
     for item in content_items:
         item_type = item.get("type", "")
-        builder = CONTENT_BUILDERS.get(item_type)
-        if builder is None:
-            # Skip unknown content types with a warning to stderr
-            print(
-                "Warning: Unknown content type '{}', skipping.".format(item_type),
-                file=sys.stderr,
-            )
-            continue
-        xml_fragment = builder(item)
+        # Built-in types are matched directly, most common first; anything
+        # else goes through CONTENT_BUILDERS so added entries still work.
+        match item_type:
+            case "paragraph":
+                xml_fragment = build_paragraph(item)
+            case "heading":
+                xml_fragment = build_heading(item)
+            case "bullet_list":
+                xml_fragment = build_bullet_list(item)
+            case "numbered_list":
+                xml_fragment = build_numbered_list(item)
+            case "table":
+                xml_fragment = build_table(item)
+            case _:
+                builder = CONTENT_BUILDERS.get(item_type)
+                if builder is None:
+                    # Skip unknown content types with a warning to stderr
+                    print(
+                        "Warning: Unknown content type '{}', skipping.".format(
+                            item_type,
+                        ),
+                        file=sys.stderr,
+                    )
+                    continue
+                xml_fragment = builder(item)
         if xml_fragment:
-            body_parts.append(xml_fragment)
+            if not first:
+                yield "\n"
+            yield xml_fragment
+            first = False
 
-    body_content = "\n".join(body_parts)
+    yield DOCUMENT_XML_SUFFIX
 
-    document_xml = (
-        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
-        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
-        ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
-        '<w:body>'
-        '{body}'
-        '<w:sectPr>'
-        '<w:pgSz w:w="12240" w:h="15840"/>'
-        '<w:pgMar w:top="1440" w:right="1440" w:bottom="1440" w:left="1440"'
-        ' w:header="720" w:footer="720" w:gutter="0"/>'
-        '<w:cols w:space="720"/>'
-        '</w:sectPr>'
-        '</w:body>'
-        '</w:document>'
-    ).format(body=body_content)
 
-    return document_xml
+def build_document_xml(content_items):
+    """
+    Build the complete word/document.xml from a list of content items.
+
+    Args:
+        content_items: List of dicts, each with a "type" key and type-specific fields.
+
+    Returns:
+        Complete document.xml content as a string.
+    """
+    return "".join(iter_document_xml(content_items))
 
 
 # ---------------------------------------------------------------------------
@@ -481,7 +532,7 @@ def create_docx(content_json_path, output_docx_path):
     """
     # Read and parse the content JSON
     with open(content_json_path, "r", encoding="utf-8") as f:
-        spec = json.load(f)
+        spec = _json_loads(f.read())
 
     content_items = spec.get("content", [])
     properties = spec.get("properties", {})
@@ -493,24 +544,45 @@ def create_docx(content_json_path, output_docx_path):
     # Ensure font_size is an integer
     font_size = int(font_size)
 
-    # Build all the XML parts
-    document_xml = build_document_xml(content_items)
-    styles_xml = build_styles_xml(font=font, font_size=font_size)
+    # document.xml is streamed into the archive below; styles.xml is small
+    styles_bytes = build_styles_xml(font=font, font_size=font_size).encode("utf-8")
 
     # Ensure output directory exists
     output_dir = os.path.dirname(output_docx_path)
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
 
-    # Package everything into a ZIP file with .docx extension
-    with zipfile.ZipFile(output_docx_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr("[Content_Types].xml", CONTENT_TYPES_XML)
-        zf.writestr("_rels/.rels", RELS_XML)
-        zf.writestr("word/_rels/document.xml.rels", DOCUMENT_RELS_XML)
-        zf.writestr("word/document.xml", document_xml)
-        zf.writestr("word/styles.xml", styles_xml)
-        zf.writestr("word/numbering.xml", NUMBERING_XML)
-        zf.writestr("word/settings.xml", SETTINGS_XML)
+    # Package everything into a ZIP file with .docx extension.
+    # The fixed template parts are small enough that deflating them costs
+    # more than it saves; the generated parts use the fastest deflate level.
+    # document.xml is encoded and compressed item by item rather than held
+    # in memory as one string; a partial archive is removed on failure.
+    try:
+        with zipfile.ZipFile(
+            output_docx_path, "w", zipfile.ZIP_DEFLATED, compresslevel=1,
+        ) as zf:
+            for name, data in (
+                ("[Content_Types].xml", CONTENT_TYPES_XML),
+                ("_rels/.rels", RELS_XML),
+                ("word/_rels/document.xml.rels", DOCUMENT_RELS_XML),
+            ):
+                zf.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+            with zf.open("word/document.xml", "w") as fp:
+                for fragment in iter_document_xml(content_items):
+                    fp.write(fragment.encode("utf-8"))
+            zf.writestr("word/styles.xml", styles_bytes)
+            zf.writestr(
+                "word/numbering.xml", NUMBERING_XML,
+                compress_type=zipfile.ZIP_STORED,
+            )
+            zf.writestr(
+                "word/settings.xml", SETTINGS_XML,
+                compress_type=zipfile.ZIP_STORED,
+            )
+    except BaseException:
+        if os.path.exists(output_docx_path):
+            os.remove(output_docx_path)
+        raise
 
     # Report success
     file_size = os.path.getsize(output_docx_path)
@@ -29,11 +29,33 @@ Outputs:
 """
 
 import copy
+import functools
 import json
 import os
 import re
 import sys
-from xml.etree import ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from lxml import etree as ET
+except ImportError:
+    from xml.etree import ElementTree as ET
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj).decode("utf-8")
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False)
 
 W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
 R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
@@ -44,20 +66,64 @@ ET.register_namespace("w", W_NS)
 ET.register_namespace("r", R_NS)
 
 
+def _compile_path(path):
+    """Return a callable that finds all matches of *path* under an element.
+
+    Uses a precompiled XPath under lxml and ElementTree's findall otherwise.
+    """
+    if hasattr(ET, "XPath"):
+        return ET.XPath(path, namespaces=NAMESPACES)
+    return lambda elem: elem.findall(path, NAMESPACES)
+
+
+_XP_TR_DESC = _compile_path(".//w:tr")
+_XP_TC_DESC = _compile_path(".//w:tc")
+_XP_P = _compile_path("w:p")
+_XP_R_DESC = _compile_path(".//w:r")
+_XP_T = _compile_path("w:t")
+_XP_RPR = _compile_path("w:rPr")
+
+# Table cell paragraph target ids: "b12:r3c1p0"
+_CELL_PARA_ID_RE = re.compile(r"b\d+:r(\d+)c(\d+)p(\d+)")
+
+# A serialised <w:t> element (self-closing or with text) and its attributes
+_T_ELEMENT_RE = re.compile(r"<w:t(\s[^>]*?)?(?:/>|>[^<]*</w:t>)")
+_XML_SPACE_ATTR_RE = re.compile(r'xml:space="[^"]*"')
+
+# Below this many blocks a thread pool costs more than it saves
+_PARALLEL_PARSE_MIN_BLOCKS = 8
+
+
 # -------------------------------------------------------------------
 # Helpers
 # -------------------------------------------------------------------
 
-def _describe_run_rpr(run):
-    """Human-readable description of a run's rPr formatting."""
-    r_pr = run.find("w:rPr", NAMESPACES)
-    if r_pr is None:
+def _rpr_fingerprint(elem):
+    """Hashable key for an rPr subtree: child tags and attributes, recursively.
+
+    Stands in for ET.tostring() when grouping runs by formatting.
+    """
+    return tuple(
+        (child.tag, tuple(sorted(child.attrib.items())), _rpr_fingerprint(child))
+        for child in elem
+        if isinstance(child.tag, str)
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _describe_fingerprint(fingerprint):
+    """Human-readable description of an rPr from its _rpr_fingerprint.
+
+    None (no rPr at all) describes as "default".
+    """
+    if fingerprint is None:
         return "default"
 
     descriptions = []
-    for child in r_pr:
-        tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-        val = child.get(f"{{{W_NS}}}val")
+    for tag, attr_items, _ in fingerprint:
+        tag = tag.split("}")[-1] if "}" in tag else tag
+        attrs = dict(attr_items)
+        val = attrs.get(f"{{{W_NS}}}val")
         off = val in ("0", "false")
         if tag == "b" and not off:
             descriptions.append("bold")
@@ -70,44 +136,113 @@ def _describe_run_rpr(run):
         elif tag == "color":
             descriptions.append(f"color:{val or ''}")
         elif tag == "rFonts":
-            font = child.get(f"{{{W_NS}}}ascii", "")
+            font = attrs.get(f"{{{W_NS}}}ascii", "")
             if font:
                 descriptions.append(f"font:{font}")
 
     return ", ".join(descriptions) if descriptions else "default"
 
 
-def _build_rst_from_run(run):
+def _describe_run_rpr(run):
+    """Human-readable description of a run's rPr formatting."""
+    r_prs = _XP_RPR(run)
+    return _describe_fingerprint(_rpr_fingerprint(r_prs[0]) if r_prs else None)
+
+
+def _template_t_element(match):
+    """Rewrite a serialised <w:t> to hold {{content}} with space preserved."""
+    # rstrip: ElementTree writes empty elements as "<w:t />"
+    attrs = (match.group(1) or "").rstrip()
+    if "xml:space=" in attrs:
+        attrs = _XML_SPACE_ATTR_RE.sub('xml:space="preserve"', attrs)
+    else:
+        attrs += ' xml:space="preserve"'
+    return f"<w:t{attrs}>{{{{content}}}}</w:t>"
+
+
+def _build_rst_from_run(run, fingerprint=None):
     """Build RST dict from a <w:r> element.
 
+    fingerprint, the run's rPr _rpr_fingerprint, is computed if not given.
+
     Returns:
         Dict with rpr_xml (template with {{content}}) and display_description.
     """
-    template_run = copy.deepcopy(run)
-    for t in template_run.findall("w:t", NAMESPACES):
-        t.text = "{{content}}"
-        t.set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
-    rpr_xml = ET.tostring(template_run, encoding="unicode")
-    desc = _describe_run_rpr(run)
+    rpr_xml, replaced = _T_ELEMENT_RE.subn(
+        _template_t_element, ET.tostring(run, encoding="unicode"),
+    )
+    if replaced != len(_XP_T(run)):
+        # Unexpected serialisation (e.g. another prefix); edit a copy instead
+        template_run = copy.deepcopy(run)
+        for t in _XP_T(template_run):
+            t.text = "{{content}}"
+            t.set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
+        rpr_xml = ET.tostring(template_run, encoding="unicode")
+    if fingerprint is None:
+        desc = _describe_run_rpr(run)
+    else:
+        desc = _describe_fingerprint(fingerprint)
     return {"rpr_xml": rpr_xml, "display_description": desc}
 
 
-def _extract_table_paragraph_xml(table_xml, row_idx, col_idx, para_idx):
-    """Extract specific paragraph XML from table block."""
+def _parse_xml(xml):
+    """Parse block XML, returning None if it is malformed."""
     try:
-        root = ET.fromstring(table_xml)
-        rows = root.findall(".//w:tr", NAMESPACES)
-        if row_idx >= len(rows):
-            return ""
-        cells = rows[row_idx].findall(".//w:tc", NAMESPACES)
-        if col_idx >= len(cells):
-            return ""
-        paragraphs = cells[col_idx].findall("w:p", NAMESPACES)
-        if para_idx >= len(paragraphs):
-            return ""
-        return ET.tostring(paragraphs[para_idx], encoding="unicode")
+        return ET.fromstring(xml.encode("utf-8"))
     except ET.ParseError:
+        return None
+
+
+def _parse_blocks(xml_by_id):
+    """Parse block XML strings keyed by block id (None for malformed ones).
+
+    lxml releases the GIL while parsing, so with enough blocks the parses
+    run on a thread pool; ElementTree's parser would only serialise them.
+    """
+    if hasattr(ET, "XPath") and len(xml_by_id) >= _PARALLEL_PARSE_MIN_BLOCKS:
+        workers = min(len(xml_by_id), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            roots = pool.map(_parse_xml, xml_by_id.values())
+            return dict(zip(xml_by_id, roots))
+    return {bid: _parse_xml(xml) for bid, xml in xml_by_id.items()}
+
+
+def _find_table_paragraph(table_root, row_idx, col_idx, para_idx):
+    """Find a specific paragraph element in a parsed table, or None."""
+    rows = _XP_TR_DESC(table_root)
+    if row_idx >= len(rows):
+        return None
+    cells = _XP_TC_DESC(rows[row_idx])
+    if col_idx >= len(cells):
+        return None
+    paragraphs = _XP_P(cells[col_idx])
+    if para_idx >= len(paragraphs):
+        return None
+    return paragraphs[para_idx]
+
+
+def _index_table_paragraphs(table_root):
+    """Map (row_idx, col_idx, para_idx) to paragraph elements in one pass.
+
+    Uses the same row/cell/paragraph numbering as _find_table_paragraph.
+    """
+    index = {}
+    for r_idx, row in enumerate(_XP_TR_DESC(table_root)):
+        for c_idx, cell in enumerate(_XP_TC_DESC(row)):
+            for p_idx, paragraph in enumerate(_XP_P(cell)):
+                index[r_idx, c_idx, p_idx] = paragraph
+    return index
+
+
+def _extract_table_paragraph_xml(table_xml, row_idx, col_idx, para_idx):
+    """Extract specific paragraph XML from table block."""
+    root = _parse_xml(table_xml)
+    if root is None:
         return ""
+    paragraph = _find_table_paragraph(root, row_idx, col_idx, para_idx)
+    if paragraph is None:
+        return ""
+    return ET.tostring(paragraph, encoding="unicode")
 
 
 def _extract_runs_from_xml(paragraph_xml):
@@ -118,31 +253,37 @@ def _extract_runs_from_xml(paragraph_xml):
         rst_map: {"RS0": {"rpr_xml": ..., "display_description": ...}, ...}
         original_segments: [("text", "RS0"), ...]
     """
-    try:
-        root = ET.fromstring(paragraph_xml)
-    except ET.ParseError:
+    root = _parse_xml(paragraph_xml)
+    if root is None:
         return None, None
+    return _extract_runs(root)
+
 
-    runs = root.findall(".//w:r", NAMESPACES)
+def _extract_runs(root):
+    """Same as _extract_runs_from_xml, for an already parsed element."""
+    runs = _XP_R_DESC(root)
+    if len(runs) < 2:
+        # Fewer than two runs can never yield two run styles
+        return None, None
 
     rst_map = {}
     original_segments = []
     fp_to_alias = {}
 
     for run in runs:
-        texts = [t.text for t in run.findall("w:t", NAMESPACES) if t.text]
+        texts = [t.text for t in _XP_T(run) if t.text]
         if not any(t.strip() for t in texts):
             continue
 
-        rpr_elem = run.find("w:rPr", NAMESPACES)
-        fp = ET.tostring(rpr_elem, encoding="unicode") if rpr_elem is not None else ""
+        rpr_elems = _XP_RPR(run)
+        fp = _rpr_fingerprint(rpr_elems[0]) if rpr_elems else None
 
         if fp in fp_to_alias:
             alias = fp_to_alias[fp]
         else:
             alias = f"RS{len(rst_map)}"
             fp_to_alias[fp] = alias
-            rst_map[alias] = _build_rst_from_run(run)
+            rst_map[alias] = _build_rst_from_run(run, fp)
 
         original_segments.append(("".join(texts), alias))
 
@@ -152,37 +293,58 @@ def _extract_runs_from_xml(paragraph_xml):
     return rst_map, original_segments
 
 
+# Fixed tail of every run distribution prompt, one entry per line
+_PROMPT_TASK_LINES = (
+    "Task:",
+    "Distribute the new text across the run styles.",
+    "- Preserve formatting for key information (dates, numbers, terms)",
+    "- Match the original distribution pattern when possible",
+    "- Use run_style alias (RS0, RS1...) for each text segment",
+    "",
+    "Output Format (JSON only):",
+    '{"runs": [{"text": "...", "run_style": "RS0"}, ...]}',
+)
+
+
 def _build_prompt(new_text, rst_map, semantic_tag="", original_segments=None):
     """Build run distribution prompt — same format as original docx-agent."""
-    style_lines = []
-    for alias, rst in rst_map.items():
-        desc = rst.get("display_description", "default")
-        style_lines.append(f"  {alias}: [{desc}]")
-    runs_section = "Run styles:\n" + "\n".join(style_lines)
+    lines = ["Run styles:"]
+    lines.extend(
+        f"  {alias}: [{rst.get('display_description', 'default')}]"
+        for alias, rst in rst_map.items()
+    )
 
     if original_segments is not None:
-        seg_lines = [f'  "{text}" -> {alias}' for text, alias in original_segments]
-        runs_section += "\n\nOriginal text distribution:\n" + "\n".join(seg_lines)
+        lines.append("")
+        lines.append("Original text distribution:")
+        lines.extend(f'  "{text}" -> {alias}' for text, alias in original_segments)
     elif semantic_tag:
-        runs_section += f"\nSemantic context: {semantic_tag}"
-
-    return (
-        f"{runs_section}\n\n"
-        f'New text: "{new_text}"\n\n'
-        f"Task:\n"
-        f"Distribute the new text across the run styles.\n"
-        f"- Preserve formatting for key information (dates, numbers, terms)\n"
-        f"- Match the original distribution pattern when possible\n"
-        f"- Use run_style alias (RS0, RS1...) for each text segment\n\n"
-        f"Output Format (JSON only):\n"
-        f'{{"runs": [{{"text": "...", "run_style": "RS0"}}, ...]}}'
-    )
+        lines.append(f"Semantic context: {semantic_tag}")
+
+    lines.append("")
+    lines.append(f'New text: "{new_text}"')
+    lines.append("")
+    lines.extend(_PROMPT_TASK_LINES)
+    return "\n".join(lines)
 
 
 # -------------------------------------------------------------------
 # Main logic
 # -------------------------------------------------------------------
 
+def _needs_run_prompt(edit):
+    """Whether an edit is a paragraph replace/insert still lacking runs."""
+    if edit.get("action", "") not in ("replace", "insert_after", "insert_before"):
+        return False
+    # Skip table-level edits
+    if edit.get("edit_unit") in ("table", "row", "column"):
+        return False
+    if not edit.get("new_text", ""):
+        return False
+    # Skip if edit already has runs specified
+    return not edit.get("runs")
+
+
 def generate_prompts(work_dir):
     """Generate run distribution prompts for all applicable edits."""
     analysis_path = os.path.join(work_dir, "analysis.json")
@@ -196,11 +358,11 @@ def generate_prompts(work_dir):
         )
         return {"prompts": []}
 
-    with open(analysis_path, "r", encoding="utf-8") as f:
-        analysis = json.load(f)
+    with open(analysis_path, "rb") as f:
+        analysis = _json_loads(f.read())
 
-    with open(edits_path, "r", encoding="utf-8") as f:
-        edits_data = json.load(f)
+    with open(edits_path, "rb") as f:
+        edits_data = _json_loads(f.read())
 
     edits = edits_data.get("edits", [])
     blocks = analysis.get("blocks", [])
@@ -209,48 +371,55 @@ def generate_prompts(work_dir):
 
     id_to_block = {b["id"]: b for b in blocks}
 
+    pending = [
+        (i, edit) for i, edit in enumerate(edits) if _needs_run_prompt(edit)
+    ]
+
+    # Several edits often target the same block (or table cell), so each
+    # replaced block is parsed, up front, and each table's paragraphs
+    # indexed only once.
+    xml_by_id = {}
+    for _, edit in pending:
+        if edit.get("action") == "replace":
+            base_id = edit.get("target_id", "").split(":")[0]
+            if base_id not in xml_by_id and id_to_block.get(base_id):
+                xml_by_id[base_id] = id_to_block[base_id].get("xml", "")
+    parsed_blocks = _parse_blocks(xml_by_id)
+    table_paragraphs = {}
+
     prompts = []
 
-    for i, edit in enumerate(edits):
+    for i, edit in pending:
         action = edit.get("action", "")
-        if action not in ("replace", "insert_after", "insert_before"):
-            continue
-
-        # Skip table-level edits
-        edit_unit = edit.get("edit_unit")
-        if edit_unit in ("table", "row", "column"):
-            continue
-
         target_id = edit.get("target_id", "")
         new_text = edit.get("new_text", "")
         semantic_tag = edit.get("semantic_tag", "")
 
-        if not new_text:
-            continue
-
-        # Skip if edit already has runs specified
-        if edit.get("runs"):
-            continue
-
         base_id = target_id.split(":")[0]
         block = id_to_block.get(base_id)
 
         if action == "replace" and block:
             # REPLACE: extract original run distribution from block XML
-            xml = block.get("xml", "")
-            paragraph_xml = xml
+            root = parsed_blocks[base_id]
+            paragraph = root
 
             # For table cell paragraphs, extract specific paragraph
-            cell_match = re.match(r"b\d+:r(\d+)c(\d+)p(\d+)", target_id)
-            if cell_match:
+            cell_match = _CELL_PARA_ID_RE.match(target_id)
+            if cell_match and root is not None:
                 r_idx = int(cell_match.group(1))
                 c_idx = int(cell_match.group(2))
                 p_idx = int(cell_match.group(3))
-                extracted = _extract_table_paragraph_xml(xml, r_idx, c_idx, p_idx)
-                if extracted:
-                    paragraph_xml = extracted
-
-            rst_map, original_segments = _extract_runs_from_xml(paragraph_xml)
+                index = table_paragraphs.get(base_id)
+                if index is None:
+                    index = table_paragraphs[base_id] = (
+                        _index_table_paragraphs(root)
+                    )
+                paragraph = index.get((r_idx, c_idx, p_idx), root)
+
+            if paragraph is None:
+                rst_map, original_segments = None, None
+            else:
+                rst_map, original_segments = _extract_runs(paragraph)
             if rst_map:
                 prompt = _build_prompt(
                     new_text, rst_map,
@@ -315,7 +484,7 @@ def main():
 
     work_dir = sys.argv[1]
     result = generate_prompts(work_dir)
-    print(json.dumps(result, ensure_ascii=False))
+    print(_json_dumps(result))
 
 
 if __name__ == "__main__":
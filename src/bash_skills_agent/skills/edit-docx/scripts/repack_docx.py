@@ -14,8 +14,11 @@ Arguments:
                     so Word updates TOC/fields on open
 """
 
+import copy
 import os
 import re
+import shutil
+import struct
 import sys
 import zipfile
 
@@ -27,6 +30,57 @@ REQUIRED_DOCX_FILES = [
     "word/_rels/document.xml.rels",
 ]
 
+# settings.xml patterns used by inject_update_fields
+_UPDATE_FIELDS_VAL_RE = re.compile(r'(<w:updateFields[^/]*w:val=")[^"]*(")')
+_SELF_CLOSING_SETTINGS_RE = re.compile(r"(<w:settings\b[^>]*?)\s*/>")
+
+
+def _copy_entry_raw(
+    source_zip: zipfile.ZipFile,
+    target_zip: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+) -> bool:
+    """Copy an entry's compressed bytes into target_zip without recompressing.
+
+    zipfile has no public API for this, so the local header is written
+    directly and the archive's bookkeeping updated the same way
+    ZipFile.open(..., "w") does. Returns False (writing nothing) for entries
+    this cannot handle (encrypted, ZIP64-sized, or an unexpected local
+    header); the caller should then fall back to writestr.
+    """
+    if info.flag_bits & 0x1 or max(
+        info.file_size, info.compress_size
+    ) > zipfile.ZIP64_LIMIT:
+        return False
+
+    source = source_zip.fp
+    source.seek(info.header_offset)
+    header = source.read(zipfile.sizeFileHeader)
+    if len(header) != zipfile.sizeFileHeader:
+        return False
+    fields = struct.unpack(zipfile.structFileHeader, header)
+    if fields[0] != zipfile.stringFileHeader:
+        return False
+    # fields[10] / fields[11]: file name and extra field lengths
+    source.seek(fields[10] + fields[11], os.SEEK_CUR)
+    raw = source.read(info.compress_size)
+    if len(raw) != info.compress_size:
+        return False
+
+    new_info = copy.copy(info)
+    # Sizes and CRC are known up front, so no trailing data descriptor
+    new_info.flag_bits &= ~0x8
+    target_zip._writecheck(new_info)
+    target = target_zip.fp
+    new_info.header_offset = target.tell()
+    target.write(new_info.FileHeader())
+    target.write(raw)
+    target_zip.start_dir = target.tell()
+    target_zip.filelist.append(new_info)
+    target_zip.NameToInfo[new_info.filename] = new_info
+    target_zip._didModify = True
+    return True
+
 
 def package_to_docx(
     original_docx_path: str,
@@ -61,41 +115,67 @@ def package_to_docx(
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
 
-    # Collect the set of modified XML/RELS files from the extracted directory
-    modified_files: set[str] = set()
+    # Map zip entry names of the modified XML/RELS files to their paths on
+    # disk (zip names always use "/", whatever os.sep is)
+    modified_files: dict[str, str] = {}
     for root, _, files in os.walk(extracted_path):
         for filename in files:
             if filename.endswith((".xml", ".rels")):
-                rel_path = os.path.relpath(
-                    os.path.join(root, filename), extracted_path
-                )
-                modified_files.add(rel_path)
+                full_path = os.path.join(root, filename)
+                rel_path = os.path.relpath(full_path, extracted_path)
+                modified_files[rel_path.replace(os.sep, "/")] = full_path
 
     # Rebuild the DOCX: iterate original entries in order, replacing
     # modified files while keeping everything else byte-identical.
-    with zipfile.ZipFile(output_path, "w") as output_zip:
+    # Modified entries are deflated at level 1: several times faster than
+    # the default level, for a slightly larger part.
+    with zipfile.ZipFile(
+        output_path, "w", zipfile.ZIP_DEFLATED, compresslevel=1,
+    ) as output_zip:
         with zipfile.ZipFile(original_docx_path, "r") as original_zip:
             for info in original_zip.infolist():
-                if info.filename in modified_files:
-                    # Replace with the modified version, preserving ZipInfo
-                    full_path = os.path.join(extracted_path, info.filename)
-                    if os.path.exists(full_path):
-                        with open(full_path, "rb") as f:
-                            output_zip.writestr(info, f.read())
-                    else:
-                        # File listed but missing on disk; keep original
-                        output_zip.writestr(
-                            info, original_zip.read(info.filename)
-                        )
-                else:
+                full_path = modified_files.get(info.filename)
+                if full_path is not None:
+                    # Replace with the modified version, preserving ZipInfo.
+                    # file_size is set first, as writestr would, so
+                    # zipfile can decide whether the entry needs ZIP64.
+                    info.file_size = os.path.getsize(full_path)
+                    info.compress_type = output_zip.compression
+                    # ZipFile.open(info, "w") takes the level from the
+                    # ZipInfo, not from the archive
+                    info._compresslevel = output_zip.compresslevel
+                    with open(full_path, "rb") as src, \
+                            output_zip.open(info, "w") as dst:
+                        shutil.copyfileobj(src, dst, 64 * 1024)
+                elif not _copy_entry_raw(original_zip, output_zip, info):
                     # Copy original entry as-is (preserves ZipInfo metadata)
                     output_zip.writestr(
-                        info, original_zip.read(info.filename)
+                        info, original_zip.read(info)
                     )
 
     return output_path
 
 
+def _find_markers(stream, markers: tuple[bytes, ...],
+                  chunk_size: int = 8192) -> set[bytes]:
+    """Return which of markers occur in a binary stream.
+
+    Reads chunk by chunk, keeping enough of the previous chunk to catch a
+    marker split across the boundary, and stops once all have been seen.
+    """
+    missing = set(markers)
+    overlap = max(len(m) for m in markers) - 1
+    carry = b""
+    while missing:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        window = carry + chunk
+        missing.difference_update([m for m in missing if m in window])
+        carry = window[-overlap:] if overlap else b""
+    return set(markers) - missing
+
+
 def validate_docx(docx_path: str) -> tuple[bool, list[str]]:
     """Validate the structure of a generated DOCX file.
 
@@ -126,12 +206,16 @@ def validate_docx(docx_path: str) -> tuple[bool, list[str]]:
             # Basic content validation of document.xml
             if "word/document.xml" in file_list:
                 try:
-                    content = z.read("word/document.xml")
-                    if b"<w:document" not in content:
+                    # Both tags sit near the start; avoid reading the rest
+                    with z.open("word/document.xml") as stream:
+                        found = _find_markers(
+                            stream, (b"<w:document", b"<w:body"),
+                        )
+                    if b"<w:document" not in found:
                         errors.append(
                             "document.xml missing w:document element"
                         )
-                    if b"<w:body" not in content:
+                    if b"<w:body" not in found:
                         errors.append("document.xml missing w:body element")
                 except Exception as e:
                     errors.append(f"Cannot read document.xml: {e}")
@@ -163,34 +247,28 @@ def inject_update_fields(extracted_path: str) -> None:
 
     if os.path.exists(settings_path):
         with open(settings_path, encoding="utf-8") as f:
-            content = f.read()
+            original = f.read()
 
-        if "w:updateFields" in content:
+        close_idx = original.rfind("</w:settings>")
+        if "w:updateFields" in original:
             # Flip existing val to "true"
-            content = re.sub(
-                r'(<w:updateFields[^/]*w:val=")[^"]*(")',
-                r"\g<1>true\2",
-                content,
-            )
+            content = _UPDATE_FIELDS_VAL_RE.sub(r"\g<1>true\2", original)
             print("Updated existing updateFields to true in settings.xml")
-        elif "</w:settings>" in content:
+        elif close_idx >= 0:
             # Insert before closing tag
-            content = content.replace(
-                "</w:settings>",
-                f"{update_tag}</w:settings>",
-            )
+            content = original[:close_idx] + update_tag + original[close_idx:]
             print("Injected updateFields into settings.xml")
         else:
             # Self-closing <w:settings .../> -> open + inject + close
-            content = re.sub(
-                r"(<w:settings\b[^>]*?)\s*/>",
-                rf"\1>{update_tag}</w:settings>",
-                content,
+            content = _SELF_CLOSING_SETTINGS_RE.sub(
+                rf"\1>{update_tag}</w:settings>", original,
             )
             print("Injected updateFields into self-closing settings.xml")
 
-        with open(settings_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        # Already "true" (e.g. a second run): leave the file untouched
+        if content != original:
+            with open(settings_path, "w", encoding="utf-8") as f:
+                f.write(content)
     else:
         # Create a minimal settings.xml with updateFields
         ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
@@ -248,25 +326,24 @@ def main() -> int:
 
         # Package the DOCX
         result_path = package_to_docx(original_docx, extracted_dir, output_docx)
-        print(f"DOCX created: {result_path}")
+        messages = [f"DOCX created: {result_path}"]
 
-        # Validate the result
+        # Validate the result, then report everything in one write per stream
         is_valid, errors = validate_docx(result_path)
         if is_valid:
             file_size = os.path.getsize(result_path)
-            print(f"Validation passed ({file_size} bytes)")
-        else:
-            print("Validation warnings:", file=sys.stderr)
-            for error in errors:
-                print(f"  - {error}", file=sys.stderr)
-
-        # Report final status
-        if is_valid:
-            print("SUCCESS")
+            messages.append(f"Validation passed ({file_size} bytes)")
+            messages.append("SUCCESS")
+            sys.stdout.write("\n".join(messages) + "\n")
             return 0
-        else:
-            print("FAILED: validation errors detected", file=sys.stderr)
-            return 1
+
+        sys.stdout.write("\n".join(messages) + "\n")
+        sys.stdout.flush()
+        warnings = ["Validation warnings:"]
+        warnings.extend(f"  - {error}" for error in errors)
+        warnings.append("FAILED: validation errors detected")
+        sys.stderr.write("\n".join(warnings) + "\n")
+        return 1
 
     except FileNotFoundError as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -17,20 +17,44 @@ Outputs:
     Exit code: 0 if valid, 1 if errors found.
 """
 
+import html
 import json
 import os
 import re
 import sys
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from xml.etree import ElementTree as ET
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 NAMESPACES = {
     "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
 }
 
-REQUIRED_ENTRIES = {"[Content_Types].xml", "word/document.xml"}
+_W = NAMESPACES["w"]
+_TAG_T = f"{{{_W}}}t"
+_TAG_BODY = f"{{{_W}}}body"
+
+DOCUMENT_XML = "word/document.xml"
+REQUIRED_ENTRIES = {"[Content_Types].xml", DOCUMENT_XML}
+
+# Archives at least this large run the structural checks on a thread
+# pool, overlapping testzip's inflate/CRC work with XML parsing.
+_PARALLEL_CHECK_MIN_BYTES = 1 << 20
 
 _RE_AUTO_NS = re.compile(r"\bns\d+:")
+_RE_WT = re.compile(r"<w:t(?:\s[^>]*)?>([^<]*)</w:t>")
 
 
 # -------------------------------------------------------------------
@@ -46,126 +70,130 @@ def _warn(check, msg):
 
 
 def _read_zip_entry(zf, name):
-    """Read a ZIP entry as UTF-8 string, falling back to latin-1."""
-    raw = zf.read(name)
-    try:
-        return raw.decode("utf-8")
-    except UnicodeDecodeError:
-        return raw.decode("latin-1")
+    """Read a ZIP entry as UTF-8 string; invalid bytes become surrogates."""
+    return zf.read(name).decode("utf-8", "surrogateescape")
 
 
 def _extract_all_text(xml_content):
-    """Extract all w:t text nodes from document XML."""
-    ns = NAMESPACES["w"]
+    """Extract all w:t text nodes from document XML.
+
+    Scans the raw XML with a regex instead of building a tree; the
+    parser is only used when the scan finds nothing (e.g. the document
+    binds the main namespace to a prefix other than ``w``).
+    """
+    parts = [text for text in _RE_WT.findall(xml_content) if text]
+    if parts:
+        return html.unescape(" ".join(parts))
+
     try:
         root = ET.fromstring(xml_content)
     except ET.ParseError:
         return ""
     parts = []
-    for t in root.iter(f"{{{ns}}}t"):
+    for t in root.iter(_TAG_T):
         if t.text:
             parts.append(t.text)
     return " ".join(parts)
 
 
+def _present_needles(needles, haystack):
+    """Return the subset of *needles* that occur in *haystack*.
+
+    With pyahocorasick installed all needles are found in one sweep over
+    the document text instead of one substring search per needle.
+    """
+    if ahocorasick is None or len(needles) < 2:
+        return {needle for needle in needles if needle in haystack}
+    automaton = ahocorasick.Automaton()
+    for needle in needles:
+        automaton.add_word(needle, needle)
+    automaton.make_automaton()
+    return {needle for _, needle in automaton.iter(haystack)}
+
+
 # -------------------------------------------------------------------
 # Individual validators
 # -------------------------------------------------------------------
 
-def validate_zip(path):
-    """Verify the file is a valid ZIP archive."""
+def validate_zip(zf, names, doc_xml, doc_root):
+    """Verify every ZIP entry passes its CRC check."""
     issues = []
     try:
-        with zipfile.ZipFile(path, "r") as zf:
-            bad = zf.testzip()
-            if bad is not None:
-                issues.append(_err("zip", f"Corrupt ZIP entry: {bad}"))
+        bad = zf.testzip()
+        if bad is not None:
+            issues.append(_err("zip", f"Corrupt ZIP entry: {bad}"))
     except zipfile.BadZipFile as e:
         issues.append(_err("zip", f"Invalid ZIP: {e}"))
-    except FileNotFoundError:
-        issues.append(_err("zip", f"File not found: {path}"))
     return issues
 
 
-def validate_entries(path):
+def validate_entries(zf, names, doc_xml, doc_root):
     """Check that required OOXML entries exist."""
     issues = []
-    try:
-        with zipfile.ZipFile(path, "r") as zf:
-            names = set(zf.namelist())
-            for req in REQUIRED_ENTRIES:
-                if req not in names:
-                    issues.append(_err("entries", f"Missing required entry: {req}"))
-    except (zipfile.BadZipFile, FileNotFoundError):
-        pass  # Already reported by validate_zip
+    for req in REQUIRED_ENTRIES:
+        if req not in names:
+            issues.append(_err("entries", f"Missing required entry: {req}"))
     return issues
 
 
-def validate_xml(path):
-    """Parse every .xml entry to ensure well-formedness."""
+def validate_xml(zf, names, doc_xml, doc_root):
+    """Parse every .xml entry to ensure well-formedness.
+
+    Entries are stream-parsed straight from the archive and each element
+    is cleared once closed, so no decoded copy or full tree is kept.
+    They are visited in file-offset order, one forward scan of the ZIP.
+    """
     issues = []
-    try:
-        with zipfile.ZipFile(path, "r") as zf:
-            for name in zf.namelist():
-                if not name.endswith(".xml"):
-                    continue
-                try:
-                    content = _read_zip_entry(zf, name)
-                    ET.fromstring(content)
-                except ET.ParseError as e:
-                    issues.append(_err("xml", f"{name}: {e}"))
-    except (zipfile.BadZipFile, FileNotFoundError):
-        pass
+    infos = sorted(zf.infolist(), key=lambda info: info.header_offset)
+    for info in infos:
+        name = info.filename
+        if not name.endswith(".xml"):
+            continue
+        if name == DOCUMENT_XML and doc_root is not None:
+            continue  # Already parsed once by validate()
+        try:
+            with zf.open(info) as fh:
+                for _, elem in ET.iterparse(fh):
+                    elem.clear()
+        except ET.ParseError as e:
+            issues.append(_err("xml", f"{name}: {e}"))
+        except zipfile.BadZipFile:
+            pass  # Already reported by validate_zip
     return issues
 
 
-def validate_structure(path):
+def validate_structure(zf, names, doc_xml, doc_root):
     """Verify document.xml has w:document root and w:body child."""
     issues = []
-    ns = NAMESPACES["w"]
-    try:
-        with zipfile.ZipFile(path, "r") as zf:
-            if "word/document.xml" not in zf.namelist():
-                return issues
-            content = _read_zip_entry(zf, "word/document.xml")
-            root = ET.fromstring(content)
+    if doc_root is None:
+        return issues  # Missing or malformed, reported elsewhere
 
-            if not root.tag.endswith("}document") and root.tag != "document":
-                issues.append(_err("structure",
-                                   f"Root element is '{root.tag}', expected w:document"))
+    if not doc_root.tag.endswith("}document") and doc_root.tag != "document":
+        issues.append(_err("structure",
+                           f"Root element is '{doc_root.tag}', expected w:document"))
 
-            body = root.find(f"{{{ns}}}body")
-            if body is None:
-                issues.append(_err("structure", "w:body element not found"))
-
-    except ET.ParseError:
-        pass  # Already reported by validate_xml
-    except (zipfile.BadZipFile, FileNotFoundError):
-        pass
+    body = doc_root.find(_TAG_BODY)
+    if body is None:
+        issues.append(_err("structure", "w:body element not found"))
     return issues
 
 
-def validate_namespaces(path):
+def validate_namespaces(zf, names, doc_xml, doc_root):
     """Detect auto-generated namespace prefixes (ns0:, ns1:, ...)."""
     issues = []
-    try:
-        with zipfile.ZipFile(path, "r") as zf:
-            if "word/document.xml" not in zf.namelist():
-                return issues
-            content = _read_zip_entry(zf, "word/document.xml")
-            matches = _RE_AUTO_NS.findall(content)
-            if matches:
-                unique = sorted(set(matches))
-                issues.append(_warn(
-                    "namespace",
-                    f"Auto-generated namespace prefixes found: {', '.join(unique)} "
-                    f"({len(matches)} occurrences)"))
-    except (zipfile.BadZipFile, FileNotFoundError):
-        pass
+    if doc_xml is None:
+        return issues
+    matches = _RE_AUTO_NS.findall(doc_xml)
+    if matches:
+        unique = sorted(set(matches))
+        issues.append(_warn(
+            "namespace",
+            f"Auto-generated namespace prefixes found: {', '.join(unique)} "
+            f"({len(matches)} occurrences)"))
     return issues
 
 
-def validate_content(path, work_dir):
+def validate_content(doc_xml, work_dir):
     """Verify that edit content appears in the output document.
 
     Reads edits.json and checks that new_text values are present
@@ -177,13 +205,10 @@ def validate_content(path, work_dir):
         issues.append(_warn("content", "edits.json not found in work_dir"))
         return issues
 
-    with open(edits_path, "r", encoding="utf-8") as f:
-        edits = json.load(f).get("edits", [])
+    with open(edits_path, "rb") as f:
+        edits = _json_loads(f.read()).get("edits", [])
 
-    try:
-        with zipfile.ZipFile(path, "r") as zf:
-            doc_xml = _read_zip_entry(zf, "word/document.xml")
-    except (zipfile.BadZipFile, FileNotFoundError, KeyError):
+    if doc_xml is None:
         return issues
 
     full_text = _extract_all_text(doc_xml)
@@ -192,11 +217,14 @@ def validate_content(path, work_dir):
     analysis_path = os.path.join(work_dir, "analysis.json")
     analysis_blocks = {}
     if os.path.exists(analysis_path):
-        with open(analysis_path, "r", encoding="utf-8") as f:
-            analysis = json.load(f)
+        with open(analysis_path, "rb") as f:
+            analysis = _json_loads(f.read())
         for b in analysis.get("blocks", []):
             analysis_blocks[b["id"]] = b
 
+    # Collect every needle first so they can be searched in one pass
+    checks = []
+    needles = set()
     for i, edit in enumerate(edits):
         action = edit.get("action", "")
         tid = edit.get("target_id", "")
@@ -207,33 +235,46 @@ def validate_content(path, work_dir):
             # For table edits, check individual cell values
             if tag == "TBL" and "|" in new_text:
                 cells = [c.strip() for c in new_text.replace("\n", "|").split("|")]
-                missing = [c for c in cells if c and c not in full_text]
-                if missing:
-                    issues.append(_warn(
-                        "content",
-                        f"Edit {i} ({tid}): {len(missing)}/{len(cells)} "
-                        f"cell values not found in output"))
+                checks.append((i, tid, "cells", cells))
+                needles.update(c for c in cells if c)
             else:
                 # Check plain text — for multi-line, check each line
                 lines = new_text.split("\n") if "\n" in new_text else [new_text]
-                for line in lines:
-                    clean = line.strip()
-                    if clean and clean not in full_text:
-                        issues.append(_warn(
-                            "content",
-                            f"Edit {i} ({tid}): text not found in output: "
-                            f"'{clean[:60]}...'"))
-                        break
+                lines = [clean for clean in map(str.strip, lines) if clean]
+                checks.append((i, tid, "lines", lines))
+                needles.update(lines)
 
         elif action == "delete":
             base_id = tid.split(":")[0]
             block = analysis_blocks.get(base_id)
             if block:
                 old_text = block.get("text", "").strip()
-                if old_text and old_text in full_text:
+                if old_text:
+                    checks.append((i, tid, "deleted", old_text))
+                    needles.add(old_text)
+
+    present = _present_needles(needles, full_text)
+
+    for i, tid, kind, value in checks:
+        if kind == "cells":
+            missing = [c for c in value if c and c not in present]
+            if missing:
+                issues.append(_warn(
+                    "content",
+                    f"Edit {i} ({tid}): {len(missing)}/{len(value)} "
+                    f"cell values not found in output"))
+        elif kind == "lines":
+            for clean in value:
+                if clean not in present:
                     issues.append(_warn(
                         "content",
-                        f"Edit {i} ({tid}): deleted text still found in output"))
+                        f"Edit {i} ({tid}): text not found in output: "
+                        f"'{clean[:60]}...'"))
+                    break
+        elif value in present:
+            issues.append(_warn(
+                "content",
+                f"Edit {i} ({tid}): deleted text still found in output"))
 
     return issues
 
@@ -247,7 +288,17 @@ def validate(docx_path, work_dir=None):
     errors = []
     warnings = []
 
-    # Structural validations (stop early if ZIP/XML broken)
+    try:
+        zf = zipfile.ZipFile(docx_path, "r")
+    except zipfile.BadZipFile as e:
+        errors.append(_err("zip", f"Invalid ZIP: {e}"))
+        return {"valid": False, "errors": errors, "warnings": warnings}
+    except FileNotFoundError:
+        errors.append(_err("zip", f"File not found: {docx_path}"))
+        return {"valid": False, "errors": errors, "warnings": warnings}
+
+    # Structural validations (stop early if ZIP/XML broken).  The archive
+    # is opened once and document.xml is read and parsed once, then shared.
     structural_checks = [
         validate_zip,
         validate_entries,
@@ -257,17 +308,37 @@ def validate(docx_path, work_dir=None):
     ]
 
     has_structural_error = False
-    for check_fn in structural_checks:
-        for issue in check_fn(docx_path):
-            if issue["level"] == "error":
-                errors.append(issue)
-                has_structural_error = True
-            else:
-                warnings.append(issue)
+    with zf:
+        names = set(zf.namelist())
+        doc_xml = doc_root = None
+        try:
+            if DOCUMENT_XML in names:
+                doc_xml = _read_zip_entry(zf, DOCUMENT_XML)
+                doc_root = ET.fromstring(doc_xml)
+        except zipfile.BadZipFile:
+            pass  # Reported by validate_zip
+        except (ET.ParseError, UnicodeEncodeError):
+            pass  # Reported by validate_xml (surrogates = invalid UTF-8)
+
+        args = (zf, names, doc_xml, doc_root)
+        if os.path.getsize(docx_path) >= _PARALLEL_CHECK_MIN_BYTES:
+            with ThreadPoolExecutor(max_workers=len(structural_checks)) as pool:
+                futures = [pool.submit(fn, *args) for fn in structural_checks]
+                results = [future.result() for future in futures]
+        else:
+            results = [fn(*args) for fn in structural_checks]
+
+        for check_issues in results:
+            for issue in check_issues:
+                if issue["level"] == "error":
+                    errors.append(issue)
+                    has_structural_error = True
+                else:
+                    warnings.append(issue)
 
     # Content validation (skip if structure is broken)
     if not has_structural_error and work_dir:
-        for issue in validate_content(docx_path, work_dir):
+        for issue in validate_content(doc_xml, work_dir):
             if issue["level"] == "error":
                 errors.append(issue)
             else:
@@ -17,16 +17,31 @@ Outputs:
     Exit code: 0 if valid, 1 if errors found.
 """
 
+import functools
+import io
 import json
 import os
 import re
 import sys
 from xml.etree import ElementTree as ET
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 NAMESPACES = {
     "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
 }
 
+_W = NAMESPACES["w"]
+_TAG_TR = f"{{{_W}}}tr"
+_TAG_TC = f"{{{_W}}}tc"
+_TAG_P = f"{{{_W}}}p"
+_TAG_SDT_CONTENT = f"{{{_W}}}sdtContent"
+
 # target_id patterns:
 #   b5          -> block-level
 #   b5:r2       -> table row
@@ -41,10 +56,30 @@ _RE_CELL_PARA = re.compile(r"^b(\d+):r(\d+)c(\d+)p(\d+)$")
 _RE_COL = re.compile(r"^b(\d+):c(\d+)$")
 _RE_SDT_PARA = re.compile(r"^b(\d+):p(\d+)$")
 
+# All of the above in one pattern, so validate_target_ids matches once
+# per edit and dispatches on which named groups are set.  The match's
+# lastgroup names the kind: b, r, c, p (cell paragraph), col or sp (SDT).
+_RE_TID = re.compile(
+    r"^b(?P<b>\d+)"
+    r"(?::(?:r(?P<r>\d+)(?:c(?P<c>\d+)(?:p(?P<p>\d+))?)?"
+    r"|c(?P<col>\d+)"
+    r"|p(?P<sp>\d+)))?$"
+)
+
 VALID_ACTIONS = {"replace", "insert_after", "insert_before", "delete"}
+INSERT_ACTIONS = frozenset({"insert_after", "insert_before"})
+HEADING_TAGS = {"H1", "H2", "H3"}
 PARAGRAPH_TAGS = {"H1", "H2", "H3", "BODY", "LIST", "TITLE", "SUBTITLE", "OTHER"}
 TABLE_TAG = "TBL"
 
+# edit_unit -> (accepted target_id patterns, format description)
+_UNIT_FORMATS = {
+    "column": ([_RE_COL], "bN:cN (e.g. b5:c0)"),
+    "row": ([_RE_ROW], "bN:rN (e.g. b5:r2)"),
+    "cell": ([_RE_CELL, _RE_CELL_PARA], "bN:rNcN or bN:rNcNpN"),
+    "table": ([_RE_BLOCK], "bN (e.g. b5)"),
+}
+
 # Common number prefix patterns that would duplicate auto-numbering (numPr)
 _RE_NUM_PREFIX = re.compile(
     r"^(?:"
@@ -68,10 +103,10 @@ def load_inputs(work_dir):
     analysis_path = os.path.join(work_dir, "analysis.json")
     edits_path = os.path.join(work_dir, "edits.json")
 
-    with open(analysis_path, "r", encoding="utf-8") as f:
-        analysis = json.load(f)
-    with open(edits_path, "r", encoding="utf-8") as f:
-        edits_data = json.load(f)
+    with open(analysis_path, "rb") as f:
+        analysis = _json_loads(f.read())
+    with open(edits_path, "rb") as f:
+        edits_data = _json_loads(f.read())
 
     return analysis, edits_data.get("edits", [])
 
@@ -86,18 +121,37 @@ class _TableMeta:
     __slots__ = ("row_count", "col_counts", "cell_para_counts")
 
     def __init__(self, xml_str):
-        ns = NAMESPACES["w"]
-        root = ET.fromstring(xml_str)
-        rows = root.findall(f".//{{{ns}}}tr")
-        self.row_count = len(rows)
+        tr, tc, p = _TAG_TR, _TAG_TC, _TAG_P
+        self.row_count = 0
         self.col_counts = []
         self.cell_para_counts = {}
-        for ri, row in enumerate(rows):
-            cells = row.findall(f"{{{ns}}}tc")
-            self.col_counts.append(len(cells))
-            for ci, cell in enumerate(cells):
-                paras = cell.findall(f"{{{ns}}}p")
-                self.cell_para_counts[(ri, ci)] = len(paras)
+
+        # Single streaming pass; no tree is kept.  Rows are counted at
+        # any depth (like ".//tr"), cells only as direct children of a
+        # row and paragraphs only as direct children of a cell.  Each
+        # stack entry is (tag, row index or (row, col) cell key).
+        stack = []
+        for event, elem in ET.iterparse(io.BytesIO(xml_str.encode("utf-8")),
+                                        events=("start", "end")):
+            if event == "end":
+                stack.pop()
+                elem.clear()
+                continue
+            tag = elem.tag
+            key = None
+            if tag == tr:
+                key = self.row_count
+                self.row_count += 1
+                self.col_counts.append(0)
+            elif stack and stack[-1][0] == tr:
+                if tag == tc:
+                    ri = stack[-1][1]
+                    key = (ri, self.col_counts[ri])
+                    self.col_counts[ri] += 1
+                    self.cell_para_counts[key] = 0
+            elif tag == p and stack and stack[-1][0] == tc:
+                self.cell_para_counts[stack[-1][1]] += 1
+            stack.append((tag, key))
 
 
 class _SdtMeta:
@@ -106,13 +160,38 @@ class _SdtMeta:
     __slots__ = ("para_count",)
 
     def __init__(self, xml_str):
-        ns = NAMESPACES["w"]
-        root = ET.fromstring(xml_str)
-        content = root.find(f"{{{ns}}}sdtContent")
-        if content is not None:
-            self.para_count = len(content.findall(f"{{{ns}}}p"))
-        else:
-            self.para_count = 0
+        sdt_content, p = _TAG_SDT_CONTENT, _TAG_P
+        self.para_count = 0
+
+        # Count <w:p> directly under the first top-level <w:sdtContent>.
+        depth = 0
+        in_content = seen_content = False
+        for event, elem in ET.iterparse(io.BytesIO(xml_str.encode("utf-8")),
+                                        events=("start", "end")):
+            if event == "end":
+                depth -= 1
+                if in_content and depth == 1:
+                    in_content = False
+                elem.clear()
+                continue
+            depth += 1
+            if depth == 2 and not seen_content and elem.tag == sdt_content:
+                in_content = seen_content = True
+            elif depth == 3 and in_content and elem.tag == p:
+                self.para_count += 1
+
+
+# Block XML is usually unchanged between validations in the same process,
+# so the parsed metadata is cached by XML string.  The meta objects are
+# only read after construction, which makes sharing them safe.
+@functools.lru_cache(maxsize=4096)
+def _table_meta(xml_str):
+    return _TableMeta(xml_str)
+
+
+@functools.lru_cache(maxsize=4096)
+def _sdt_meta(xml_str):
+    return _SdtMeta(xml_str)
 
 
 class BlockIndex:
@@ -132,9 +211,9 @@ class BlockIndex:
                 continue
             try:
                 if btype == "tbl":
-                    self.table_meta[bid] = _TableMeta(xml_str)
+                    self.table_meta[bid] = _table_meta(xml_str)
                 elif btype == "sdt":
-                    self.sdt_meta[bid] = _SdtMeta(xml_str)
+                    self.sdt_meta[bid] = _sdt_meta(xml_str)
             except ET.ParseError:
                 pass
 
@@ -153,182 +232,165 @@ def _warn(edit_idx, target_id, check, msg):
             "check": check, "level": "warning", "message": msg}
 
 
+def _check_target_id(i, edit, index, issues):
+    """Check one edit's target_id and return its _RE_TID match (or None)."""
+    tid = edit.get("target_id", "")
+    action = edit.get("action", "")
+
+    m = _RE_TID.match(tid)
+    if not m:
+        issues.append(_err(i, tid, "target_id",
+                           f"Unrecognised target_id format: {tid}"))
+        return
+    bid = f"b{m['b']}"
+    r, c, p, col, sp = m.group("r", "c", "p", "col", "sp")
+
+    # Block-level
+    if r is None and col is None and sp is None:
+        if bid not in index.id_to_block:
+            issues.append(_err(i, tid, "target_id",
+                               f"Block {bid} does not exist"))
+
+    # Table row
+    elif r is not None and c is None:
+        ri = int(r)
+        if bid not in index.id_to_block:
+            issues.append(_err(i, tid, "target_id",
+                               f"Block {bid} does not exist"))
+        elif bid not in index.table_meta:
+            issues.append(_err(i, tid, "target_id",
+                               f"{bid} is not a table"))
+        else:
+            tm = index.table_meta[bid]
+            # Row inserts are exempt from the range check
+            if action not in INSERT_ACTIONS and ri >= tm.row_count:
+                issues.append(_err(
+                    i, tid, "target_id",
+                    f"Row {ri} out of range (table has {tm.row_count} rows: 0-{tm.row_count - 1})"))
+
+    # Table cell, optionally down to a cell paragraph
+    elif r is not None:
+        ri, ci = int(r), int(c)
+        if bid not in index.table_meta:
+            issues.append(_err(i, tid, "target_id",
+                               f"{bid} is not a table"))
+        else:
+            tm = index.table_meta[bid]
+            if ri >= tm.row_count:
+                issues.append(_err(i, tid, "target_id",
+                                   f"Row {ri} out of range"))
+            elif ci >= tm.col_counts[ri]:
+                issues.append(_err(i, tid, "target_id",
+                                   f"Col {ci} out of range in row {ri}"))
+            elif p is not None and int(p) >= tm.cell_para_counts.get((ri, ci), 0):
+                issues.append(_err(
+                    i, tid, "target_id",
+                    f"Para {int(p)} out of range in cell ({ri},{ci})"))
+
+    # Table column
+    elif col is not None:
+        ci = int(col)
+        if bid not in index.table_meta:
+            issues.append(_err(i, tid, "target_id",
+                               f"{bid} is not a table"))
+        else:
+            tm = index.table_meta[bid]
+            first_row_cols = tm.col_counts[0] if tm.col_counts else 0
+            if action == "delete" and ci >= first_row_cols:
+                issues.append(_err(
+                    i, tid, "target_id",
+                    f"Col {ci} out of range ({first_row_cols} cols)"))
+
+    # SDT / TOC paragraph
+    else:
+        pi = int(sp)
+        if bid not in index.id_to_block:
+            issues.append(_err(i, tid, "target_id",
+                               f"Block {bid} does not exist"))
+        elif bid not in index.sdt_meta:
+            issues.append(_err(i, tid, "target_id",
+                               f"{bid} is not an SDT/TOC block"))
+        else:
+            sm = index.sdt_meta[bid]
+            if pi >= sm.para_count:
+                issues.append(_err(
+                    i, tid, "target_id",
+                    f"Para {pi} out of range (SDT has {sm.para_count} paras: 0-{sm.para_count - 1})"))
+
+    return m
+
+
 def validate_target_ids(edits, index):
     """Check every target_id references an existing block / row / cell."""
     issues = []
     for i, edit in enumerate(edits):
-        tid = edit.get("target_id", "")
-        action = edit.get("action", "")
-
-        # Block-level
-        m = _RE_BLOCK.match(tid)
-        if m:
-            bid = f"b{m.group(1)}"
-            if bid not in index.id_to_block:
-                issues.append(_err(i, tid, "target_id",
-                                   f"Block {bid} does not exist"))
-            continue
-
-        # Table row
-        m = _RE_ROW.match(tid)
-        if m:
-            bid, ri = f"b{m.group(1)}", int(m.group(2))
-            if bid not in index.id_to_block:
-                issues.append(_err(i, tid, "target_id",
-                                   f"Block {bid} does not exist"))
-            elif bid not in index.table_meta:
-                issues.append(_err(i, tid, "target_id",
-                                   f"{bid} is not a table"))
-            else:
-                tm = index.table_meta[bid]
-                if action == "delete" and ri >= tm.row_count:
-                    issues.append(_err(
-                        i, tid, "target_id",
-                        f"Row {ri} out of range (table has {tm.row_count} rows: 0-{tm.row_count - 1})"))
-                elif action not in ("insert_after", "insert_before") and ri >= tm.row_count:
-                    issues.append(_err(
-                        i, tid, "target_id",
-                        f"Row {ri} out of range (table has {tm.row_count} rows: 0-{tm.row_count - 1})"))
-            continue
+        _check_target_id(i, edit, index, issues)
+    return issues
 
-        # Table cell (no paragraph)
-        m = _RE_CELL.match(tid)
-        if m:
-            bid, ri, ci = f"b{m.group(1)}", int(m.group(2)), int(m.group(3))
-            if bid not in index.table_meta:
-                issues.append(_err(i, tid, "target_id",
-                                   f"{bid} is not a table"))
-            else:
-                tm = index.table_meta[bid]
-                if ri >= tm.row_count:
-                    issues.append(_err(i, tid, "target_id",
-                                       f"Row {ri} out of range"))
-                elif ci >= tm.col_counts[ri]:
-                    issues.append(_err(i, tid, "target_id",
-                                       f"Col {ci} out of range in row {ri}"))
-            continue
-
-        # Table cell paragraph
-        m = _RE_CELL_PARA.match(tid)
-        if m:
-            bid = f"b{m.group(1)}"
-            ri, ci, pi = int(m.group(2)), int(m.group(3)), int(m.group(4))
-            if bid not in index.table_meta:
-                issues.append(_err(i, tid, "target_id",
-                                   f"{bid} is not a table"))
-            else:
-                tm = index.table_meta[bid]
-                if ri >= tm.row_count:
-                    issues.append(_err(i, tid, "target_id",
-                                       f"Row {ri} out of range"))
-                elif ci >= tm.col_counts[ri]:
-                    issues.append(_err(i, tid, "target_id",
-                                       f"Col {ci} out of range in row {ri}"))
-                elif pi >= tm.cell_para_counts.get((ri, ci), 0):
-                    issues.append(_err(
-                        i, tid, "target_id",
-                        f"Para {pi} out of range in cell ({ri},{ci})"))
-            continue
 
-        # Table column
-        m = _RE_COL.match(tid)
-        if m:
-            bid, ci = f"b{m.group(1)}", int(m.group(2))
-            if bid not in index.table_meta:
-                issues.append(_err(i, tid, "target_id",
-                                   f"{bid} is not a table"))
-            else:
-                tm = index.table_meta[bid]
-                first_row_cols = tm.col_counts[0] if tm.col_counts else 0
-                if action == "delete" and ci >= first_row_cols:
-                    issues.append(_err(
-                        i, tid, "target_id",
-                        f"Col {ci} out of range ({first_row_cols} cols)"))
-            continue
+def _check_semantic_tag(i, edit, index, issues):
+    action = edit.get("action", "")
+    if action not in ("replace", "delete"):
+        return
 
-        # SDT / TOC paragraph
-        m = _RE_SDT_PARA.match(tid)
-        if m:
-            bid, pi = f"b{m.group(1)}", int(m.group(2))
-            if bid not in index.id_to_block:
-                issues.append(_err(i, tid, "target_id",
-                                   f"Block {bid} does not exist"))
-            elif bid not in index.sdt_meta:
-                issues.append(_err(i, tid, "target_id",
-                                   f"{bid} is not an SDT/TOC block"))
-            else:
-                sm = index.sdt_meta[bid]
-                if pi >= sm.para_count:
-                    issues.append(_err(
-                        i, tid, "target_id",
-                        f"Para {pi} out of range (SDT has {sm.para_count} paras: 0-{sm.para_count - 1})"))
-            continue
+    tid = edit.get("target_id", "")
+    m = _RE_BLOCK.match(tid)
+    if not m:
+        return
 
-        issues.append(_err(i, tid, "target_id",
-                           f"Unrecognised target_id format: {tid}"))
+    bid = f"b{m.group(1)}"
+    block = index.id_to_block.get(bid)
+    if not block:
+        return
 
-    return issues
+    expected = block.get("semantic_tag", "")
+    actual = edit.get("semantic_tag", "")
+    if expected and actual and expected != actual:
+        issues.append(_warn(
+            i, tid, "semantic_tag",
+            f"Edit tag '{actual}' differs from block tag '{expected}'"))
 
 
 def validate_semantic_tags(edits, index):
     """Warn when edit semantic_tag disagrees with the actual block type."""
     issues = []
     for i, edit in enumerate(edits):
-        action = edit.get("action", "")
-        if action not in ("replace", "delete"):
-            continue
-
-        tid = edit.get("target_id", "")
-        m = _RE_BLOCK.match(tid)
-        if not m:
-            continue
-
-        bid = f"b{m.group(1)}"
-        block = index.id_to_block.get(bid)
-        if not block:
-            continue
+        _check_semantic_tag(i, edit, index, issues)
+    return issues
 
-        expected = block.get("semantic_tag", "")
-        actual = edit.get("semantic_tag", "")
-        if expected and actual and expected != actual:
-            issues.append(_warn(
-                i, tid, "semantic_tag",
-                f"Edit tag '{actual}' differs from block tag '{expected}'"))
 
-    return issues
+def _check_style_aliases(i, edit, alias_map, issues):
+    tid = edit.get("target_id", "")
+    action = edit.get("action", "")
+    tag = edit.get("semantic_tag", "")
 
+    if action == "delete":
+        return
 
-def validate_style_aliases(edits, alias_map):
-    """Verify every referenced alias exists in the style_alias_map."""
-    issues = []
-    for i, edit in enumerate(edits):
-        tid = edit.get("target_id", "")
-        action = edit.get("action", "")
-        tag = edit.get("semantic_tag", "")
+    # Paragraph style_alias
+    if tag in PARAGRAPH_TAGS:
+        sa = edit.get("style_alias")
+        if sa and sa not in alias_map:
+            issues.append(_err(i, tid, "style_alias",
+                               f"Style alias '{sa}' not in alias map"))
 
-        if action == "delete":
-            continue
+    # Table aliases
+    if tag == TABLE_TAG:
+        tsa = edit.get("table_style_alias")
+        if tsa and tsa not in alias_map:
+            issues.append(_err(i, tid, "table_style_alias",
+                               f"Table style alias '{tsa}' not in alias map"))
 
-        # Paragraph style_alias
-        if tag in PARAGRAPH_TAGS:
-            sa = edit.get("style_alias")
-            if sa and sa not in alias_map:
-                issues.append(_err(i, tid, "style_alias",
-                                   f"Style alias '{sa}' not in alias map"))
-
-        # Table aliases
-        if tag == TABLE_TAG:
-            tsa = edit.get("table_style_alias")
-            if tsa and tsa not in alias_map:
-                issues.append(_err(i, tid, "table_style_alias",
-                                   f"Table style alias '{tsa}' not in alias map"))
-
-            for rs in (edit.get("row_style_aliases") or []):
+        row_aliases = edit.get("row_style_aliases")
+        if row_aliases:
+            for rs in row_aliases:
                 if rs not in alias_map:
                     issues.append(_err(i, tid, "row_style_alias",
                                        f"Row style alias '{rs}' not in alias map"))
 
-            for row_cs in (edit.get("cell_style_aliases") or []):
+        cell_aliases = edit.get("cell_style_aliases")
+        if cell_aliases:
+            for row_cs in cell_aliases:
                 if isinstance(row_cs, list):
                     for cs in row_cs:
                         if cs not in alias_map:
@@ -341,81 +403,125 @@ def validate_style_aliases(edits, alias_map):
                             i, tid, "cell_style_alias",
                             f"Cell style alias '{row_cs}' not in alias map"))
 
+
+def validate_style_aliases(edits, alias_map):
+    """Verify every referenced alias exists in the style_alias_map."""
+    issues = []
+    for i, edit in enumerate(edits):
+        _check_style_aliases(i, edit, alias_map, issues)
     return issues
 
 
+def _check_table_fields(i, edit, index, issues, tid_match=None):
+    tid = edit.get("target_id", "")
+    tag = edit.get("semantic_tag", "")
+    action = edit.get("action", "")
+    eu = edit.get("edit_unit")
+
+    if tag != TABLE_TAG:
+        return
+    if action == "delete" and not eu:
+        return
+
+    # edit_unit is required for all non-block-level table edits
+    if not eu and action != "delete":
+        m = tid_match or _RE_TID.match(tid)
+        if m is None or m.lastgroup != "b":
+            issues.append(_err(i, tid, "edit_unit",
+                               "edit_unit required for table edits"))
+
+    # Row INSERT must have RS + CS
+    if eu == "row" and action in INSERT_ACTIONS:
+        if not edit.get("row_style_aliases"):
+            issues.append(_err(i, tid, "row_style_aliases",
+                               "row_style_aliases required for row INSERT"))
+        if not edit.get("cell_style_aliases"):
+            issues.append(_err(i, tid, "cell_style_aliases",
+                               "cell_style_aliases required for row INSERT"))
+
+    # Table INSERT must have table_style_alias
+    if eu == "table" and action in INSERT_ACTIONS:
+        if not edit.get("table_style_alias"):
+            issues.append(_err(i, tid, "table_style_alias",
+                               "table_style_alias required for table INSERT"))
+
+    # Cell count in new_text vs cell_style_aliases
+    if eu == "row" and action in INSERT_ACTIONS:
+        new_text = edit.get("new_text", "")
+        if new_text and "|" in new_text:
+            cell_count = new_text.count("|") + 1
+            cs_list = edit.get("cell_style_aliases") or []
+            if cs_list and isinstance(cs_list[0], list):
+                cs_count = len(cs_list[0])
+                if cell_count != cs_count:
+                    issues.append(_err(
+                        i, tid, "cell_count",
+                        f"new_text has {cell_count} cells but "
+                        f"cell_style_aliases[0] has {cs_count}"))
+
+
 def validate_table_fields(edits, index):
     """Check required fields for table edits."""
     issues = []
     for i, edit in enumerate(edits):
-        tid = edit.get("target_id", "")
-        tag = edit.get("semantic_tag", "")
-        action = edit.get("action", "")
-        eu = edit.get("edit_unit")
-
-        if tag != TABLE_TAG:
-            continue
-        if action == "delete" and not eu:
-            continue
-
-        # edit_unit is required for all non-block-level table edits
-        if not eu and action != "delete":
-            m = _RE_BLOCK.match(tid)
-            if not m:
-                issues.append(_err(i, tid, "edit_unit",
-                                   "edit_unit required for table edits"))
-
-        # Row INSERT must have RS + CS
-        if eu == "row" and action in ("insert_after", "insert_before"):
-            if not edit.get("row_style_aliases"):
-                issues.append(_err(i, tid, "row_style_aliases",
-                                   "row_style_aliases required for row INSERT"))
-            if not edit.get("cell_style_aliases"):
-                issues.append(_err(i, tid, "cell_style_aliases",
-                                   "cell_style_aliases required for row INSERT"))
-
-        # Table INSERT must have table_style_alias
-        if eu == "table" and action in ("insert_after", "insert_before"):
-            if not edit.get("table_style_alias"):
-                issues.append(_err(i, tid, "table_style_alias",
-                                   "table_style_alias required for table INSERT"))
-
-        # Cell count in new_text vs cell_style_aliases
-        if eu == "row" and action in ("insert_after", "insert_before"):
-            new_text = edit.get("new_text", "")
-            if new_text and "|" in new_text:
-                cell_count = len([c.strip() for c in new_text.split("|")])
-                cs_list = edit.get("cell_style_aliases") or []
-                if cs_list and isinstance(cs_list[0], list):
-                    cs_count = len(cs_list[0])
-                    if cell_count != cs_count:
-                        issues.append(_err(
-                            i, tid, "cell_count",
-                            f"new_text has {cell_count} cells but "
-                            f"cell_style_aliases[0] has {cs_count}"))
-
+        _check_table_fields(i, edit, index, issues)
     return issues
 
 
+def _check_newlines(i, edit, issues):
+    tid = edit.get("target_id", "")
+    tag = edit.get("semantic_tag", "")
+    action = edit.get("action", "")
+    new_text = edit.get("new_text", "")
+
+    if action == "delete" or not new_text:
+        return
+    if tag == TABLE_TAG:
+        return
+    if "\n" in new_text:
+        issues.append(_err(
+            i, tid, "newline",
+            "new_text contains '\\n' — split into separate edits"))
+
+
 def validate_newlines(edits):
     """Flag \\n in paragraph new_text (not allowed outside TBL/TOC)."""
     issues = []
     for i, edit in enumerate(edits):
-        tid = edit.get("target_id", "")
-        tag = edit.get("semantic_tag", "")
-        action = edit.get("action", "")
-        new_text = edit.get("new_text", "")
+        _check_newlines(i, edit, issues)
+    return issues
 
-        if action == "delete" or not new_text:
-            continue
-        if tag == TABLE_TAG:
-            continue
-        if "\n" in new_text:
-            issues.append(_err(
-                i, tid, "newline",
-                "new_text contains '\\n' — split into separate edits"))
 
-    return issues
+def _check_column_count(i, edit, index, issues, tid_match=None):
+    tid = edit.get("target_id", "")
+    eu = edit.get("edit_unit")
+    action = edit.get("action", "")
+    new_text = edit.get("new_text", "")
+
+    if eu != "row":
+        return
+    if action not in ("insert_after", "insert_before", "replace"):
+        return
+    if not new_text or "|" not in new_text:
+        return
+
+    # Only block (bN) and row (bN:rN) targets are checked
+    m = tid_match or _RE_TID.match(tid)
+    if m is None or m.lastgroup not in ("b", "r"):
+        return
+    tm = index.table_meta.get(f"b{m['b']}")
+    if not tm or not tm.col_counts:
+        return
+
+    text_cols = new_text.count("|") + 1
+    table_cols = tm.col_counts[0]
+    if text_cols != table_cols:
+        msg = (f"new_text has {text_cols} cells but table has "
+               f"{table_cols} columns")
+        if action == "replace":
+            issues.append(_err(i, tid, "column_count", msg))
+        else:
+            issues.append(_warn(i, tid, "column_count", msg))
 
 
 def validate_column_counts(edits, index):
@@ -426,72 +532,59 @@ def validate_column_counts(edits, index):
     """
     issues = []
     for i, edit in enumerate(edits):
-        tid = edit.get("target_id", "")
-        eu = edit.get("edit_unit")
-        action = edit.get("action", "")
-        new_text = edit.get("new_text", "")
+        _check_column_count(i, edit, index, issues)
+    return issues
 
-        if eu != "row":
-            continue
-        if action not in ("insert_after", "insert_before", "replace"):
-            continue
-        if not new_text or "|" not in new_text:
-            continue
-
-        m = _RE_ROW.match(tid) or _RE_BLOCK.match(tid)
-        if not m:
-            continue
-        bid = f"b{m.group(1)}"
-        tm = index.table_meta.get(bid)
-        if not tm or not tm.col_counts:
-            continue
-
-        text_cols = len([c.strip() for c in new_text.split("|")])
-        table_cols = tm.col_counts[0]
-        if text_cols != table_cols:
-            msg = (f"new_text has {text_cols} cells but table has "
-                   f"{table_cols} columns")
-            if action == "replace":
-                issues.append(_err(i, tid, "column_count", msg))
-            else:
-                issues.append(_warn(i, tid, "column_count", msg))
 
-    return issues
+def _check_runs(i, edit, alias_map, paragraph_style_templates, issues):
+    tid = edit.get("target_id", "")
+    runs_spec = edit.get("runs")
+    if not runs_spec or not isinstance(runs_spec, list):
+        return
+
+    new_text = edit.get("new_text", "")
+    style_alias = edit.get("style_alias", "")
+
+    # Resolve PST to get available RSTs
+    style_key = alias_map.get(style_alias, "")
+    pst = paragraph_style_templates.get(style_key, {})
+    rst_dict = pst.get("run_style_templates", {})
+
+    # Check each run's alias
+    for j, spec in enumerate(runs_spec):
+        rs = spec.get("run_style", "")
+        if rs and rst_dict and rs not in rst_dict:
+            issues.append(_err(
+                i, tid, "runs",
+                f"runs[{j}].run_style '{rs}' not found in RST pool"))
+
+    # Check concatenated text matches new_text
+    concat = "".join(spec.get("text", "") for spec in runs_spec)
+    if concat != new_text:
+        issues.append(_warn(
+            i, tid, "runs",
+            f"Concatenated runs text does not match new_text"))
 
 
 def validate_runs(edits, alias_map, paragraph_style_templates):
     """Validate optional runs spec: aliases exist, text sums to new_text."""
     issues = []
     for i, edit in enumerate(edits):
-        tid = edit.get("target_id", "")
-        runs_spec = edit.get("runs")
-        if not runs_spec or not isinstance(runs_spec, list):
-            continue
-
-        new_text = edit.get("new_text", "")
-        style_alias = edit.get("style_alias", "")
+        _check_runs(i, edit, alias_map, paragraph_style_templates, issues)
+    return issues
 
-        # Resolve PST to get available RSTs
-        style_key = alias_map.get(style_alias, "")
-        pst = paragraph_style_templates.get(style_key, {})
-        rst_dict = pst.get("run_style_templates", {})
 
-        # Check each run's alias
-        for j, spec in enumerate(runs_spec):
-            rs = spec.get("run_style", "")
-            if rs and rst_dict and rs not in rst_dict:
-                issues.append(_err(
-                    i, tid, "runs",
-                    f"runs[{j}].run_style '{rs}' not found in RST pool"))
-
-        # Check concatenated text matches new_text
-        concat = "".join(spec.get("text", "") for spec in runs_spec)
-        if concat != new_text:
-            issues.append(_warn(
-                i, tid, "runs",
-                f"Concatenated runs text does not match new_text"))
-
-    return issues
+def _check_edit_unit_format(i, edit, issues):
+    eu = edit.get("edit_unit")
+    tid = edit.get("target_id", "")
+    if not eu or eu not in _UNIT_FORMATS:
+        return
+    regexes, fmt_desc = _UNIT_FORMATS[eu]
+    if not any(r.match(tid) for r in regexes):
+        issues.append(_err(
+            i, tid, "edit_unit_format",
+            f"edit_unit '{eu}' requires target_id format "
+            f"'{fmt_desc}', got '{tid}'"))
 
 
 def validate_edit_unit_format(edits):
@@ -504,26 +597,48 @@ def validate_edit_unit_format(edits):
       table  -> bN
     """
     issues = []
-    UNIT_FORMATS = {
-        "column": ([_RE_COL], "bN:cN (e.g. b5:c0)"),
-        "row": ([_RE_ROW], "bN:rN (e.g. b5:r2)"),
-        "cell": ([_RE_CELL, _RE_CELL_PARA], "bN:rNcN or bN:rNcNpN"),
-        "table": ([_RE_BLOCK], "bN (e.g. b5)"),
-    }
     for i, edit in enumerate(edits):
-        eu = edit.get("edit_unit")
-        tid = edit.get("target_id", "")
-        if not eu or eu not in UNIT_FORMATS:
-            continue
-        regexes, fmt_desc = UNIT_FORMATS[eu]
-        if not any(r.match(tid) for r in regexes):
-            issues.append(_err(
-                i, tid, "edit_unit_format",
-                f"edit_unit '{eu}' requires target_id format "
-                f"'{fmt_desc}', got '{tid}'"))
+        _check_edit_unit_format(i, edit, issues)
     return issues
 
 
+def _check_numpr_prefix(i, edit, index, alias_map, paragraph_style_templates,
+                        issues):
+    tid = edit.get("target_id", "")
+    action = edit.get("action", "")
+    new_text = edit.get("new_text", "")
+
+    if action == "delete" or not new_text:
+        return
+
+    has_numpr = False
+
+    if action == "replace":
+        m = _RE_BLOCK.match(tid)
+        if m:
+            bid = f"b{m.group(1)}"
+            block = index.id_to_block.get(bid)
+            if block and "numPr" in block.get("xml", ""):
+                has_numpr = True
+
+    elif action in INSERT_ACTIONS:
+        tag = edit.get("semantic_tag", "")
+        if tag in PARAGRAPH_TAGS:
+            sa = edit.get("style_alias", "")
+            style_key = alias_map.get(sa, "")
+            pst = paragraph_style_templates.get(style_key, {})
+            ppr = pst.get("ppr_xml_template", "")
+            if "numPr" in ppr:
+                has_numpr = True
+
+    if has_numpr and _RE_NUM_PREFIX.match(new_text):
+        issues.append(_err(
+            i, tid, "numpr_prefix",
+            "new_text starts with a number prefix but target has "
+            "auto-numbering (numPr). Remove the prefix — Word adds it "
+            "automatically."))
+
+
 def validate_numpr_prefix(edits, index, alias_map, paragraph_style_templates):
     """Error when new_text starts with a number prefix on an auto-numbered block.
 
@@ -532,53 +647,20 @@ def validate_numpr_prefix(edits, index, alias_map, paragraph_style_templates):
     """
     issues = []
     for i, edit in enumerate(edits):
-        tid = edit.get("target_id", "")
-        action = edit.get("action", "")
-        new_text = edit.get("new_text", "")
-
-        if action == "delete" or not new_text:
-            continue
-
-        has_numpr = False
-
-        if action == "replace":
-            m = _RE_BLOCK.match(tid)
-            if m:
-                bid = f"b{m.group(1)}"
-                block = index.id_to_block.get(bid)
-                if block and "numPr" in block.get("xml", ""):
-                    has_numpr = True
-
-        elif action in ("insert_after", "insert_before"):
-            tag = edit.get("semantic_tag", "")
-            if tag in PARAGRAPH_TAGS:
-                sa = edit.get("style_alias", "")
-                style_key = alias_map.get(sa, "")
-                pst = paragraph_style_templates.get(style_key, {})
-                ppr = pst.get("ppr_xml_template", "")
-                if "numPr" in ppr:
-                    has_numpr = True
-
-        if has_numpr and _RE_NUM_PREFIX.match(new_text):
-            issues.append(_err(
-                i, tid, "numpr_prefix",
-                "new_text starts with a number prefix but target has "
-                "auto-numbering (numPr). Remove the prefix — Word adds it "
-                "automatically."))
-
+        _check_numpr_prefix(i, edit, index, alias_map, paragraph_style_templates,
+                            issues)
     return issues
 
 
 def validate_toc_impact(edits, index):
     """Warn when heading edits may require TOC update."""
     issues = []
-    heading_tags = {"H1", "H2", "H3"}
     heading_edit_idx = None
 
     for i, edit in enumerate(edits):
         tag = edit.get("semantic_tag", "")
         action = edit.get("action", "")
-        if tag in heading_tags and action in (
+        if tag in HEADING_TAGS and action in (
             "insert_after", "insert_before", "replace", "delete",
         ):
             heading_edit_idx = i
@@ -602,46 +684,49 @@ def validate_toc_impact(edits, index):
     return issues
 
 
-def validate_numpr_cascade(edits, index, alias_map, paragraph_style_templates):
-    """Warn when heading INSERT/DELETE may shift auto-numbering."""
-    issues = []
-    heading_tags = {"H1", "H2", "H3"}
+def _check_numpr_cascade(i, edit, index, alias_map, paragraph_style_templates,
+                         issues):
+    tid = edit.get("target_id", "")
+    action = edit.get("action", "")
+    tag = edit.get("semantic_tag", "")
 
-    for i, edit in enumerate(edits):
-        tid = edit.get("target_id", "")
-        action = edit.get("action", "")
-        tag = edit.get("semantic_tag", "")
+    if tag not in HEADING_TAGS:
+        return
+    if action not in ("insert_after", "insert_before", "delete"):
+        return
 
-        if tag not in heading_tags:
-            continue
-        if action not in ("insert_after", "insert_before", "delete"):
-            continue
+    has_numpr = False
 
-        has_numpr = False
-
-        if action == "delete":
-            m = _RE_BLOCK.match(tid)
-            if m:
-                bid = f"b{m.group(1)}"
-                block = index.id_to_block.get(bid)
-                if block and "numPr" in block.get("xml", ""):
-                    has_numpr = True
-        else:
-            # INSERT: check if the style being used has numPr
-            sa = edit.get("style_alias", "")
-            style_key = alias_map.get(sa, "")
-            pst = paragraph_style_templates.get(style_key, {})
-            ppr = pst.get("ppr_xml_template", "")
-            if "numPr" in ppr:
+    if action == "delete":
+        m = _RE_BLOCK.match(tid)
+        if m:
+            bid = f"b{m.group(1)}"
+            block = index.id_to_block.get(bid)
+            if block and "numPr" in block.get("xml", ""):
                 has_numpr = True
+    else:
+        # INSERT: check if the style being used has numPr
+        sa = edit.get("style_alias", "")
+        style_key = alias_map.get(sa, "")
+        pst = paragraph_style_templates.get(style_key, {})
+        ppr = pst.get("ppr_xml_template", "")
+        if "numPr" in ppr:
+            has_numpr = True
+
+    if has_numpr:
+        issues.append(_warn(
+            i, tid, "numpr_cascade",
+            f"Heading {action} with auto-numbering will shift numbering "
+            f"for subsequent headings. Verify in Step 7 (re-analyze) and "
+            f"update TOC entries to match new numbering."))
 
-        if has_numpr:
-            issues.append(_warn(
-                i, tid, "numpr_cascade",
-                f"Heading {action} with auto-numbering will shift numbering "
-                f"for subsequent headings. Verify in Step 7 (re-analyze) and "
-                f"update TOC entries to match new numbering."))
 
+def validate_numpr_cascade(edits, index, alias_map, paragraph_style_templates):
+    """Warn when heading INSERT/DELETE may shift auto-numbering."""
+    issues = []
+    for i, edit in enumerate(edits):
+        _check_numpr_cascade(i, edit, index, alias_map, paragraph_style_templates,
+                             issues)
     return issues
 
 
@@ -649,6 +734,34 @@ def validate_numpr_cascade(edits, index, alias_map, paragraph_style_templates):
 # Orchestrator
 # -------------------------------------------------------------------
 
+def validate_all(edits, index, alias_map, paragraph_style_templates):
+    """Run every validator in a single pass over *edits*.
+
+    Issues come back in the same order as calling the validate_*
+    functions one after another: grouped by check, then by edit.
+    """
+    pst = paragraph_style_templates
+    target_ids, unit_formats, semantic_tags, style_aliases = [], [], [], []
+    table_fields, newlines, column_counts, runs = [], [], [], []
+    numpr_prefix, numpr_cascade = [], []
+
+    for i, edit in enumerate(edits):
+        tid_match = _check_target_id(i, edit, index, target_ids)
+        _check_edit_unit_format(i, edit, unit_formats)
+        _check_semantic_tag(i, edit, index, semantic_tags)
+        _check_style_aliases(i, edit, alias_map, style_aliases)
+        _check_table_fields(i, edit, index, table_fields, tid_match)
+        _check_newlines(i, edit, newlines)
+        _check_column_count(i, edit, index, column_counts, tid_match)
+        _check_runs(i, edit, alias_map, pst, runs)
+        _check_numpr_prefix(i, edit, index, alias_map, pst, numpr_prefix)
+        _check_numpr_cascade(i, edit, index, alias_map, pst, numpr_cascade)
+
+    return (target_ids + unit_formats + semantic_tags + style_aliases
+            + table_fields + newlines + column_counts + runs + numpr_prefix
+            + validate_toc_impact(edits, index) + numpr_cascade)
+
+
 def validate(work_dir):
     """Run all validations and return structured result."""
     analysis, edits = load_inputs(work_dir)
@@ -660,20 +773,7 @@ def validate(work_dir):
     errors = []
     warnings = []
 
-    all_issues = []
-    all_issues.extend(validate_target_ids(edits, index))
-    all_issues.extend(validate_edit_unit_format(edits))
-    all_issues.extend(validate_semantic_tags(edits, index))
-    all_issues.extend(validate_style_aliases(edits, alias_map))
-    all_issues.extend(validate_table_fields(edits, index))
-    all_issues.extend(validate_newlines(edits))
-    all_issues.extend(validate_column_counts(edits, index))
-    all_issues.extend(validate_runs(edits, alias_map, pst))
-    all_issues.extend(validate_numpr_prefix(edits, index, alias_map, pst))
-    all_issues.extend(validate_toc_impact(edits, index))
-    all_issues.extend(validate_numpr_cascade(edits, index, alias_map, pst))
-
-    for issue in all_issues:
+    for issue in validate_all(edits, index, alias_map, pst):
         if issue.get("level") == "warning":
             warnings.append(issue)
         else:
@@ -5,14 +5,27 @@ Paths starting with /workspace/ are translated to the host session workspace.
 
 from __future__ import annotations
 
+import asyncio
 import fnmatch
+import functools
+import heapq
+import mmap
 import os
 import re
-from pathlib import Path
+import shutil
+from collections.abc import Iterator
+from pathlib import Path, PurePosixPath
 from typing import Any
 
 from google.adk.tools.tool_context import ToolContext
 
+# Characters str.splitlines() breaks on once universal newlines have
+# turned \r and \r\n into \n
+_LINE_BREAKS = "\n\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+# Leading bytes checked for NUL when deciding a file is binary (as ripgrep)
+_BINARY_SNIFF_BYTES = 8192
+
 
 def _resolve_path(file_path: str, tool_context: ToolContext | None) -> Path:
     """Translate /workspace/ paths to host session workspace.
@@ -52,18 +65,43 @@ async def read_file(
     if not p.is_file():
         return {"error": f"File not found: {file_path}"}
 
+    offset, limit = max(offset, 0), max(limit, 0)
     try:
-        lines = p.read_text(encoding="utf-8", errors="replace").splitlines()
-        total = len(lines)
-        selected = lines[offset : offset + limit]
-        content = "\n".join(
-            f"{i + offset + 1:>6}\t{line}" for i, line in enumerate(selected)
-        )
+        with p.open("r", encoding="utf-8", errors="replace") as fh:
+            # Keep only the requested window of lines; past it, just count
+            # line breaks chunk by chunk instead of building a list.
+            selected: list[str] = []
+            total = 0
+            end = offset + limit
+            for physical in fh:
+                for line in physical.splitlines():
+                    if offset <= total < end:
+                        selected.append(line)
+                    total += 1
+                if total >= end:
+                    break
+            last = ""
+            for chunk in iter(lambda: fh.read(1 << 20), ""):
+                total += sum(chunk.count(ch) for ch in _LINE_BREAKS)
+                last = chunk[-1]
+            if last and last not in _LINE_BREAKS:
+                total += 1
+        content = "\n".join([
+            "%6d\t%s" % numbered for numbered in enumerate(selected, offset + 1)
+        ])
         return {"content": content, "total_lines": total, "path": str(p.resolve())}
     except Exception as e:
         return {"error": str(e)}
 
 
+def _write_utf8(p: Path, content: str) -> int:
+    """Write *content* to *p* as UTF-8, creating parent dirs; returns bytes written."""
+    p.parent.mkdir(parents=True, exist_ok=True)
+    data = content.encode("utf-8")
+    p.write_bytes(data)
+    return len(data)
+
+
 async def write_file(
     file_path: str,
     content: str,
@@ -80,9 +118,8 @@ async def write_file(
     """
     p = _resolve_path(file_path, tool_context)
     try:
-        p.parent.mkdir(parents=True, exist_ok=True)
-        p.write_text(content, encoding="utf-8")
-        return {"success": True, "path": str(p.resolve()), "bytes_written": len(content.encode("utf-8"))}
+        bytes_written = await asyncio.to_thread(_write_utf8, p, content)
+        return {"success": True, "path": str(p.resolve()), "bytes_written": bytes_written}
     except Exception as e:
         return {"error": str(e)}
 
@@ -110,7 +147,7 @@ async def edit_file(
         return {"error": f"File not found: {file_path}"}
 
     try:
-        text = p.read_text(encoding="utf-8")
+        text = await asyncio.to_thread(p.read_text, encoding="utf-8")
         count = text.count(old_text)
         if count == 0:
             return {"error": "old_text not found in file"}
@@ -118,14 +155,68 @@ async def edit_file(
             return {"error": f"old_text found {count} times — must be unique (use replace_all=True to replace all)"}
 
         if replace_all:
-            p.write_text(text.replace(old_text, new_text), encoding="utf-8")
+            text = text.replace(old_text, new_text)
         else:
-            p.write_text(text.replace(old_text, new_text, 1), encoding="utf-8")
+            text = text.replace(old_text, new_text, 1)
+        await asyncio.to_thread(p.write_text, text, encoding="utf-8")
         return {"success": True, "path": str(p.resolve()), "replacements": count if replace_all else 1}
     except Exception as e:
         return {"error": str(e)}
 
 
+# glob_search returns at most this many paths (the lexically smallest)
+_GLOB_MAX_MATCHES = 200
+
+
+def _glob_files(parent: str, parts: tuple[str, ...]) -> Iterator[str]:
+    """Yield files under *parent* matching the glob components *parts*.
+
+    "**" matches zero or more directories without entering directory
+    symlinks; other components match one path segment case-sensitively,
+    hidden names included. Unlike Path.glob on Python 3.12, which only
+    yields directories for a trailing "**", that matches every file below.
+    """
+    part, rest = parts[0], parts[1:]
+    if part == "**":
+        # A trailing "**" matches everything below; keep the files
+        yield from _glob_files(parent, rest or ("*",))
+        try:
+            with os.scandir(parent) as it:
+                entries = list(it)
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir() and not entry.is_symlink():
+                    yield from _glob_files(entry.path, parts)
+            except OSError:
+                continue
+    elif "*" in part or "?" in part or "[" in part:
+        try:
+            with os.scandir(parent) as it:
+                entries = list(it)
+        except OSError:
+            return
+        for entry in entries:
+            if not fnmatch.fnmatchcase(entry.name, part):
+                continue
+            try:
+                if not rest:
+                    if entry.is_file():
+                        yield entry.path
+                elif entry.is_dir():
+                    yield from _glob_files(entry.path, rest)
+            except OSError:
+                continue
+    else:
+        path = os.path.join(parent, part)
+        if not rest:
+            if os.path.isfile(path):
+                yield path
+        elif os.path.isdir(path):
+            yield from _glob_files(path, rest)
+
+
 async def glob_search(
     pattern: str,
     path: str = "/workspace",
@@ -133,6 +224,9 @@ async def glob_search(
 ) -> dict[str, Any]:
     """Find files matching a glob pattern.
 
+    A pattern ending in "**" (e.g., "src/**") matches every file below that
+    directory, like "src/**/*".
+
     Args:
         pattern: Glob pattern (e.g., "**/*.py")
         path: Directory to search in (default: /workspace)
@@ -145,12 +239,260 @@ async def glob_search(
         return {"error": f"Directory not found: {path}"}
 
     try:
-        matches = sorted(str(f) for f in p.glob(pattern) if f.is_file())
-        return {"matches": matches[:200], "total": len(matches)}
+        pattern_path = PurePosixPath(pattern)
+        if pattern_path.is_absolute():
+            raise NotImplementedError("Non-relative patterns are unsupported")
+        parts = pattern_path.parts
+        if not parts:
+            raise ValueError(f"Unacceptable pattern: {pattern!r}")
+        if any("**" in part and part != "**" for part in parts):
+            raise ValueError("Invalid pattern: '**' can only be an entire path component")
+        if pattern.endswith("/"):
+            # Directories only, and glob_search lists files
+            return {"matches": [], "total": 0}
+
+        found = _glob_files(str(p), parts)
+        if parts.count("**") > 1:
+            # "**" at several levels can reach a file more than one way
+            found = iter(dict.fromkeys(found))
+
+        # Count every match but only keep (and sort) the first 200 by name
+        total = 0
+
+        def counted() -> Iterator[str]:
+            nonlocal total
+            for fp in found:
+                total += 1
+                yield fp
+
+        matches = heapq.nsmallest(_GLOB_MAX_MATCHES, counted())
+        return {"matches": matches, "total": total}
     except Exception as e:
         return {"error": str(e)}
 
 
+def _walk_files(root: str, glob: str | None) -> Iterator[str]:
+    """Yield file paths under *root* in os.walk order, filtered by *glob*.
+
+    Works on os.scandir entries directly, so file types come from the
+    cached DirEntry data and no Path objects are built per file.
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    subdirs: list[str] = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            # Like os.walk(followlinks=False): list but don't enter links
+            if not entry.is_symlink():
+                subdirs.append(entry.path)
+        elif not glob or fnmatch.fnmatch(entry.name, glob):
+            yield entry.path
+    for subdir in subdirs:
+        yield from _walk_files(subdir, glob)
+
+
+async def _ripgrep_files(
+    pattern: str, root: Path, glob: str | None,
+) -> set[str] | None:
+    """List files under *root* that ripgrep reports as matching *pattern*.
+
+    Only used to narrow the set of files grep_search reads; the Python
+    regex still produces the results. Returns None when rg is not
+    installed or fails.
+    """
+    rg = shutil.which("rg")
+    if rg is None:
+        return None
+
+    cmd = [
+        rg, "--files-with-matches", "--null", "--no-config", "--no-messages",
+        "--no-ignore", "--hidden", "--follow", "--text", "--encoding", "none",
+    ]
+    # rg globs treat !, {} and / specially; fnmatch still filters afterwards
+    if glob and not any(ch in glob for ch in "!{}/\\"):
+        cmd += ["--iglob", glob]
+    cmd += ["--regexp", pattern, "--", str(root)]
+
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+        )
+        stdout, _ = await proc.communicate()
+    except OSError:
+        return None
+
+    # 0 = matches, 1 = no matches, anything else is an error
+    if proc.returncode not in (0, 1):
+        return None
+    return {os.fsdecode(raw) for raw in stdout.split(b"\0") if raw}
+
+
+# Files scanned concurrently per batch; grep_search stops after the batch
+# that reaches max_results instead of reading the whole tree.
+_GREP_BATCH_SIZE = 32
+
+_REGEX_METACHARS = frozenset("\\.^$*+?{}[]|()")
+
+# A literal, or an alternation of literals, whose only escapes are of
+# regex metacharacters. rg searching the raw bytes finds every file such a
+# pattern matches in the decoded text. Anything richer can differ: Python
+# sees invalid UTF-8 as U+FFFD, which . \W and \S match, its \s and line
+# breaks cover more characters, and rg would need its own flags for both.
+_RG_LITERAL = r"(?:[^\\.^$*+?{}\[\]|()]|\\[\\.^$*+?{}\[\]|()])+"
+_RG_SAFE_PATTERN = re.compile(rf"{_RG_LITERAL}(?:\|{_RG_LITERAL})*")
+
+
+def _rg_can_prefilter(pattern: str, ignore_case: bool) -> bool:
+    """Whether rg is sure to report every file the Python regex matches.
+
+    Case-insensitive searches are left to Python, which also folds i onto
+    the dotted and dotless I (U+0130, U+0131). Control and format characters and U+FFFD are out so
+    that no literal can involve a line break, BOM or replaced byte.
+    """
+    return (
+        not ignore_case and pattern.isprintable() and "\ufffd" not in pattern
+        and _RG_SAFE_PATTERN.fullmatch(pattern) is not None
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_pattern(pattern: str, flags: int) -> re.Pattern:
+    """Compile a grep_search pattern, reusing it across tool calls."""
+    return re.compile(pattern, flags)
+
+
+def _ascii_literal(pattern: str, ignore_case: bool) -> bytes | None:
+    """Return *pattern* as bytes if it is a plain, case-sensitive ASCII literal.
+
+    Such a pattern occurs in the decoded text exactly when its bytes occur
+    in the raw file: ASCII bytes survive UTF-8 decoding with "replace"
+    unchanged. Newlines are excluded because text mode folds \r\n to \n.
+    """
+    if (
+        not pattern or ignore_case or not pattern.isascii()
+        or "\n" in pattern or "\r" in pattern
+        or not _REGEX_METACHARS.isdisjoint(pattern)
+    ):
+        return None
+    return pattern.encode("ascii")
+
+
+def _worth_scanning(fp: str, literal: bytes | None, skip_binary: bool) -> bool:
+    """Check the raw bytes of *fp* before it is decoded and searched.
+
+    With *skip_binary*, a NUL byte near the start marks the file as binary.
+    With *literal*, files whose bytes don't contain it can't match.
+    """
+    with open(fp, "rb") as fh:
+        if skip_binary and b"\0" in fh.read(_BINARY_SNIFF_BYTES):
+            return False
+        if literal is None:
+            return True
+        size = os.fstat(fh.fileno()).st_size
+        if size == 0:
+            return True  # Can't map it; let the text scan decide
+        if size < len(literal):
+            return False
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.find(literal) >= 0
+
+
+def _scan_one(
+    fp: str,
+    regex: re.Pattern,
+    output_mode: str,
+    context_lines: int,
+    literal: bytes | None = None,
+    skip_binary: bool = False,
+    limit: int = 0,
+) -> list[Any]:
+    """Scan one file; returns its entries for *output_mode* (may be empty).
+
+    In content mode at most *limit* matching lines are returned (0 = all).
+    """
+    try:
+        if (literal is not None or skip_binary) and not _worth_scanning(
+            fp, literal, skip_binary,
+        ):
+            return []
+        with open(fp, encoding="utf-8", errors="replace") as fh:
+            text = fh.read()
+    except Exception:
+        return []
+
+    if output_mode == "files_with_matches":
+        return [fp] if regex.search(text) else []
+
+    if output_mode == "count":
+        n = len(regex.findall(text))
+        return [{"file": fp, "count": n}] if n > 0 else []
+
+    # output_mode == "content" (default)
+    entries: list[dict] = []
+    lines = text.splitlines()
+    prev_start = prev_end = 0
+    prev_ctx: list[str] = []
+    for i, line in enumerate(lines):
+        if regex.search(line):
+            entry: dict[str, Any] = {
+                "file": fp,
+                "line": i + 1,
+                "text": line.rstrip()[:500],
+            }
+            if context_lines > 0:
+                start = max(0, i - context_lines)
+                end = min(len(lines), i + context_lines + 1)
+                # Reuse the lines already rendered for an overlapping window
+                ctx = prev_ctx[start - prev_start:] if start < prev_end else []
+                ctx += [
+                    f"{j + 1}: {lines[j].rstrip()[:500]}"
+                    for j in range(max(start, prev_end), end)
+                ]
+                entry["context"] = ctx
+                prev_start, prev_end, prev_ctx = start, end, ctx
+            entries.append(entry)
+            if len(entries) == limit:
+                break
+    return entries
+
+
+async def _scan_files(
+    files: list[str],
+    regex: re.Pattern,
+    output_mode: str,
+    context_lines: int,
+    max_results: int,
+    literal: bytes | None = None,
+    skip_binary: bool = False,
+) -> list[Any]:
+    """Scan *files* on worker threads, keeping file order and max_results."""
+    results: list[Any] = []
+    for start in range(0, len(files), _GREP_BATCH_SIZE):
+        batch = files[start : start + _GREP_BATCH_SIZE]
+        # No single file can contribute more than the results still missing
+        remaining = max_results - len(results)
+        chunks = await asyncio.gather(*(
+            asyncio.to_thread(
+                _scan_one, fp, regex, output_mode, context_lines, literal,
+                skip_binary, remaining,
+            )
+            for fp in batch
+        ))
+        for chunk in chunks:
+            results.extend(chunk)
+            if len(results) >= max_results:
+                return results[:max_results]
+    return results
+
+
 async def grep_search(
     pattern: str,
     path: str = "/workspace",
@@ -179,80 +521,36 @@ async def grep_search(
     p = _resolve_path(path, tool_context)
     flags = re.IGNORECASE if ignore_case else 0
     try:
-        regex = re.compile(pattern, flags)
+        regex = _compile_pattern(pattern, flags)
     except re.error as e:
         return {"error": f"Invalid regex: {e}"}
 
     max_results = min(head_limit, 500) if head_limit > 0 else 500
 
     # Collect target files
-    files_to_search: list[Path] = []
+    files_to_search: list[str] = []
     if p.is_file():
-        files_to_search.append(p)
+        files_to_search.append(str(p))
     elif p.is_dir():
-        for root_dir, _, filenames in os.walk(p):
-            for name in filenames:
-                if glob and not fnmatch.fnmatch(name, glob):
-                    continue
-                files_to_search.append(Path(root_dir) / name)
+        files_to_search.extend(_walk_files(str(p), glob))
     else:
         return {"error": f"Path not found: {path}"}
 
-    if output_mode == "files_with_matches":
-        matched_files: list[str] = []
-        for fp in files_to_search:
-            try:
-                text = fp.read_text(encoding="utf-8", errors="replace")
-                if regex.search(text):
-                    matched_files.append(str(fp))
-                    if len(matched_files) >= max_results:
-                        break
-            except Exception:
-                pass
-        return {"matches": matched_files, "total": len(matched_files)}
-
-    if output_mode == "count":
-        counts: list[dict] = []
-        for fp in files_to_search:
-            try:
-                text = fp.read_text(encoding="utf-8", errors="replace")
-                n = len(regex.findall(text))
-                if n > 0:
-                    counts.append({"file": str(fp), "count": n})
-                    if len(counts) >= max_results:
-                        break
-            except Exception:
-                pass
-        return {"matches": counts, "total": len(counts)}
-
-    # output_mode == "content" (default)
-    results: list[dict] = []
-    for fp in files_to_search:
-        try:
-            lines = fp.read_text(
-                encoding="utf-8", errors="replace",
-            ).splitlines()
-            for i, line in enumerate(lines):
-                if regex.search(line):
-                    entry: dict[str, Any] = {
-                        "file": str(fp),
-                        "line": i + 1,
-                        "text": line.rstrip()[:500],
-                    }
-                    if context_lines > 0:
-                        start = max(0, i - context_lines)
-                        end = min(len(lines), i + context_lines + 1)
-                        ctx = [
-                            f"{j + 1}: {lines[j].rstrip()[:500]}"
-                            for j in range(start, end)
-                        ]
-                        entry["context"] = ctx
-                    results.append(entry)
-                    if len(results) >= max_results:
-                        break
-        except Exception:
-            pass
-        if len(results) >= max_results:
-            break
-
+    # Let ripgrep rule out non-matching files before reading them here,
+    # but only for patterns it is guaranteed to match the same way.
+    if (
+        p.is_dir() and files_to_search
+        and _rg_can_prefilter(pattern, ignore_case)
+    ):
+        hits = await _ripgrep_files(pattern, p, glob)
+        if hits is not None:
+            files_to_search = [fp for fp in files_to_search if fp in hits]
+
+    # Plain literals are first looked up in the raw bytes, so files that
+    # cannot match are never decoded. Binary files are only skipped when
+    # walking a directory; a file named explicitly is always searched.
+    results = await _scan_files(
+        files_to_search, regex, output_mode, context_lines, max_results,
+        _ascii_literal(pattern, ignore_case), skip_binary=p.is_dir(),
+    )
     return {"matches": results, "total": len(results)}
@@ -2,17 +2,15 @@
 
 from google.adk.tools import FunctionTool
 
-from ..utils import SKILLS_BASE_DIR
+from ..utils import SKILLS_BASE_DIR, list_skill_dirs
 
 
 def _list_available_skills() -> list[str]:
     """List available skill directories."""
-    if not SKILLS_BASE_DIR.is_dir():
-        return []
     return [
-        d.name
-        for d in sorted(SKILLS_BASE_DIR.iterdir())
-        if d.is_dir() and (d / "SKILL.md").is_file()
+        name
+        for name in list_skill_dirs()
+        if (SKILLS_BASE_DIR / name / "SKILL.md").is_file()
     ]
 
 
@@ -25,12 +23,10 @@ def read_skill(skill_name: str) -> str:
     Returns:
         The skill instructions as a string.
     """
-    available = _list_available_skills()
-
-    if skill_name not in available:
-        return f"Unknown skill: {skill_name}. Available skills: {', '.join(available)}"
-
     skill_path = SKILLS_BASE_DIR / skill_name / "SKILL.md"
+    if skill_name not in list_skill_dirs() or not skill_path.is_file():
+        available = _list_available_skills()
+        return f"Unknown skill: {skill_name}. Available skills: {', '.join(available)}"
 
     try:
         return skill_path.read_text(encoding="utf-8")
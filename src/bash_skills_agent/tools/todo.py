@@ -24,13 +24,14 @@ async def todo_write(
     Returns:
         Dict with the updated todo list
     """
-    validated = []
-    for item in todos:
-        validated.append({
+    validated = [
+        {
             "content": item.get("content", ""),
             "status": item.get("status", "pending"),
             "activeForm": item.get("activeForm", ""),
-        })
+        }
+        for item in todos
+    ]
 
     tool_context.state[_TODO_STATE_KEY] = validated
     return {"todos": validated, "count": len(validated)}
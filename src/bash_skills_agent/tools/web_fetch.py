@@ -2,21 +2,53 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections import OrderedDict
 from typing import Any
 
 import httpx
 from bs4 import BeautifulSoup
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
 from ..config.settings import settings
+from ..config.shared_clients import get_http_client
 
 logger = logging.getLogger(__name__)
 
 _STRIP_TAGS = ("script", "style", "nav", "footer", "header", "noscript")
+_STRIP_SELECTOR = ", ".join(_STRIP_TAGS)
+
+# Pages that came with an ETag or Last-Modified header, revalidated with a
+# conditional request: url -> {"etag", "last_modified", "title", "content"}
+_CACHE_MAX_ENTRIES = 128
+_cache: OrderedDict[str, dict[str, str]] = OrderedDict()
+
+# One fetch per URL at a time, so concurrent duplicates reuse the cache.
+# A lock is dropped once no caller holds or waits on it.
+_url_locks: dict[str, asyncio.Lock] = {}
+_url_lock_users: dict[str, int] = {}
 
 
 def _parse_html(html: str) -> tuple[str, str]:
     """Parse HTML and return (clean_text, title)."""
+    if LexborHTMLParser is not None:
+        # C parser; same text as the BeautifulSoup path below
+        tree = LexborHTMLParser(html)
+        title_node = tree.css_first("title")
+        title = title_node.text(strip=True) if title_node else ""
+
+        for node in tree.css(_STRIP_SELECTOR):
+            node.decompose()
+
+        text = tree.root.text(separator="\n", strip=True) if tree.root else ""
+        lines = [line for line in text.splitlines() if line.strip()]
+        return "\n".join(lines), title
+
     soup = BeautifulSoup(html, "html.parser")
     title = soup.title.string.strip() if soup.title and soup.title.string else ""
 
@@ -28,6 +60,65 @@ def _parse_html(html: str) -> tuple[str, str]:
     return "\n".join(lines), title
 
 
+async def _fetch(url: str, max_length: int) -> tuple[str, str, bool]:
+    """Fetch *url* and return (text, title, complete), revalidating cached pages.
+
+    Non-HTML bodies are only downloaded far enough to fill *max_length*
+    characters; *complete* is False when the rest was left unread.
+    """
+    cached = _cache.get(url)
+    headers: dict[str, str] = {}
+    if cached is not None:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    async with get_http_client().stream("GET", url, headers=headers) as resp:
+        if cached is not None and resp.status_code == 304:
+            _cache.move_to_end(url)
+            return cached["content"], cached["title"], True
+        resp.raise_for_status()
+
+        content_type = resp.headers.get("content-type", "")
+
+        complete = True
+        if "html" in content_type:
+            # Markup and scripts don't bound the extracted text, so HTML is
+            # always read in full
+            await resp.aread()
+            text, title = _parse_html(resp.text)
+        else:
+            # A character is at most 4 bytes, so this many fill max_length
+            limit = max_length * 4
+            chunks: list[bytes] = []
+            size = 0
+            async for chunk in resp.aiter_bytes():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > limit:
+                    complete = False
+                    break
+            text = b"".join(chunks).decode(resp.encoding or "utf-8", errors="replace")
+            title = ""
+
+    etag = resp.headers.get("etag", "")
+    last_modified = resp.headers.get("last-modified", "")
+    if complete and (etag or last_modified):
+        _cache[url] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "title": title,
+            "content": text,
+        }
+        _cache.move_to_end(url)
+        if len(_cache) > _CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    else:
+        _cache.pop(url, None)
+    return text, title, complete
+
+
 async def web_fetch(
     url: str,
     max_length: int = 0,
@@ -45,24 +136,17 @@ async def web_fetch(
     if max_length <= 0:
         max_length = settings.web_fetch_max_length
 
+    lock = _url_locks.get(url)
+    if lock is None:
+        lock = _url_locks[url] = asyncio.Lock()
+    _url_lock_users[url] = _url_lock_users.get(url, 0) + 1
     try:
-        async with httpx.AsyncClient(
-            timeout=settings.web_fetch_timeout,
-            follow_redirects=True,
-            headers={"User-Agent": "Mozilla/5.0 (compatible; BashSkillsAgentBot/1.0)"},
-        ) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-
-        content_type = resp.headers.get("content-type", "")
-
-        if "html" in content_type:
-            text, title = _parse_html(resp.text)
-        else:
-            text, title = resp.text, ""
+        async with lock:
+            text, title, complete = await _fetch(url, max_length)
 
         if len(text) > max_length:
-            text = text[:max_length] + f"\n\n... (truncated, {len(text)} total chars)"
+            total = f"{len(text)} total" if complete else f"over {len(text)}"
+            text = text[:max_length] + f"\n\n... (truncated, {total} chars)"
 
         logger.info("Fetched %s (%d chars)", url, len(text))
         return {"url": url, "title": title, "content": text}
@@ -72,3 +156,8 @@ async def web_fetch(
     except Exception as e:
         logger.error("Fetch failed for %s: %s", url, e)
         return {"error": f"Fetch failed: {e}"}
+    finally:
+        _url_lock_users[url] -= 1
+        if not _url_lock_users[url]:
+            del _url_lock_users[url]
+            del _url_locks[url]
@@ -1,12 +1,266 @@
 """Web search tool using DuckDuckGo."""
 
+import asyncio
+import functools
+import itertools
+import json
 import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
 from typing import Any
+from urllib.parse import urlsplit
 
 from ..config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Raw DuckDuckGo results, reused for settings.web_search_cache_ttl seconds:
+# (query, region, fetch_count) -> (time.monotonic() when fetched, results)
+_CACHE_MAX_ENTRIES = 128
+_cache: OrderedDict[tuple[str, str, int], tuple[float, list[dict]]] = OrderedDict()
+
+# Optional second tier behind _cache that survives restarts, enabled by
+# settings.web_search_cache_db; rows hold time.time() when fetched
+_db: sqlite3.Connection | None = None
+_db_lock = threading.Lock()
+
+# DuckDuckGo requests in flight; concurrent identical searches share one
+_inflight: dict[tuple[str, str, int], asyncio.Task] = {}
+
+# One DDGS client per worker thread, so searches reuse its HTTP session
+_local = threading.local()
+
+# Upper bound on DuckDuckGo requests running at once; bursts of distinct
+# queries queue here, on the event loop, instead of tripping DuckDuckGo's
+# rate limit or tying up the default executor's threads
+_search_slots = asyncio.Semaphore(max(1, settings.web_search_max_concurrency))
+
+# New clients take the next configured proxy, so a rate-limited client is
+# replaced by one going out through a different address
+_proxies = itertools.cycle(settings.web_search_proxies) if settings.web_search_proxies else None
+
+# Retries after a rate limit, waiting 1s, 2s, ... before each
+_RATELIMIT_RETRIES = 2
+
+
+def _get_cached(key: tuple[str, str, int]) -> list[dict] | None:
+    """Return cached results for *key*, dropping the entry once it expires."""
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    fetched_at, raw = entry
+    if time.monotonic() - fetched_at >= settings.web_search_cache_ttl:
+        del _cache[key]
+        return None
+    _cache.move_to_end(key)
+    return raw
+
+
+def _put_cached(key: tuple[str, str, int], raw: list[dict], age: float = 0.0) -> None:
+    """Store *raw* results for *key*, evicting the least recently used."""
+    if settings.web_search_cache_ttl <= 0:
+        return
+    _cache[key] = (time.monotonic() - age, raw)
+    _cache.move_to_end(key)
+    if len(_cache) > _CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+def _open_db() -> sqlite3.Connection:
+    """Open the results database on first use; call with _db_lock held."""
+    global _db
+    if _db is None:
+        path = Path(settings.web_search_cache_db)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "query TEXT, region TEXT, fetch_count INTEGER, fetched_at REAL, raw TEXT, "
+            "PRIMARY KEY (query, region, fetch_count))"
+        )
+        _db = db
+    return _db
+
+
+def _disk_get(key: tuple[str, str, int]) -> tuple[float, list[dict]] | None:
+    """Return (age in seconds, results) for *key* from the database, if fresh."""
+    try:
+        with _db_lock:
+            row = _open_db().execute(
+                "SELECT fetched_at, raw FROM results "
+                "WHERE query = ? AND region = ? AND fetch_count = ?",
+                key,
+            ).fetchone()
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Search cache read failed: %s", e)
+        return None
+    if row is None:
+        return None
+    age = time.time() - row[0]
+    if not 0 <= age < settings.web_search_cache_ttl:
+        return None
+    try:
+        return age, json.loads(row[1])
+    except (TypeError, ValueError):
+        logger.warning("Dropping corrupt search cache entry: %s", key[0])
+        _disk_delete(key)
+        return None
+
+
+def _disk_delete(key: tuple[str, str, int]) -> None:
+    """Remove the database row for *key*."""
+    try:
+        with _db_lock:
+            db = _open_db()
+            with db:
+                db.execute(
+                    "DELETE FROM results "
+                    "WHERE query = ? AND region = ? AND fetch_count = ?",
+                    key,
+                )
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Search cache write failed: %s", e)
+
+
+def _disk_put(key: tuple[str, str, int], raw: list[dict]) -> None:
+    """Store *raw* results for *key* in the database and drop expired rows."""
+    now = time.time()
+    try:
+        with _db_lock:
+            db = _open_db()
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                    (*key, now, json.dumps(raw, ensure_ascii=False)),
+                )
+                db.execute(
+                    "DELETE FROM results WHERE fetched_at < ?",
+                    (now - settings.web_search_cache_ttl,),
+                )
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Search cache write failed: %s", e)
+
+
+@functools.lru_cache(maxsize=64)
+def _domain_set(domains: tuple[str, ...]) -> frozenset[str]:
+    """Normalize a domain filter list to bare lowercase host names."""
+    return frozenset(filter(None, (d.strip().lower().lstrip(".") for d in domains)))
+
+
+def _host_matches(url: str, domains: frozenset[str]) -> bool:
+    """True if *url*'s host is one of *domains* or a subdomain of one."""
+    try:
+        host = urlsplit(url).hostname or ""
+    except ValueError:
+        return False
+    while host:
+        if host in domains:
+            return True
+        _, _, host = host.partition(".")
+    return False
+
+
+def _do_search(ddgs_cls: type, query: str, region: str, fetch_count: int) -> list[dict]:
+    """Run a blocking DuckDuckGo text search with this thread's client."""
+    ddgs = getattr(_local, "ddgs", None)
+    if ddgs is None:
+        proxy = next(_proxies) if _proxies is not None else None
+        ddgs = _local.ddgs = ddgs_cls(proxy=proxy)
+    try:
+        return list(ddgs.text(query, region=region, max_results=fetch_count))
+    except Exception:
+        # Start over with a fresh session (e.g. after a timeout or rate limit)
+        _local.ddgs = None
+        raise
+
+
+async def _fetch(ddgs_cls: type, key: tuple[str, str, int]) -> list[dict]:
+    """Search DuckDuckGo for *key*, backing off and retrying if rate limited.
+
+    A slot is taken per attempt, so a search waiting to retry holds neither
+    a slot nor a worker thread.
+    """
+    from duckduckgo_search.exceptions import RatelimitException
+
+    attempt = 0
+    while True:
+        try:
+            async with _search_slots:
+                return await asyncio.to_thread(_do_search, ddgs_cls, *key)
+        except RatelimitException:
+            if attempt == _RATELIMIT_RETRIES:
+                raise
+            logger.warning("Search rate limited, retrying: %s", key[0])
+            await asyncio.sleep(2**attempt)
+            attempt += 1
+
+
+async def _search_and_cache(
+    ddgs_cls: type, key: tuple[str, str, int],
+) -> list[dict]:
+    """Load *key* from the database or search for it, and cache the results."""
+    use_db = bool(settings.web_search_cache_db) and settings.web_search_cache_ttl > 0
+    if use_db:
+        cached = await asyncio.to_thread(_disk_get, key)
+        if cached is not None:
+            age, raw = cached
+            _put_cached(key, raw, age)
+            return raw
+    raw = await _fetch(ddgs_cls, key)
+    if use_db:
+        await asyncio.to_thread(_disk_put, key, raw)
+    _put_cached(key, raw)
+    return raw
+
+
+def _forget_inflight(key: tuple[str, str, int], task: asyncio.Task) -> None:
+    """Drop a finished request from _inflight."""
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        task.exception()  # Retrieved here in case every waiter was cancelled
+
+
+async def _search(ddgs_cls: type, key: tuple[str, str, int]) -> list[dict]:
+    """Return raw results for *key*: cached, in flight, or freshly fetched."""
+    raw = _get_cached(key)
+    if raw is not None:
+        return raw
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_search_and_cache(ddgs_cls, key))
+        task.add_done_callback(functools.partial(_forget_inflight, key))
+        _inflight[key] = task
+    # Shielded so one cancelled caller doesn't cancel it for the rest
+    return await asyncio.shield(task)
+
+
+def _filter_results(
+    raw: list[dict],
+    allowed: frozenset[str] | None,
+    blocked: frozenset[str] | None,
+    num_results: int,
+) -> list[dict[str, str]]:
+    """Apply the domain filters to *raw* and keep the first *num_results*."""
+    results = []
+    for r in raw:
+        url = r.get("href", "")
+        if allowed is not None and not _host_matches(url, allowed):
+            continue
+        if blocked is not None and _host_matches(url, blocked):
+            continue
+        results.append({
+            "title": r.get("title", ""),
+            "url": url,
+            "snippet": r.get("body", ""),
+        })
+        if len(results) >= num_results:
+            break
+    return results
+
 
 async def search_web(
     query: str,
@@ -39,24 +293,26 @@ async def search_web(
         region = settings.web_search_region
     num_results = min(num_results, 10)
 
-    # Fetch extra results when filtering, to compensate for filtered-out entries
-    fetch_count = num_results * 3 if allowed_domains or blocked_domains else num_results
+    # Domains match the URL's host and its parent domains, not the path.
+    # Filters apply to the cached results, so they aren't in the cache key.
+    # A list with only blank entries means no filter, not "match nothing".
+    allowed = _domain_set(tuple(allowed_domains or ())) or None
+    blocked = _domain_set(tuple(blocked_domains or ())) or None
+
+    # An allow-list usually rejects most results, so fetch extra up front;
+    # a block-list rarely does, so only fetch more if the first batch fell short
+    fetch_count = num_results * 3 if allowed is not None else num_results
 
     try:
-        results = []
-        for r in DDGS().text(query, region=region, max_results=fetch_count):
-            url = r.get("href", "")
-            if allowed_domains and not any(d in url for d in allowed_domains):
-                continue
-            if blocked_domains and any(d in url for d in blocked_domains):
-                continue
-            results.append({
-                "title": r.get("title", ""),
-                "url": url,
-                "snippet": r.get("body", ""),
-            })
-            if len(results) >= num_results:
-                break
+        raw = await _search(DDGS, (query, region, fetch_count))
+        results = _filter_results(raw, allowed, blocked, num_results)
+        if (
+            len(results) < num_results
+            and len(raw) >= fetch_count
+            and fetch_count < num_results * 3
+        ):
+            raw = await _search(DDGS, (query, region, num_results * 3))
+            results = _filter_results(raw, allowed, blocked, num_results)
 
         logger.info("Search completed: %d results for '%s'", len(results), query)
         return {"query": query, "results": results, "total_results": len(results)}
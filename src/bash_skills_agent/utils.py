@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import functools
 import logging
 import os
+import re
+import stat
 import sys
 from pathlib import Path
 
@@ -15,6 +18,14 @@ from .config.settings import settings
 # Logging
 # ---------------------------------------------------------------------------
 
+LOG_LEVEL_MAP = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
 
 def setup_logging(level: int | None = None) -> None:
     """Set up global logging configuration.
@@ -22,15 +33,12 @@ def setup_logging(level: int | None = None) -> None:
     Args:
         level: Logging level override (default: from settings.log_level).
     """
+    # basicConfig is a no-op once the root logger has handlers
+    if logging.getLogger().handlers:
+        return
+
     if level is None:
-        level_map = {
-            "DEBUG": logging.DEBUG,
-            "INFO": logging.INFO,
-            "WARNING": logging.WARNING,
-            "ERROR": logging.ERROR,
-            "CRITICAL": logging.CRITICAL,
-        }
-        level = level_map.get(settings.log_level.upper(), logging.INFO)
+        level = LOG_LEVEL_MAP.get(settings.log_level.upper(), logging.INFO)
 
     logging.basicConfig(
         level=level,
@@ -39,8 +47,6 @@ def setup_logging(level: int | None = None) -> None:
     )
 
 
-setup_logging()
-
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -49,38 +55,156 @@ logger = logging.getLogger(__name__)
 
 SKILLS_BASE_DIR = Path(__file__).parent / "skills"
 
+_skill_dirs_cache: tuple[int, list[str]] | None = None
+_frontmatters_cache: tuple[tuple[tuple[str, str, int], ...], str] | None = None
+
+
+_FM_BOUNDARY = re.compile(r"-{3,}\s*")
+_FM_FIELD = re.compile(r"([A-Za-z0-9_-]+):(?: +(.*))?")
+# ": " starts a nested mapping and " #" a comment inside a plain scalar
+_YAML_INLINE_INDICATOR = re.compile(r":\s|\s#")
+# Leading characters that make a YAML value something other than a plain
+# scalar (quotes, block scalars, flow collections, anchors, tags, ...).
+_YAML_INDICATORS = frozenset("-?:,[]{}#&*!|>'\"%@`<=")
+_YAML_NON_STRINGS = frozenset(
+    {"true", "false", "yes", "no", "on", "off", "null", "~"}
+)
+
+
+def _is_plain_value(value: str) -> bool:
+    """Whether *value* is a single-line YAML plain scalar."""
+    return not (
+        value[0] in _YAML_INDICATORS
+        or value.endswith(":")
+        or _YAML_INLINE_INDICATOR.search(value)
+    )
+
+
+def _is_plain_string(value: str) -> bool:
+    """Whether YAML would load *value* as exactly this string."""
+    return bool(value) and not (
+        value.lower() in _YAML_NON_STRINGS or value[0] in "+.0123456789"
+    )
+
+
+def _load_name_desc(path: str) -> tuple[str, str] | None:
+    """Read ``name``/``description`` from a simple SKILL.md header.
+
+    Only handles headers made of ``key: plain value`` lines; returns None for
+    anything else (quoting, block scalars, continuation lines, ...) so the
+    caller can fall back to a full YAML parse.
+    """
+    with open(path, encoding="utf-8") as f:
+        if not _FM_BOUNDARY.fullmatch(f.readline().rstrip("\n")):
+            return None
+        fields: dict[str, str] = {}
+        for line in f:
+            line = line.rstrip("\n")
+            if _FM_BOUNDARY.fullmatch(line):
+                break
+            if not line.strip():
+                continue
+            match = _FM_FIELD.fullmatch(line) if line.isprintable() else None
+            if match is None:
+                return None
+            value = (match.group(2) or "").strip()
+            if value and not _is_plain_value(value):
+                return None
+            fields[match.group(1)] = value
+        else:
+            return None
+    name = fields.get("name", "")
+    description = fields.get("description", "")
+    if not (_is_plain_string(name) and _is_plain_string(description)):
+        return None
+    return name, description
+
+
+@functools.lru_cache(maxsize=256)
+def _load_frontmatter_cached(path: str, mtime_ns: int) -> str:
+    """Parse a SKILL.md; *mtime_ns* is only part of the cache key."""
+    parsed = _load_name_desc(path)
+    if parsed is None:
+        with open(path, encoding="utf-8") as f:
+            post = frontmatter.load(f)
+        parsed = post["name"], post["description"]
+    return f"- {parsed[0]}: {parsed[1]}"
+
 
 def load_skill_frontmatter(skill_name: str) -> str:
     """Load name + description from a skill's SKILL.md as formatted string.
 
+    The parsed result is cached until the file's mtime changes.
+
     Args:
         skill_name: Name of the skill directory.
 
     Returns:
         Formatted string like "- skill-name: description text".
     """
-    skill_path = SKILLS_BASE_DIR / skill_name / "SKILL.md"
-    with open(skill_path, encoding="utf-8") as f:
-        post = frontmatter.load(f)
-    return f"- {post['name']}: {post['description']}"
+    skill_path = str(SKILLS_BASE_DIR / skill_name / "SKILL.md")
+    return _load_frontmatter_cached(skill_path, os.stat(skill_path).st_mtime_ns)
+
+
+def list_skill_dirs() -> list[str]:
+    """Return the sorted names of the directories in SKILLS_BASE_DIR.
+
+    The listing is cached until SKILLS_BASE_DIR's mtime changes, which
+    happens whenever a skill directory is added, removed or renamed. A
+    directory is listed whether or not it has a SKILL.md yet.
+    """
+    global _skill_dirs_cache
+    try:
+        st = os.stat(SKILLS_BASE_DIR)
+    except OSError:
+        return []
+    if not stat.S_ISDIR(st.st_mode):
+        return []
+
+    # DirEntry types come from the directory listing itself
+    if _skill_dirs_cache is None or _skill_dirs_cache[0] != st.st_mtime_ns:
+        with os.scandir(SKILLS_BASE_DIR) as it:
+            names = sorted(entry.name for entry in it if entry.is_dir())
+        _skill_dirs_cache = (st.st_mtime_ns, names)
+    return _skill_dirs_cache[1]
 
 
 def load_all_skill_frontmatters() -> str:
     """Discover all skills and return their frontmatters as a formatted string.
 
+    The joined result is reused until any SKILL.md is added, removed or
+    modified.
+
     Returns:
         Newline-joined string of all skill descriptions,
         or "No skills available." if none found.
     """
-    if not SKILLS_BASE_DIR.is_dir():
-        return "No skills available."
+    global _frontmatters_cache
+
+    # The one stat of each SKILL.md both checks it and keys the caches
+    skills: list[tuple[str, str, int]] = []
+    for name in list_skill_dirs():
+        skill_path = os.path.join(SKILLS_BASE_DIR, name, "SKILL.md")
+        try:
+            st = os.stat(skill_path)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            skills.append((name, skill_path, st.st_mtime_ns))
+
+    # A SKILL.md edited in place leaves SKILLS_BASE_DIR's mtime alone, so the
+    # joined string is keyed on every file's mtime rather than the directory's
+    key = tuple(skills)
+    if _frontmatters_cache is not None and _frontmatters_cache[0] == key:
+        return _frontmatters_cache[1]
 
     lines: list[str] = []
-    for name in sorted(os.listdir(SKILLS_BASE_DIR)):
-        if (SKILLS_BASE_DIR / name / "SKILL.md").is_file():
-            try:
-                lines.append(load_skill_frontmatter(name))
-            except Exception:
-                logger.warning("Failed to load skill frontmatter: %s", name)
-
-    return "\n".join(lines) if lines else "No skills available."
+    for name, skill_path, mtime_ns in skills:
+        try:
+            lines.append(_load_frontmatter_cached(skill_path, mtime_ns))
+        except Exception:
+            logger.warning("Failed to load skill frontmatter: %s", name)
+
+    joined = "\n".join(lines) if lines else "No skills available."
+    _frontmatters_cache = (key, joined)
+    return joined
@@ -0,0 +1,106 @@
+"""grep_search must return the same matches with and without ripgrep."""
+
+import shutil
+
+import pytest
+
+from bash_skills_agent.tools import file_tools
+from bash_skills_agent.tools.file_tools import grep_search
+
+MODES = ("content", "files_with_matches", "count")
+
+# (file contents, pattern, output modes) that the Python scan matches but
+# rg, given the same regex, would not.
+CASES = [
+    pytest.param(b'name = "caf\xe9"\n', r'name = ".*"', MODES, id="latin1-dot-star"),
+    pytest.param(b'name = "caf\xe9"\n', r"caf.", MODES, id="latin1-dot"),
+    pytest.param(b"a\xffb\n", r"a.b", MODES, id="invalid-utf8-dot"),
+    pytest.param(b"a\xffb\n", r"a\Wb", MODES, id="invalid-utf8-non-word"),
+    pytest.param(b"a\x1fb\n", r"a\sb", ("content",), id="unit-separator-space"),
+    pytest.param(b"alpha\r\nbeta\r\n", r"alpha$", ("content",), id="crlf-dollar"),
+    pytest.param(b"alpha\r\nbeta\r\n", r"alpha\nbeta", MODES[1:], id="crlf-newline"),
+    pytest.param(b"x\ry\n", r"^y", ("content",), id="cr-caret"),
+    pytest.param(b"x\x0cy\n", r"^y", ("content",), id="form-feed-caret"),
+]
+
+
+@pytest.fixture
+def no_rg(monkeypatch):
+    monkeypatch.setattr(file_tools.shutil, "which", lambda name: None)
+
+
+@pytest.fixture
+def rg_calls(monkeypatch):
+    """Stand in for an rg that matches nothing, recording its patterns."""
+    calls = []
+
+    async def fake_ripgrep_files(pattern, root, glob):
+        calls.append(pattern)
+        return set()
+
+    monkeypatch.setattr(file_tools, "_ripgrep_files", fake_ripgrep_files)
+    return calls
+
+
+def _write(tmp_path, data):
+    (tmp_path / "sample.txt").write_bytes(data)
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize(("data", "pattern", "modes"), CASES)
+async def test_prefilter_skipped_when_rg_could_miss(
+    tmp_path, rg_calls, data, pattern, modes,
+):
+    root = _write(tmp_path, data)
+    for mode in modes:
+        result = await grep_search(pattern, root, output_mode=mode)
+        assert result["total"] == 1, mode
+    assert rg_calls == []
+
+
+@pytest.mark.parametrize(("data", "pattern", "modes"), CASES)
+@pytest.mark.skipif(shutil.which("rg") is None, reason="ripgrep not installed")
+async def test_same_results_with_real_rg(
+    tmp_path, monkeypatch, data, pattern, modes,
+):
+    root = _write(tmp_path, data)
+    with_rg = [await grep_search(pattern, root, output_mode=m) for m in modes]
+    monkeypatch.setattr(file_tools.shutil, "which", lambda name: None)
+    without_rg = [await grep_search(pattern, root, output_mode=m) for m in modes]
+    assert with_rg == without_rg
+
+
+@pytest.mark.parametrize(
+    "pattern", ["beta", "alpha|beta", r"beta\.", "café|ça", r"a\\b"],
+)
+async def test_literals_use_prefilter(tmp_path, rg_calls, pattern):
+    await grep_search(pattern, _write(tmp_path, b"alpha\r\nbeta.\n"))
+    assert rg_calls == [pattern]
+
+
+@pytest.mark.parametrize(
+    "pattern", ["", "beta|", "b.ta", "[b]eta", "(?i)beta", "^beta", "a\tb"],
+)
+async def test_non_literals_skip_prefilter(tmp_path, rg_calls, pattern):
+    await grep_search(pattern, _write(tmp_path, b"alpha\r\nbeta.\n"))
+    assert rg_calls == []
+
+
+async def test_ignore_case_skips_prefilter(tmp_path, rg_calls):
+    root = _write(tmp_path, "İstanbul\n".encode())
+    result = await grep_search("istanbul", root, ignore_case=True)
+    assert result["total"] == 1
+    assert rg_calls == []
+
+
+async def test_single_file_never_uses_rg(tmp_path, rg_calls):
+    root = _write(tmp_path, b"beta\n")
+    result = await grep_search("beta", f"{root}/sample.txt")
+    assert result["total"] == 1
+    assert rg_calls == []
+
+
+async def test_literal_without_rg(tmp_path, no_rg):
+    root = _write(tmp_path, 'name = "café"\n'.encode())
+    result = await grep_search("café", root, output_mode="files_with_matches")
+    assert result["matches"] == [f"{root}/sample.txt"]